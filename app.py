@@ -3,14 +3,19 @@ PowerGas Profitability Calculator - Streamlit App
 
 Interactive web interface for calculating and comparing profitability
 of gas delivery operations from Mother Stations to Daughter Stations.
+
+pandas and Plotly are imported inside the functions that build tables and
+charts, so startup and the About page load neither of them
+(python benchmark.py --startup reports the import profile).
 """
 
 import streamlit as st
 import json
-import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
-from profitability_calculator import ProfitabilityCalculator
+import copy
+from profitability_calculator import get_calculator
+from cost_models import get_cost_model
+from result_cache import LRUCache, canonical_key
+from trip_results import TripResultTable
 from datetime import datetime
 
 # Page configuration
@@ -41,15 +46,34 @@ def format_currency(value):
     """Format number as Nigerian Naira"""
     return f"₦{value:,.2f}"
 
+@st.cache_resource
+def get_result_caches():
+    """Result and chart caches shared by every session of this app process"""
+    return {
+        'trips': LRUCache(max_entries=4096, max_bytes=16 * 1024 * 1024),
+        'views': LRUCache(max_entries=256, max_bytes=128 * 1024 * 1024),
+    }
+
 def calculate_single_trip(trip_data):
-    """Calculate profitability for a single trip"""
-    calculator = ProfitabilityCalculator.__new__(ProfitabilityCalculator)
-    calculator.config = {}
-    result = calculator.calculate_trip_profit(trip_data)
-    return result
+    """Calculate profitability for a single trip (cached by trip_data content)"""
+    calculator = get_calculator()
+    cache = get_result_caches()['trips']
+    result = cache.get_or_compute(canonical_key('trip', trip_data),
+                                  lambda: calculator.calculate_trip_profit(trip_data))
+    # Callers add scenario fields to the result, so never hand out the cached
+    # dict or its nested breakdown
+    return copy.deepcopy(result)
+
+def results_frame(scenarios_results):
+    """Flat DataFrame of scenario results (a list of result dicts or a TripResultTable)"""
+    if not isinstance(scenarios_results, TripResultTable):
+        scenarios_results = TripResultTable.from_records(scenarios_results)
+    return scenarios_results.to_dataframe()
 
 def create_cost_breakdown_chart(result):
     """Create a pie chart for cost breakdown"""
+    import plotly.graph_objects as go
+
     costs = result['costs_breakdown']
 
     fig = go.Figure(data=[go.Pie(
@@ -73,7 +97,9 @@ def create_cost_breakdown_chart(result):
 
 def create_profit_comparison_chart(scenarios_results):
     """Create a bar chart comparing profits across scenarios"""
-    df = pd.DataFrame(scenarios_results)
+    import plotly.graph_objects as go
+
+    df = results_frame(scenarios_results)
 
     fig = go.Figure()
 
@@ -97,7 +123,9 @@ def create_profit_comparison_chart(scenarios_results):
 
 def create_detailed_comparison_chart(scenarios_results):
     """Create a grouped bar chart showing revenue and costs"""
-    df = pd.DataFrame(scenarios_results)
+    import plotly.graph_objects as go
+
+    df = results_frame(scenarios_results)
 
     fig = go.Figure()
 
@@ -111,7 +139,7 @@ def create_detailed_comparison_chart(scenarios_results):
     fig.add_trace(go.Bar(
         name='Total Costs',
         x=df['scenario_name'],
-        y=df['costs_breakdown'].apply(lambda x: x['total_costs']),
+        y=df['total_costs'],
         marker_color='#E74C3C'
     ))
 
@@ -132,6 +160,98 @@ def create_detailed_comparison_chart(scenarios_results):
 
     return fig
 
+def create_profit_margin_chart(scenarios_results):
+    """Create a bar chart comparing profit margins across scenarios"""
+    import plotly.graph_objects as go
+
+    df = results_frame(scenarios_results)
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=df['scenario_name'],
+        y=df['profit_margin_percent'],
+        text=df['profit_margin_percent'].apply(lambda x: f"{x:.2f}%"),
+        textposition='auto',
+        marker_color='#2ECC71'
+    ))
+    fig.update_layout(
+        title="Profit Margin Comparison",
+        xaxis_title="Scenario",
+        yaxis_title="Profit Margin (%)",
+        height=400,
+        showlegend=False
+    )
+
+    return fig
+
+def create_impact_table(best, worst):
+    """Create the cost component impact table for the best vs worst scenario"""
+    import pandas as pd
+
+    prod_diff = abs(best['costs_breakdown']['production_costs'] - worst['costs_breakdown']['production_costs'])
+    truck_exp_diff = abs(best['costs_breakdown']['truck_expenses'] - worst['costs_breakdown']['truck_expenses'])
+    trucking_diff = abs(best['costs_breakdown']['trucking_costs'] - worst['costs_breakdown']['trucking_costs'])
+    skid_diff = abs(best['costs_breakdown']['skid_costs'] - worst['costs_breakdown']['skid_costs'])
+
+    impact_data = {
+        'Cost Component': ['Production Costs', 'Truck Expenses', 'Trucking Costs', 'Skid Costs'],
+        'Difference (NGN)': [prod_diff, truck_exp_diff, trucking_diff, skid_diff],
+        'Impact': [
+            f"{prod_diff/(prod_diff+truck_exp_diff+trucking_diff+skid_diff)*100:.1f}%",
+            f"{truck_exp_diff/(prod_diff+truck_exp_diff+trucking_diff+skid_diff)*100:.1f}%",
+            f"{trucking_diff/(prod_diff+truck_exp_diff+trucking_diff+skid_diff)*100:.1f}%",
+            f"{skid_diff/(prod_diff+truck_exp_diff+trucking_diff+skid_diff)*100:.1f}%"
+        ]
+    }
+
+    df_impact = pd.DataFrame(impact_data)
+    return df_impact.sort_values('Difference (NGN)', ascending=False)
+
+def create_comparison_table(sorted_results):
+    """Create the detailed comparison table (one row per scenario)"""
+    import pandas as pd
+
+    df = results_frame(sorted_results)
+    return pd.DataFrame({
+        'Scenario': df['scenario_name'],
+        'Mother Station': df['mother_station'],
+        'Revenue': df['revenue'],
+        'Production Costs': df['production_costs'],
+        'Truck Expenses': df['truck_expenses'],
+        'Trucking Costs': df['trucking_costs'],
+        'Skid Costs': df['skid_costs'],
+        'Total Costs': df['total_costs'],
+        'Profit': df['profit'],
+        'Margin %': df['profit_margin_percent']
+    })
+
+def build_comparison_views(sorted_results):
+    """Build every chart, table and export for the scenario comparison page"""
+    # One struct-of-arrays table; every chart's DataFrame shares its columns
+    table = TripResultTable.from_records(sorted_results)
+    df_table = create_comparison_table(table)
+    return {
+        'profit_chart': create_profit_comparison_chart(table),
+        'margin_chart': create_profit_margin_chart(table),
+        'detailed_chart': create_detailed_comparison_chart(table),
+        'impact_table': create_impact_table(table[0], table[-1]),
+        'comparison_table': df_table,
+        'csv': df_table.to_csv(index=False),
+        'json': json.dumps(sorted_results, indent=2),
+    }
+
+def show_cache_stats():
+    """Show result/chart cache hit and miss counters in the sidebar"""
+    with st.expander("⚡ Cache Statistics"):
+        for name, cache in get_result_caches().items():
+            stats = cache.stats()
+            st.caption(f"**{name.title()}**: {stats['hits']} hits / {stats['misses']} misses "
+                       f"({stats['hit_rate_percent']:.1f}%), {stats['entries']} entries, "
+                       f"{stats['bytes'] / 1024:,.0f} KB")
+        if st.button("🗑️ Clear cache"):
+            for cache in get_result_caches().values():
+                cache.clear()
+
 def main():
     # Header
     st.title("⛽ PowerGas Profitability Calculator")
@@ -167,6 +287,9 @@ def main():
             except Exception as e:
                 st.error(f"Error loading scenarios: {e}")
 
+        st.divider()
+        show_cache_stats()
+
     # Main content based on selected page
     if page == "Single Trip Calculator":
         show_single_trip_calculator()
@@ -236,14 +359,37 @@ def show_single_trip_calculator():
     # Display Live Formula
     st.markdown("### 📐 Profitability Formula (Live Calculation)")
 
-    # Calculate intermediate values
-    revenue_calc = gas_volume * gas_price
-    production_calc = (gas_cost + plant_cost + ga_cost) * gas_volume
-    truck_exp_calc = (truck_depreciation + truck_insurance + fuel_cost) * truck_turnaround_time
-    trucking_calc = (fixed_trucking_cost + variable_trucking_cost) * round_trip_distance
-    skid_calc = skid_depreciation * skid_turnaround_time
-    total_costs_calc = production_calc + truck_exp_calc + trucking_calc + skid_calc
-    profit_calc = revenue_calc - total_costs_calc
+    # Prepare trip data
+    trip_data = {
+        'trip_id': trip_id,
+        'mother_station': mother_station,
+        'daughter_station': daughter_station,
+        'return_mother_station': return_mother_station,
+        'gas_volume': gas_volume,
+        'gas_price': gas_price,
+        'gas_cost': gas_cost,
+        'plant_cost': plant_cost,
+        'ga_cost': ga_cost,
+        'truck_depreciation': truck_depreciation,
+        'truck_insurance': truck_insurance,
+        'fuel_cost': fuel_cost,
+        'truck_turnaround_time': truck_turnaround_time,
+        'fixed_trucking_cost': fixed_trucking_cost,
+        'variable_trucking_cost': variable_trucking_cost,
+        'round_trip_distance': round_trip_distance,
+        'skid_depreciation': skid_depreciation,
+        'skid_turnaround_time': skid_turnaround_time
+    }
+
+    # Calculate intermediate values with the shared formula kernel
+    live = get_cost_model('base').evaluate(trip_data)
+    revenue_calc = live['revenue']
+    production_calc = live['production_costs']
+    truck_exp_calc = live['truck_expenses']
+    trucking_calc = live['trucking_costs']
+    skid_calc = live['skid_costs']
+    total_costs_calc = live['total_costs']
+    profit_calc = live['profit']
     profit_margin = (profit_calc/revenue_calc*100) if revenue_calc > 0 else 0
 
     # Display formula in a clean format
@@ -301,28 +447,6 @@ Skid = {skid_depreciation:,.0f} × {skid_turnaround_time:.1f} = ₦{skid_calc:,.
     st.divider()
 
     if st.button("🔢 Calculate Profitability", type="primary", use_container_width=True):
-        # Prepare trip data
-        trip_data = {
-            'trip_id': trip_id,
-            'mother_station': mother_station,
-            'daughter_station': daughter_station,
-            'return_mother_station': return_mother_station,
-            'gas_volume': gas_volume,
-            'gas_price': gas_price,
-            'gas_cost': gas_cost,
-            'plant_cost': plant_cost,
-            'ga_cost': ga_cost,
-            'truck_depreciation': truck_depreciation,
-            'truck_insurance': truck_insurance,
-            'fuel_cost': fuel_cost,
-            'truck_turnaround_time': truck_turnaround_time,
-            'fixed_trucking_cost': fixed_trucking_cost,
-            'variable_trucking_cost': variable_trucking_cost,
-            'round_trip_distance': round_trip_distance,
-            'skid_depreciation': skid_depreciation,
-            'skid_turnaround_time': skid_turnaround_time
-        }
-
         # Calculate
         result = calculate_single_trip(trip_data)
 
@@ -370,12 +494,15 @@ Skid = {skid_depreciation:,.0f} × {skid_turnaround_time:.1f} = ₦{skid_calc:,.
                 ]
             }
 
+            import pandas as pd
+
             df_costs = pd.DataFrame(cost_data)
             st.dataframe(df_costs, use_container_width=True, hide_index=True)
 
         with col2:
             st.subheader("📈 Cost Distribution")
-            fig = create_cost_breakdown_chart(result)
+            fig = get_result_caches()['views'].get_or_compute(
+                canonical_key('cost_breakdown', result), lambda: create_cost_breakdown_chart(result))
             st.plotly_chart(fig, use_container_width=True)
 
 def show_scenario_comparison():
@@ -410,6 +537,10 @@ def show_scenario_comparison():
         # Sort by profit
         sorted_results = sorted(results, key=lambda x: x['profit'], reverse=True)
 
+        # Charts, tables and exports only change when the results do
+        views = get_result_caches()['views'].get_or_compute(
+            canonical_key('comparison', sorted_results), lambda: build_comparison_views(sorted_results))
+
         # Summary cards
         st.subheader("🏆 Scenario Rankings")
         cols = st.columns(len(sorted_results))
@@ -429,33 +560,15 @@ def show_scenario_comparison():
 
         with col1:
             st.subheader("📊 Profit Comparison")
-            fig_profit = create_profit_comparison_chart(sorted_results)
-            st.plotly_chart(fig_profit, use_container_width=True)
+            st.plotly_chart(views['profit_chart'], use_container_width=True)
 
         with col2:
             st.subheader("💹 Profit Margin Comparison")
-            df = pd.DataFrame(sorted_results)
-            fig_margin = go.Figure()
-            fig_margin.add_trace(go.Bar(
-                x=df['scenario_name'],
-                y=df['profit_margin_percent'],
-                text=df['profit_margin_percent'].apply(lambda x: f"{x:.2f}%"),
-                textposition='auto',
-                marker_color='#2ECC71'
-            ))
-            fig_margin.update_layout(
-                title="Profit Margin Comparison",
-                xaxis_title="Scenario",
-                yaxis_title="Profit Margin (%)",
-                height=400,
-                showlegend=False
-            )
-            st.plotly_chart(fig_margin, use_container_width=True)
+            st.plotly_chart(views['margin_chart'], use_container_width=True)
 
         # Detailed comparison
         st.subheader("📈 Detailed Revenue & Cost Comparison")
-        fig_detailed = create_detailed_comparison_chart(sorted_results)
-        st.plotly_chart(fig_detailed, use_container_width=True)
+        st.plotly_chart(views['detailed_chart'], use_container_width=True)
 
         st.divider()
 
@@ -490,24 +603,7 @@ def show_scenario_comparison():
         st.divider()
         st.subheader("💡 Cost Component Impact Analysis")
 
-        prod_diff = abs(best['costs_breakdown']['production_costs'] - worst['costs_breakdown']['production_costs'])
-        truck_exp_diff = abs(best['costs_breakdown']['truck_expenses'] - worst['costs_breakdown']['truck_expenses'])
-        trucking_diff = abs(best['costs_breakdown']['trucking_costs'] - worst['costs_breakdown']['trucking_costs'])
-        skid_diff = abs(best['costs_breakdown']['skid_costs'] - worst['costs_breakdown']['skid_costs'])
-
-        impact_data = {
-            'Cost Component': ['Production Costs', 'Truck Expenses', 'Trucking Costs', 'Skid Costs'],
-            'Difference (NGN)': [prod_diff, truck_exp_diff, trucking_diff, skid_diff],
-            'Impact': [
-                f"{prod_diff/(prod_diff+truck_exp_diff+trucking_diff+skid_diff)*100:.1f}%",
-                f"{truck_exp_diff/(prod_diff+truck_exp_diff+trucking_diff+skid_diff)*100:.1f}%",
-                f"{trucking_diff/(prod_diff+truck_exp_diff+trucking_diff+skid_diff)*100:.1f}%",
-                f"{skid_diff/(prod_diff+truck_exp_diff+trucking_diff+skid_diff)*100:.1f}%"
-            ]
-        }
-
-        df_impact = pd.DataFrame(impact_data)
-        df_impact = df_impact.sort_values('Difference (NGN)', ascending=False)
+        df_impact = views['impact_table']
 
         col1, col2 = st.columns([1, 1])
 
@@ -524,22 +620,7 @@ def show_scenario_comparison():
         st.divider()
         st.subheader("📋 Detailed Comparison Table")
 
-        table_data = []
-        for result in sorted_results:
-            table_data.append({
-                'Scenario': result['scenario_name'],
-                'Mother Station': result['mother_station'],
-                'Revenue': result['revenue'],
-                'Production Costs': result['costs_breakdown']['production_costs'],
-                'Truck Expenses': result['costs_breakdown']['truck_expenses'],
-                'Trucking Costs': result['costs_breakdown']['trucking_costs'],
-                'Skid Costs': result['costs_breakdown']['skid_costs'],
-                'Total Costs': result['costs_breakdown']['total_costs'],
-                'Profit': result['profit'],
-                'Margin %': result['profit_margin_percent']
-            })
-
-        df_table = pd.DataFrame(table_data)
+        df_table = views['comparison_table']
         st.dataframe(df_table, use_container_width=True, hide_index=True)
 
         # Export options
@@ -547,20 +628,18 @@ def show_scenario_comparison():
         col1, col2 = st.columns(2)
 
         with col1:
-            csv = df_table.to_csv(index=False)
             st.download_button(
                 label="📥 Download CSV",
-                data=csv,
+                data=views['csv'],
                 file_name=f"powergas_comparison_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
                 mime="text/csv",
                 use_container_width=True
             )
 
         with col2:
-            json_data = json.dumps(sorted_results, indent=2)
             st.download_button(
                 label="📥 Download JSON",
-                data=json_data,
+                data=views['json'],
                 file_name=f"powergas_comparison_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
                 mime="application/json",
                 use_container_width=True
@@ -0,0 +1,511 @@
+"""
+PowerGas Benchmark Suite
+
+Reproducible local benchmarks for the calculator, comparison report and
+Streamlit app data paths, on synthetic trips/scenarios shaped like
+scenarios.json.
+
+Benchmarks:
+    calculate_trip_profit       Scalar calculate_trip_profit() over N trips
+    compare_scenarios           compare_scenarios() on an N-scenario file
+    generate_comparison_report  generate_comparison_report() on an N-scenario file
+    app_views                   app.build_comparison_views() on N results
+                                (DataFrames, Plotly charts, CSV/JSON exports;
+                                skipped when streamlit/pandas/plotly are missing)
+
+Each benchmark records throughput (items/s), latency (seconds per run, and
+per trip for calculate_trip_profit) and peak Python memory (tracemalloc, in a
+separate untimed pass). Results can be saved as a JSON baseline; later runs
+compared against it flag any benchmark whose throughput dropped, or whose
+peak memory grew, by more than the threshold.
+
+The startup profile (--startup) imports the CLI calculator and the Streamlit
+app in fresh interpreters and reports import time against a budget, the
+slowest modules (-X importtime self time) and any third-party packages the
+import loaded. The calculator must stay stdlib-only.
+
+Synthetic data is seeded, so every run measures the same inputs. Sizes from
+1e3 to 1e7 are accepted; the file-based benchmarks write a scenarios file of
+roughly 0.6 KB per scenario, so 1e6 and above need several GB of disk and RAM.
+
+Usage:
+    python benchmark.py --sizes 1e3 1e4 1e5 --save benchmark_baseline.json
+    python benchmark.py --sizes 1e3 1e4 1e5 --baseline benchmark_baseline.json
+    python benchmark.py --startup
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from profitability_calculator import get_calculator
+
+
+BENCHMARKS = ('calculate_trip_profit', 'compare_scenarios', 'generate_comparison_report', 'app_views')
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+DEFAULT_REPEATS = 3
+
+# Fractional throughput drop / peak memory growth reported as a regression
+DEFAULT_THRESHOLD = 0.2
+
+# Import time budget (ms, excluding interpreter start) per startup module
+STARTUP_BUDGETS_MS = {'profitability_calculator': 50.0, 'app': 1500.0}
+
+# Startup modules that must not load anything outside the standard library
+STDLIB_ONLY = ('profitability_calculator',)
+
+_STARTUP_SCRIPT = """
+import json, sys
+before = set(sys.modules)
+import {module}
+loaded = [sys.modules[name] for name in set(sys.modules) - before]
+print(json.dumps(sorted({{m.__name__.split('.')[0] for m in loaded
+                          if 'site-packages' in (getattr(m, '__file__', None) or '')
+                          or 'dist-packages' in (getattr(m, '__file__', None) or '')}})))
+"""
+
+_MOTHER_STATIONS = (('Ebedei', 450, 120), ('Ore', 470, 125), ('Ajaokuta', 440, 118), ('Oben', 460, 122))
+
+_DAUGHTER_STATIONS = (('Customer Location A', 850), ('Customer Location B', 830), ('Customer Location C', 870))
+
+
+def synthetic_scenarios(count: int, seed: int = 42) -> Iterator[Dict[str, Any]]:
+    """
+    Seeded synthetic scenarios shaped like scenarios.json.
+
+    Rates vary around the scenarios.json values; every Mother Station /
+    Daughter Station pair occurs.
+
+    Args:
+        count (int): Number of scenarios
+        seed (int): Random seed
+
+    Yields:
+        dict: Scenario with name, description and trip_data
+    """
+    rng = random.Random(seed)
+    for i in range(count):
+        mother, gas_cost, plant_cost = rng.choice(_MOTHER_STATIONS)
+        daughter, gas_price = rng.choice(_DAUGHTER_STATIONS)
+        yield {
+            'name': f"Scenario {i + 1}: {mother}",
+            'description': f"Delivery from {mother} Mother Station to {daughter}",
+            'trip_data': {
+                'trip_id': f"BENCH-{i + 1:08d}",
+                'mother_station': mother,
+                'daughter_station': daughter,
+                'gas_volume': rng.randrange(3000, 7001, 50),
+                'gas_price': gas_price + rng.randint(-20, 20),
+                'gas_cost': gas_cost,
+                'plant_cost': plant_cost,
+                'ga_cost': 80,
+                'truck_depreciation': 2500,
+                'truck_insurance': 1200,
+                'fuel_cost': 3500,
+                'truck_turnaround_time': round(rng.uniform(6, 24), 2),
+                'fixed_trucking_cost': 180,
+                'variable_trucking_cost': 45,
+                'round_trip_distance': round(rng.uniform(60, 600), 1),
+                'skid_depreciation': 800,
+                'skid_turnaround_time': round(rng.uniform(8, 30), 2),
+            },
+        }
+
+
+def write_scenarios_file(path: str, count: int, seed: int = 42):
+    """
+    Write a synthetic scenarios.json-style file, one scenario at a time.
+
+    Args:
+        path (str): Output path
+        count (int): Number of scenarios
+        seed (int): Random seed
+    """
+    with open(path, 'w') as f:
+        f.write('{"description": "PowerGas benchmark scenarios", "scenarios": [\n')
+        for i, scenario in enumerate(synthetic_scenarios(count, seed)):
+            f.write((',\n' if i else '') + json.dumps(scenario))
+        f.write('\n]}\n')
+
+
+def _measure(run: Callable[[], Any], repeats: int) -> Dict[str, Any]:
+    """Best/median seconds over the timed repeats, then tracemalloc peak in one untimed pass."""
+    run()  # warm-up: caches, kernel compilation, page cache for scenario files
+    seconds = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        run()
+        seconds.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {'seconds_best': min(seconds), 'seconds_median': statistics.median(seconds), 'peak_memory_bytes': peak}
+
+
+def bench_calculate_trip_profit(size: int, repeats: int, seed: int, workdir: str) -> Dict[str, Any]:
+    """Scalar calculate_trip_profit() per trip, with per-call latency percentiles."""
+    calculator = get_calculator()
+    trips = [scenario['trip_data'] for scenario in synthetic_scenarios(size, seed)]
+    latencies: List[float] = []
+
+    def run():
+        latencies.clear()
+        clock = time.perf_counter
+        for trip in trips:
+            started = clock()
+            calculator.calculate_trip_profit(trip)
+            latencies.append(clock() - started)
+
+    measured = _measure(run, repeats)
+    latencies.sort()
+    measured['latency_p50_us'] = round(latencies[len(latencies) // 2] * 1e6, 3)
+    measured['latency_p99_us'] = round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1e6, 3)
+    return measured
+
+
+def _scenarios_file(size: int, seed: int, workdir: str) -> str:
+    path = os.path.join(workdir, f"scenarios_{size}_{seed}.json")
+    if not os.path.exists(path):
+        write_scenarios_file(path, size, seed)
+    return path
+
+
+def bench_compare_scenarios(size: int, repeats: int, seed: int, workdir: str) -> Dict[str, Any]:
+    """compare_scenarios() including reading the scenarios file."""
+    path = _scenarios_file(size, seed, workdir)
+    return _measure(lambda: get_calculator().compare_scenarios(path), repeats)
+
+
+def bench_generate_comparison_report(size: int, repeats: int, seed: int, workdir: str) -> Dict[str, Any]:
+    """generate_comparison_report() including scenario evaluation."""
+    path = _scenarios_file(size, seed, workdir)
+    return _measure(lambda: get_calculator().generate_comparison_report(path), repeats)
+
+
+def bench_app_views(size: int, repeats: int, seed: int, workdir: str) -> Dict[str, Any]:
+    """app.build_comparison_views() on results ranked by profit, as on the comparison page."""
+    import app
+
+    calculator = get_calculator()
+    results = calculator.evaluate_scenarios(list(synthetic_scenarios(size, seed)))
+    ranked = sorted(results, key=lambda x: x['profit'], reverse=True)
+    return _measure(lambda: app.build_comparison_views(ranked), repeats)
+
+
+_RUNNERS = {
+    'calculate_trip_profit': bench_calculate_trip_profit,
+    'compare_scenarios': bench_compare_scenarios,
+    'generate_comparison_report': bench_generate_comparison_report,
+    'app_views': bench_app_views,
+}
+
+
+def _best_process_ms(code: str, runs: int) -> float:
+    here = os.path.dirname(os.path.abspath(__file__))
+    best = float('inf')
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], cwd=here, capture_output=True)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def startup_profile(module: str, runs: int = 5, top: int = 10) -> Dict[str, Any]:
+    """
+    Cold import profile of a module in fresh interpreters.
+
+    Args:
+        module (str): Module to import (e.g. 'profitability_calculator', 'app')
+        runs (int): Interpreter launches; the fastest is reported
+        top (int): Slowest modules to list
+
+    Returns:
+        dict: module, import_ms (-X importtime cumulative), process_ms and
+            interpreter_ms (wall time with and without the import),
+            budget_ms, within_budget, third_party (packages loaded from
+            site-packages), slowest ([{module, self_ms}]); or module and
+            skipped with a reason when the import fails
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    import_us, self_us, third_party = float('inf'), {}, []
+    for _ in range(runs):
+        completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', _STARTUP_SCRIPT.format(module=module)],
+                                   cwd=here, capture_output=True, text=True)
+        if completed.returncode:
+            reason = completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else 'import failed'
+            return {'module': module, 'skipped': reason}
+        third_party = json.loads(completed.stdout.strip().splitlines()[-1])
+
+        entries = []
+        for line in completed.stderr.splitlines():
+            if line.startswith('import time:') and 'self [us]' not in line:
+                own, cumulative, name = line[len('import time:'):].split('|')
+                entries.append((int(own), int(cumulative), name.rstrip()))
+        target = next(i for i, (_, _, name) in enumerate(entries) if name.strip() == module)
+        if entries[target][1] < import_us:
+            # Modules nested under the target are listed just before it, indented deeper
+            indent = len(entries[target][2]) - len(entries[target][2].lstrip())
+            self_us = {module: entries[target][0]}
+            for own, _, name in reversed(entries[:target]):
+                if len(name) - len(name.lstrip()) <= indent:
+                    break
+                self_us[name.strip()] = self_us.get(name.strip(), 0) + own
+            import_us = entries[target][1]
+
+    slowest = sorted(self_us.items(), key=lambda item: item[1], reverse=True)[:top]
+    budget = STARTUP_BUDGETS_MS.get(module)
+    import_ms = round(import_us / 1000, 2)
+    return {
+        'module': module,
+        'import_ms': import_ms,
+        'process_ms': round(_best_process_ms(f"import {module}", runs), 2),
+        'interpreter_ms': round(_best_process_ms('pass', runs), 2),
+        'budget_ms': budget,
+        'within_budget': budget is None or import_ms <= budget,
+        'third_party': third_party,
+        'slowest': [{'module': name, 'self_ms': round(us / 1000, 2)} for name, us in slowest],
+    }
+
+
+def startup_profiles(modules: Sequence[str] = tuple(STARTUP_BUDGETS_MS), runs: int = 5) -> List[Dict[str, Any]]:
+    """
+    startup_profile() for each module, with stdlib-only violations flagged.
+
+    Args:
+        modules (sequence): Modules to profile
+        runs (int): Interpreter launches per module
+
+    Returns:
+        list: startup_profile() results; a STDLIB_ONLY module that loaded a
+            third-party package has within_budget False
+    """
+    profiles = []
+    for module in modules:
+        profile = startup_profile(module, runs)
+        if module in STDLIB_ONLY and profile.get('third_party'):
+            profile['within_budget'] = False
+        profiles.append(profile)
+    return profiles
+
+
+def environment() -> Dict[str, Any]:
+    """
+    Machine details stored with a baseline.
+
+    Returns:
+        dict: python, implementation, platform, machine, cpu_count and numpy versions
+    """
+    try:
+        import numpy as np
+        numpy_version = np.__version__
+    except ImportError:
+        numpy_version = None
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'numpy': numpy_version,
+    }
+
+
+def run_benchmarks(names: Sequence[str] = BENCHMARKS, sizes: Sequence[int] = DEFAULT_SIZES,
+                   repeats: int = DEFAULT_REPEATS, seed: int = 42,
+                   workdir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Run benchmarks at each size.
+
+    Args:
+        names (sequence): Benchmarks to run (see BENCHMARKS)
+        sizes (sequence): Trips/scenarios per benchmark
+        repeats (int): Timed runs per benchmark (the best is reported)
+        seed (int): Synthetic data seed
+        workdir (str): Directory for generated scenario files (default: a
+            temporary directory removed afterwards)
+
+    Returns:
+        dict: generated, environment, settings and results keyed by
+            '<benchmark>@<size>' (throughput_per_second, seconds_best,
+            seconds_median, peak_memory_bytes; or skipped with a reason)
+    """
+    unknown = [name for name in names if name not in _RUNNERS]
+    if unknown:
+        raise KeyError(f"Unknown benchmark(s): {', '.join(unknown)} (expected {', '.join(BENCHMARKS)})")
+    if repeats < 1:
+        raise ValueError("repeats must be at least 1")
+
+    temporary = None
+    if workdir is None:
+        temporary = tempfile.TemporaryDirectory(prefix='powergas_bench_')
+        workdir = temporary.name
+
+    results = {}
+    try:
+        for name in names:
+            for size in sizes:
+                try:
+                    measured = _RUNNERS[name](size, repeats, seed, workdir)
+                except ImportError as e:
+                    results[f"{name}@{size}"] = {'skipped': f"missing dependency: {e.name}"}
+                    continue
+                measured['throughput_per_second'] = round(size / measured['seconds_best'], 1)
+                measured['seconds_best'] = round(measured['seconds_best'], 6)
+                measured['seconds_median'] = round(measured['seconds_median'], 6)
+                results[f"{name}@{size}"] = measured
+    finally:
+        if temporary is not None:
+            temporary.cleanup()
+
+    return {
+        'generated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'environment': environment(),
+        'settings': {'repeats': repeats, 'seed': seed},
+        'results': results,
+    }
+
+
+def compare_to_baseline(current: Dict[str, Any], baseline: Dict[str, Any],
+                        threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    Compare a run against a saved baseline.
+
+    Only benchmarks measured in both runs are compared. Startup profiles are
+    compared on import_ms (shown as a negative throughput_change when the
+    import got slower).
+
+    Args:
+        current (dict): run_benchmarks() output
+        baseline (dict): Earlier run_benchmarks() output
+        threshold (float): Fractional throughput drop or peak memory growth
+            treated as a regression (0.2 = 20%)
+
+    Returns:
+        list: One entry per compared benchmark with throughput_change and
+            memory_change (fractions) and regression (bool)
+    """
+    comparisons = []
+    for key, now in current['results'].items():
+        before = baseline.get('results', {}).get(key)
+        if before is None or 'skipped' in now or 'skipped' in before:
+            continue
+        throughput_change = now['throughput_per_second'] / before['throughput_per_second'] - 1
+        memory_change = (now['peak_memory_bytes'] / before['peak_memory_bytes'] - 1
+                         if before['peak_memory_bytes'] else 0.0)
+        comparisons.append({
+            'benchmark': key,
+            'throughput_change': round(throughput_change, 4),
+            'memory_change': round(memory_change, 4),
+            'regression': throughput_change < -threshold or memory_change > threshold,
+        })
+
+    earlier = {profile['module']: profile for profile in baseline.get('startup', []) if 'skipped' not in profile}
+    for profile in current.get('startup', []):
+        before = earlier.get(profile['module'])
+        if before is None or 'skipped' in profile:
+            continue
+        throughput_change = before['import_ms'] / profile['import_ms'] - 1
+        comparisons.append({
+            'benchmark': f"startup:{profile['module']}",
+            'throughput_change': round(throughput_change, 4),
+            'memory_change': 0.0,
+            'regression': throughput_change < -threshold or not profile['within_budget'],
+        })
+    return comparisons
+
+
+def main():
+    """
+    Command-line entry point for the benchmark suite.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the calculator, report and app data paths")
+    parser.add_argument('--benchmarks', nargs='+', choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument('--sizes', nargs='+', type=lambda value: int(float(value)), default=list(DEFAULT_SIZES),
+                        help="Trips/scenarios per benchmark, e.g. 1e3 1e5 (default: 1e3 1e4 1e5)")
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workdir', help="Keep generated scenario files here for reuse")
+    parser.add_argument('--save', help="Write results as a JSON baseline")
+    parser.add_argument('--baseline', help="Flag regressions against this JSON baseline")
+    parser.add_argument('--startup', action='store_true',
+                        help="Profile cold imports of the CLI and app instead of the throughput benchmarks")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Throughput drop / memory growth flagged as a regression (default: {DEFAULT_THRESHOLD})")
+    args = parser.parse_args()
+
+    print("PowerGas Benchmark Suite")
+    print("="*80)
+
+    if args.startup:
+        report = {
+            'generated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'environment': environment(),
+            'startup': startup_profiles(),
+            'results': {},
+        }
+        for profile in report['startup']:
+            if 'skipped' in profile:
+                print(f"{profile['module']}: skipped ({profile['skipped']})\n")
+                continue
+            status = "within budget" if profile['within_budget'] else "OVER BUDGET"
+            print(f"{profile['module']}: {profile['import_ms']:.1f} ms import "
+                  f"(budget {profile['budget_ms']:.0f} ms, {status}); "
+                  f"{profile['process_ms']:.1f} ms process, {profile['interpreter_ms']:.1f} ms bare interpreter")
+            print(f"  Third-party packages: {', '.join(profile['third_party']) or 'none'}")
+            for entry in profile['slowest']:
+                print(f"  {entry['module']:<40}{entry['self_ms']:>8.2f} ms")
+            print()
+    else:
+        report = run_benchmarks(args.benchmarks, args.sizes, args.repeats, args.seed, args.workdir)
+
+        print(f"{'Benchmark':<38}{'Items/s':>14}{'Best (s)':>12}{'Peak MB':>10}")
+        print("-"*80)
+        for key, result in report['results'].items():
+            if 'skipped' in result:
+                print(f"{key:<38}  skipped ({result['skipped']})")
+                continue
+            print(f"{key:<38}{result['throughput_per_second']:>14,.0f}{result['seconds_best']:>12.4f}"
+                  f"{result['peak_memory_bytes'] / 1e6:>10.1f}")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline saved to: {args.save}")
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        if baseline.get('environment') != report['environment']:
+            print("\nNote: baseline was recorded on a different environment")
+        comparisons = compare_to_baseline(report, baseline, args.threshold)
+        print(f"\nAgainst {args.baseline} (threshold {args.threshold:.0%}):")
+        for comparison in comparisons:
+            flag = "REGRESSION" if comparison['regression'] else "ok"
+            print(f"  {comparison['benchmark']:<38}throughput {comparison['throughput_change']:+.1%}   "
+                  f"memory {comparison['memory_change']:+.1%}   {flag}")
+        if any(comparison['regression'] for comparison in comparisons):
+            sys.exit(1)
+
+    if not all(profile.get('within_budget', True) for profile in report.get('startup', [])):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
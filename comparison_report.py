@@ -0,0 +1,240 @@
+"""
+PowerGas Comparison Report Writer
+
+Writes the scenario comparison report section by section to a file handle
+instead of building it as one string, so reports on 100k scenarios finish in
+seconds and the report itself is never held in memory.
+
+Formats:
+    text   The report from generate_comparison_report(): ranked summary,
+           detailed breakdown and comparative analysis
+    csv    One row per scenario in rank order
+    json   {"generated", "scenario_count", "scenarios": [...],
+           "comparative_analysis": {...}}, streamed
+
+Options:
+    top_n          Detailed breakdown for the N most profitable scenarios only
+                   (csv/json: only the top N rows)
+    summary_only   No detailed breakdown (csv/json: rank, name, route, profit
+                   and margin columns only)
+
+Only the standard library is used, like the command-line calculator.
+
+Usage:
+    python comparison_report.py scenarios.json --output report.txt --top 20
+    python comparison_report.py scenarios.json --output report.csv --format csv
+"""
+
+import argparse
+import csv
+import json
+import sys
+from datetime import datetime
+from typing import Any, Dict, List, Optional, TextIO
+
+from profitability_calculator import get_calculator, load_config
+
+
+FORMATS = ('text', 'csv', 'json')
+
+COST_FIELDS = ('production_costs', 'truck_expenses', 'trucking_costs', 'skid_costs', 'total_costs')
+
+SUMMARY_COLUMNS = ('rank', 'scenario_name', 'mother_station', 'daughter_station', 'profit', 'profit_margin_percent')
+
+DETAIL_COLUMNS = (('rank', 'scenario_name', 'description', 'trip_id', 'mother_station', 'daughter_station', 'revenue')
+                  + COST_FIELDS + ('profit', 'profit_margin_percent'))
+
+_IMPACT_LABELS = (('production_costs', 'Production Costs'), ('truck_expenses', 'Truck Expenses'),
+                  ('trucking_costs', 'Trucking Costs'), ('skid_costs', 'Skid Costs'))
+
+
+def comparative_analysis(best: Dict[str, Any], worst: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Best vs worst scenario differences.
+
+    Args:
+        best (dict): Most profitable scenario result
+        worst (dict): Least profitable scenario result
+
+    Returns:
+        dict: best/worst names, profit and margin difference, per-component
+            cost differences and the component with the biggest impact
+    """
+    differences = {field: best['costs_breakdown'][field] - worst['costs_breakdown'][field]
+                   for field, _ in _IMPACT_LABELS}
+    biggest = max(_IMPACT_LABELS, key=lambda item: abs(differences[item[0]]))
+    return {
+        'best_scenario': best['scenario_name'],
+        'worst_scenario': worst['scenario_name'],
+        'profit_difference': best['profit'] - worst['profit'],
+        'margin_difference': best['profit_margin_percent'] - worst['profit_margin_percent'],
+        'cost_differences': differences,
+        'biggest_impact': biggest[1],
+        'biggest_impact_amount': abs(differences[biggest[0]]),
+    }
+
+
+def _flat_row(rank: int, result: Dict[str, Any]) -> Dict[str, Any]:
+    row = {'rank': rank, 'scenario_name': result['scenario_name'], 'description': result.get('description', ''),
+           'trip_id': result['trip_id'], 'mother_station': result['mother_station'],
+           'daughter_station': result['daughter_station'], 'revenue': result['revenue']}
+    row.update(result['costs_breakdown'])
+    row['profit'] = result['profit']
+    row['profit_margin_percent'] = result['profit_margin_percent']
+    return row
+
+
+def _write_text(out: TextIO, ranked: List[Dict[str, Any]], generated: str,
+                top_n: Optional[int], summary_only: bool):
+    rule = "="*80 + "\n"
+    out.write("\n" + rule)
+    out.write("POWERGAS PROFITABILITY COMPARISON REPORT\n")
+    out.write(f"Generated: {generated}\n")
+    out.write(rule + "\n")
+
+    out.write("SUMMARY (Ranked by Profit)\n")
+    out.write("-"*80 + "\n")
+    out.write(f"{'Rank':<6}{'Scenario':<25}{'Profit (NGN)':<18}{'Margin %':<12}{'Route'}\n")
+    out.write("-"*80 + "\n")
+    out.writelines(
+        f"{idx:<6}{result['scenario_name']:<25}{result['profit']:>15,.2f}   {result['profit_margin_percent']:>8.2f}%   "
+        f"{result['mother_station']} → {result['daughter_station']}\n"
+        for idx, result in enumerate(ranked, 1))
+
+    if not summary_only:
+        out.write("\n" + rule)
+        out.write("DETAILED BREAKDOWN" + (f" (Top {top_n})" if top_n is not None and top_n < len(ranked) else '') + "\n")
+        out.write(rule)
+        detailed = ranked if top_n is None else ranked[:top_n]
+        for idx, result in enumerate(detailed, 1):
+            costs = result['costs_breakdown']
+            out.write(
+                f"\n{idx}. {result['scenario_name']}\n"
+                f"   Description: {result['description']}\n"
+                f"   Route: {result['mother_station']} → {result['daughter_station']}\n"
+                f"   -" + "-"*75 + "\n"
+                f"   Revenue:                    NGN {result['revenue']:>15,.2f}\n"
+                f"   Costs:\n"
+                f"     - Production Costs:       NGN {costs['production_costs']:>15,.2f}\n"
+                f"     - Truck Expenses:         NGN {costs['truck_expenses']:>15,.2f}\n"
+                f"     - Trucking Costs:         NGN {costs['trucking_costs']:>15,.2f}\n"
+                f"     - Skid Costs:             NGN {costs['skid_costs']:>15,.2f}\n"
+                f"   Total Costs:                NGN {costs['total_costs']:>15,.2f}\n"
+                f"   " + "-"*75 + "\n"
+                f"   PROFIT:                     NGN {result['profit']:>15,.2f}\n"
+                f"   Profit Margin:              {result['profit_margin_percent']:>15.2f}%\n")
+
+    if len(ranked) > 1:
+        analysis = comparative_analysis(ranked[0], ranked[-1])
+        differences = analysis['cost_differences']
+        out.write("\n" + rule)
+        out.write("COMPARATIVE ANALYSIS\n")
+        out.write(rule + "\n")
+        out.write(f"Best Scenario:  {analysis['best_scenario']}\n")
+        out.write(f"Worst Scenario: {analysis['worst_scenario']}\n\n")
+        out.write(f"Profit Difference:       NGN {analysis['profit_difference']:>15,.2f}\n")
+        out.write(f"Margin Difference:       {analysis['margin_difference']:>15.2f} percentage points\n\n")
+        out.write("Cost Component Impact Analysis:\n")
+        out.write("-"*80 + "\n")
+        out.write(f"Production Costs Difference:    NGN {differences['production_costs']:>15,.2f}\n")
+        out.write(f"Truck Expenses Difference:      NGN {differences['truck_expenses']:>15,.2f}\n")
+        out.write(f"Trucking Costs Difference:      NGN {differences['trucking_costs']:>15,.2f}\n")
+        out.write(f"Skid Costs Difference:          NGN {differences['skid_costs']:>15,.2f}\n")
+        out.write(f"\nBiggest Cost Impact: {analysis['biggest_impact']} "
+                  f"(NGN {analysis['biggest_impact_amount']:,.2f})\n")
+
+    out.write("\n" + rule)
+
+
+def _write_csv(out: TextIO, ranked: List[Dict[str, Any]], top_n: Optional[int], summary_only: bool):
+    columns = SUMMARY_COLUMNS if summary_only else DETAIL_COLUMNS
+    writer = csv.writer(out)
+    writer.writerow(columns)
+    rows = ranked if top_n is None else ranked[:top_n]
+    writer.writerows([row[column] for column in columns]
+                     for row in (_flat_row(rank, result) for rank, result in enumerate(rows, 1)))
+
+
+def _write_json(out: TextIO, ranked: List[Dict[str, Any]], generated: str,
+                top_n: Optional[int], summary_only: bool):
+    columns = SUMMARY_COLUMNS if summary_only else DETAIL_COLUMNS
+    out.write('{"generated": ' + json.dumps(generated) + ', "scenario_count": ' + str(len(ranked)))
+    out.write(', "scenarios": [')
+    rows = ranked if top_n is None else ranked[:top_n]
+    for rank, result in enumerate(rows, 1):
+        row = _flat_row(rank, result)
+        out.write((', ' if rank > 1 else '') + json.dumps({column: row[column] for column in columns}))
+    analysis = comparative_analysis(ranked[0], ranked[-1]) if len(ranked) > 1 else None
+    out.write('], "comparative_analysis": ' + json.dumps(analysis) + '}\n')
+
+
+def write_comparison_report(out: TextIO, results: List[Dict[str, Any]], fmt: str = 'text',
+                            top_n: Optional[int] = None, summary_only: bool = False,
+                            generated: Optional[str] = None) -> int:
+    """
+    Rank scenario results by profit and write the report incrementally.
+
+    Args:
+        out (TextIO): Open file handle (text mode; newline='' for csv)
+        results (list): evaluate_scenarios() results (scenario_name,
+            description and calculate_trip_profit() fields)
+        fmt (str): 'text', 'csv' or 'json'
+        top_n (int): Detail only the N most profitable scenarios
+        summary_only (bool): Skip the detailed breakdown
+        generated (str): Timestamp shown in the report (default: now)
+
+    Returns:
+        int: Number of scenarios reported
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown report format '{fmt}' (expected one of {', '.join(FORMATS)})")
+    if top_n is not None and top_n < 0:
+        raise ValueError("top_n must not be negative")
+
+    if not results:
+        if fmt == 'text':
+            out.write("No scenarios found.")
+        elif fmt == 'json':
+            _write_json(out, [], generated or datetime.now().strftime('%Y-%m-%d %H:%M:%S'), top_n, summary_only)
+        else:
+            _write_csv(out, [], top_n, summary_only)
+        return 0
+
+    ranked = sorted(results, key=lambda x: x['profit'], reverse=True)
+    generated = generated or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    if fmt == 'text':
+        _write_text(out, ranked, generated, top_n, summary_only)
+    elif fmt == 'csv':
+        _write_csv(out, ranked, top_n, summary_only)
+    else:
+        _write_json(out, ranked, generated, top_n, summary_only)
+    return len(ranked)
+
+
+def main():
+    """
+    Command-line entry point for scenario comparison reports.
+    """
+    parser = argparse.ArgumentParser(description="Write a scenario comparison report")
+    parser.add_argument('scenarios_file', nargs='?', default='scenarios.json')
+    parser.add_argument('--output', '-o', help="Report file (default: stdout)")
+    parser.add_argument('--format', choices=FORMATS, default='text')
+    parser.add_argument('--top', type=int, help="Detailed breakdown (csv/json: rows) for the top N scenarios only")
+    parser.add_argument('--summary-only', action='store_true', help="Ranked summary without the detailed breakdown")
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes for evaluating scenarios")
+    args = parser.parse_args()
+
+    scenarios = load_config(args.scenarios_file)['scenarios']
+    results = get_calculator().evaluate_scenarios(scenarios, args.workers)
+
+    if args.output:
+        with open(args.output, 'w', newline='' if args.format == 'csv' else None) as f:
+            count = write_comparison_report(f, results, args.format, args.top, args.summary_only)
+        print(f"Reported {count:,} scenarios to {args.output}")
+    else:
+        write_comparison_report(sys.stdout, results, args.format, args.top, args.summary_only)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,393 @@
+"""
+PowerGas Contractor Tariffs
+
+Contractor-specific trucking costs instead of (FTC + VTC) × RTD for everyone:
+Diadem is distance-based (NGN/km), IMI is daily-based (NGN/day), and VTC only
+applies beyond thresholds. Each contractor's tariff in contractor_tariffs.json
+is a set of piecewise bands:
+
+    fixed_bands      Marginal rates over RTD (basis 'km') or operation days
+                     (basis 'day')
+    variable_bands   Marginal NGN/km rates over RTD ('km') or over km per
+                     operation day ('day', charged for every day)
+
+Bands are precomputed into breakpoints with the cumulative cost at each one,
+so a band cost is cumulative[k] + rate[k] × (quantity - start[k]) with k found
+by bisect for one trip, or by one searchsorted() over every contractor's
+breakpoints (on a contractor × quantity composite key) for a whole batch - no
+per-trip branching. The trucking cost then feeds the 'contractor_tariff' cost
+model, and results report the fixed/variable split per trip and per
+contractor.
+
+Trips name their contractor in a 'contractor' field (default_contractor when
+missing).
+
+Usage:
+    python contractor_tariffs.py trips.csv --tariffs contractor_tariffs.json
+"""
+
+import argparse
+import json
+import math
+from bisect import bisect_right
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from profitability_calculator import ProfitabilityCalculator, get_calculator, round2
+
+
+TARIFF_COST_MODEL = 'contractor_tariff'
+
+BASES = ('km', 'day')
+
+# Trucking cost split added to results
+SPLIT_FIELDS = ('trucking_fixed_costs', 'trucking_variable_costs')
+
+
+class _Bands:
+    """Piecewise marginal rates with precomputed cumulative cost at each breakpoint."""
+
+    def __init__(self, bands: Sequence[Mapping[str, float]], context: str):
+        if not bands:
+            raise ValueError(f"{context}: at least one band is required")
+        self.starts = [float(band['from']) for band in bands]
+        self.rates = [float(band['rate']) for band in bands]
+        if self.starts[0] != 0:
+            raise ValueError(f"{context}: the first band must start at 0")
+        if any(later <= earlier for earlier, later in zip(self.starts, self.starts[1:])):
+            raise ValueError(f"{context}: band thresholds must increase")
+
+        self.cumulative = [0.0]
+        for i in range(1, len(self.starts)):
+            self.cumulative.append(self.cumulative[-1] + self.rates[i - 1] * (self.starts[i] - self.starts[i - 1]))
+
+    def cost(self, quantity: float) -> float:
+        k = max(bisect_right(self.starts, quantity) - 1, 0)
+        return self.cumulative[k] + self.rates[k] * (quantity - self.starts[k])
+
+
+class _StackedBands:
+    """Every contractor's bands on one sorted composite key for vectorized lookup."""
+
+    def __init__(self, bands: Sequence[_Bands]):
+        import numpy as np
+
+        # Quantities are clipped below the span for the lookup only, which
+        # still lands in the contractor's last band
+        self.span = max(band.starts[-1] for band in bands) + 1.0
+        self.keys = np.array([code * self.span + start for code, band in enumerate(bands) for start in band.starts])
+        self.starts = np.array([start for band in bands for start in band.starts])
+        self.rates = np.array([rate for band in bands for rate in band.rates])
+        self.cumulative = np.array([value for band in bands for value in band.cumulative])
+
+    def cost(self, codes: Any, quantity: Any) -> Any:
+        import numpy as np
+
+        lookup = codes * self.span + np.clip(quantity, 0.0, self.span - 1.0)
+        k = np.searchsorted(self.keys, lookup, side='right') - 1
+        return self.cumulative[k] + self.rates[k] * (quantity - self.starts[k])
+
+
+class TariffTable:
+    """
+    Contractor trucking tariffs with scalar and vectorized evaluation.
+
+    Attributes:
+        contractors (tuple): Contractor names, in table order
+        bases (dict): Contractor -> 'km' or 'day'
+        default_contractor (str): Contractor for trips without one (or None)
+    """
+
+    def __init__(self, contractors: Mapping[str, Mapping[str, Any]], default_contractor: Optional[str] = None):
+        """
+        Validate and precompute the tariff bands.
+
+        Args:
+            contractors (Mapping): Contractor -> {'basis', 'fixed_bands',
+                'variable_bands'}; bands are [{'from', 'rate'}, ...]
+            default_contractor (str): Contractor for trips without one
+        """
+        if not contractors:
+            raise ValueError("At least one contractor tariff is required")
+        if default_contractor is not None and default_contractor not in contractors:
+            raise KeyError(f"Default contractor '{default_contractor}' has no tariff")
+
+        self.contractors = tuple(contractors)
+        self.default_contractor = default_contractor
+        self.bases = {}
+        self._fixed = {}
+        self._variable = {}
+        for name, tariff in contractors.items():
+            basis = tariff.get('basis', 'km')
+            if basis not in BASES:
+                raise ValueError(f"{name}: basis must be one of {', '.join(BASES)}, not '{basis}'")
+            self.bases[name] = basis
+            self._fixed[name] = _Bands(tariff.get('fixed_bands', []), f"{name}.fixed_bands")
+            self._variable[name] = _Bands(tariff.get('variable_bands', [{'from': 0, 'rate': 0}]),
+                                          f"{name}.variable_bands")
+        self._index = {name: code for code, name in enumerate(self.contractors)}
+        self._stacked = None
+
+    @classmethod
+    def from_file(cls, path: str = 'contractor_tariffs.json') -> 'TariffTable':
+        """
+        Load a tariff table.
+
+        Args:
+            path (str): Path to the tariffs JSON file
+
+        Returns:
+            TariffTable: The table
+        """
+        with open(path, 'r') as f:
+            config = json.load(f)
+        return cls(config['contractors'], config.get('default_contractor'))
+
+    def _contractor(self, name: Any) -> str:
+        if name is None or name == '':
+            if self.default_contractor is None:
+                raise KeyError("Trip has no contractor and the tariff table has no default_contractor")
+            return self.default_contractor
+        if name not in self._index:
+            raise KeyError(f"No tariff for contractor '{name}' (available: {', '.join(self.contractors)})")
+        return name
+
+    def trucking_split(self, trip_data: Mapping[str, Any]) -> Dict[str, Any]:
+        """
+        Trucking cost of one trip under its contractor's tariff.
+
+        Args:
+            trip_data (Mapping): Trip with round_trip_distance, contractor and,
+                for day-based contractors, operation_days or truck_turnaround_time
+
+        Returns:
+            dict: contractor, trucking_fixed_costs, trucking_variable_costs and
+                trucking_costs (unrounded)
+        """
+        contractor = self._contractor(trip_data.get('contractor'))
+        distance = float(trip_data['round_trip_distance'])
+        fixed, variable = self._fixed[contractor], self._variable[contractor]
+
+        if self.bases[contractor] == 'km':
+            fixed_costs = fixed.cost(distance)
+            variable_costs = variable.cost(distance)
+        else:
+            days = trip_data.get('operation_days')
+            if days is None or (isinstance(days, float) and math.isnan(days)):
+                days = math.ceil(float(trip_data['truck_turnaround_time']) / 24)
+            days = float(days)
+            fixed_costs = fixed.cost(days)
+            variable_costs = days * variable.cost(distance / days) if days > 0 else 0.0
+
+        return {
+            'contractor': contractor,
+            'trucking_fixed_costs': fixed_costs,
+            'trucking_variable_costs': variable_costs,
+            'trucking_costs': fixed_costs + variable_costs,
+        }
+
+    def trucking_split_columns(self, contractor: Sequence[Any], round_trip_distance: Sequence[float],
+                               truck_turnaround_time: Optional[Sequence[float]] = None,
+                               operation_days: Optional[Sequence[float]] = None) -> Dict[str, Any]:
+        """
+        Trucking costs for a batch of trips in one vectorized pass.
+
+        Args:
+            contractor (sequence): Contractor per trip (empty/None: default)
+            round_trip_distance (sequence): RTD in km
+            truck_turnaround_time (sequence): TTAT in hours (for operation
+                days where operation_days is missing or NaN)
+            operation_days (sequence): Operation days (optional)
+
+        Returns:
+            dict: contractor_code (index into contractors) and unrounded
+                trucking_fixed_costs, trucking_variable_costs, trucking_costs arrays
+        """
+        import numpy as np
+        from profitability_matrix import factorize
+
+        if self._stacked is None:
+            self._stacked = (_StackedBands([self._fixed[name] for name in self.contractors]),
+                             _StackedBands([self._variable[name] for name in self.contractors]),
+                             np.array([self.bases[name] == 'day' for name in self.contractors]))
+        fixed, variable, daily_basis = self._stacked
+
+        names = ['' if name is None else name for name in contractor]
+        labels, codes = factorize(names) if names else ([], np.zeros(0, dtype=np.int64))
+        codes = np.array([self._index[self._contractor(label or None)] for label in labels],
+                         dtype=np.int64)[codes] if labels else codes.astype(np.int64)
+
+        distance = np.asarray(round_trip_distance, dtype=np.float64)
+        daily = daily_basis[codes]
+        days = np.full(len(distance), np.nan)
+        if operation_days is not None:
+            days = np.asarray(operation_days, dtype=np.float64)
+        if daily.any() and np.isnan(days[daily]).any():
+            if truck_turnaround_time is None:
+                raise KeyError("truck_turnaround_time is required for day-based contractors without operation_days")
+            days = np.where(np.isnan(days), -((-np.asarray(truck_turnaround_time, dtype=np.float64) / 24) // 1), days)
+
+        fixed_costs = fixed.cost(codes, np.where(daily, days, distance))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            per_day = np.where(days > 0, distance / days, 0.0)
+        variable_costs = np.where(daily, np.where(days > 0, days * variable.cost(codes, per_day), 0.0),
+                                  variable.cost(codes, distance))
+
+        return {
+            'contractor_code': codes,
+            'trucking_fixed_costs': fixed_costs,
+            'trucking_variable_costs': variable_costs,
+            'trucking_costs': fixed_costs + variable_costs,
+        }
+
+    def calculate_trip_profit(self, trip_data: Mapping[str, Any],
+                              calculator: Optional[ProfitabilityCalculator] = None) -> Dict[str, Any]:
+        """
+        calculate_trip_profit() with trucking from the contractor's tariff.
+
+        Args:
+            trip_data (Mapping): trip_data plus contractor (FTC/VTC are not used)
+            calculator (ProfitabilityCalculator): Calculator on a model that
+                reads contractor_trucking_costs (default: 'contractor_tariff')
+
+        Returns:
+            dict: calculate_trip_profit() result with 'contractor' and the
+                fixed/variable split added to costs_breakdown
+        """
+        calculator = calculator or get_calculator(TARIFF_COST_MODEL)
+        split = self.trucking_split(trip_data)
+        result = calculator.calculate_trip_profit({**trip_data, 'contractor_trucking_costs': split['trucking_costs']})
+        result['contractor'] = split['contractor']
+        for field in SPLIT_FIELDS:
+            result['costs_breakdown'][field] = round(split[field], 2)
+        return result
+
+    def trip_columns(self, trips: List[Mapping[str, Any]],
+                     calculator: Optional[ProfitabilityCalculator] = None) -> Dict[str, Any]:
+        """
+        calculator.trip_columns() plus the columns the tariff lookup needs.
+
+        Args:
+            trips (list): trip_data dicts with contractor
+            calculator (ProfitabilityCalculator): Calculator (default: 'contractor_tariff')
+
+        Returns:
+            dict: calculate_batch() input columns with contractor,
+                round_trip_distance and operation_days (NaN where missing)
+        """
+        import numpy as np
+
+        calculator = calculator or get_calculator(TARIFF_COST_MODEL)
+        columns = calculator.trip_columns(trips, provided=('contractor_trucking_costs',))
+        columns['contractor'] = [trip.get('contractor') for trip in trips]
+        for field, required in (('round_trip_distance', True), ('truck_turnaround_time', False),
+                                ('operation_days', False)):
+            if field in columns:
+                continue
+            column = np.full(len(trips), np.nan)
+            for position, trip in enumerate(trips):
+                value = trip.get(field)
+                if value is None:
+                    if required:
+                        raise KeyError(f"Trip {position}: missing required field '{field}'")
+                    continue
+                try:
+                    column[position] = float(value)
+                except (TypeError, ValueError):
+                    raise ValueError(f"Trip {position}: '{field}' must be a number") from None
+            columns[field] = column
+        return columns
+
+    def calculate_batch(self, columns: Mapping[str, Any], round_results: bool = True,
+                        calculator: Optional[ProfitabilityCalculator] = None) -> Dict[str, Any]:
+        """
+        calculate_batch() with trucking from each trip's contractor tariff.
+
+        Args:
+            columns (Mapping): Columnar trip data with contractor and
+                round_trip_distance (plus operation_days for day-based
+                contractors, or truck_turnaround_time)
+            round_results (bool): Round like the scalar path
+            calculator (ProfitabilityCalculator): Calculator (default: 'contractor_tariff')
+
+        Returns:
+            dict: calculate_batch() arrays plus contractor_code and the
+                SPLIT_FIELDS arrays
+        """
+        calculator = calculator or get_calculator(TARIFF_COST_MODEL)
+        split = self.trucking_split_columns(
+            columns['contractor'], columns['round_trip_distance'],
+            columns['truck_turnaround_time'] if 'truck_turnaround_time' in columns else None,
+            columns['operation_days'] if 'operation_days' in columns else None)
+
+        inputs = dict(columns)
+        inputs['contractor_trucking_costs'] = split['trucking_costs']
+        results = calculator.calculate_batch(inputs, round_results)
+        for field in SPLIT_FIELDS:
+            results[field] = round2(split[field]) if round_results else split[field]
+        results['contractor_code'] = split['contractor_code']
+        return results
+
+    def contractor_summary(self, results: Mapping[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        Per-contractor totals of a calculate_batch() result.
+
+        Args:
+            results (Mapping): TariffTable.calculate_batch() results
+
+        Returns:
+            dict: Contractor -> trips, trucking_fixed_costs,
+                trucking_variable_costs, trucking_costs, profit
+        """
+        import numpy as np
+
+        codes = results['contractor_code']
+        size = len(self.contractors)
+        trips = np.bincount(codes, minlength=size)
+        totals = {field: np.bincount(codes, weights=results[field], minlength=size)
+                  for field in SPLIT_FIELDS + ('trucking_costs', 'profit')}
+        return {name: {'trips': int(trips[code]), **{field: round(float(values[code]), 2)
+                                                     for field, values in totals.items()}}
+                for code, name in enumerate(self.contractors) if trips[code]}
+
+
+def main():
+    """
+    Command-line entry point for contractor tariff costing.
+    """
+    from trip_ingest import detect_format, iter_records
+
+    parser = argparse.ArgumentParser(description="Trip profitability with contractor-specific trucking tariffs")
+    parser.add_argument('trips', help="Trips (.csv or .jsonl) with a contractor column")
+    parser.add_argument('--tariffs', default='contractor_tariffs.json')
+    parser.add_argument('--chunk-size', type=int, default=50000)
+    args = parser.parse_args()
+
+    print("PowerGas Contractor Tariffs")
+    print("="*80)
+
+    table = TariffTable.from_file(args.tariffs)
+    summary: Dict[str, Dict[str, Any]] = {}
+    chunk: List[Dict[str, Any]] = []
+    records = iter_records(args.trips, detect_format(args.trips))
+    while True:
+        chunk.clear()
+        for record in records:
+            chunk.append(record)
+            if len(chunk) == args.chunk_size:
+                break
+        if not chunk:
+            break
+        for name, totals in table.contractor_summary(table.calculate_batch(table.trip_columns(chunk))).items():
+            current = summary.setdefault(name, dict.fromkeys(totals, 0))
+            for field, value in totals.items():
+                current[field] += value
+
+    print(f"{'Contractor':<14}{'Basis':<7}{'Trips':>9}{'Fixed (NGN)':>16}{'Variable (NGN)':>16}{'Profit (NGN)':>18}")
+    print("-"*80)
+    for name, totals in summary.items():
+        print(f"{name:<14}{table.bases[name]:<7}{totals['trips']:>9,}{totals['trucking_fixed_costs']:>16,.2f}"
+              f"{totals['trucking_variable_costs']:>16,.2f}{totals['profit']:>18,.2f}")
+
+
+if __name__ == "__main__":
+    main()
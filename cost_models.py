@@ -0,0 +1,409 @@
+"""
+PowerGas Cost Model Registry
+
+Each cost model is a named set of formula expressions - one per component
+(revenue, production, truck expenses, trucking, skid) - written with trip_data
+field names. A model is validated and compiled once into a single Python
+kernel function, so evaluating it costs one call with no per-trip
+interpretation. The kernel only uses arithmetic, so the same function works
+on plain floats (single trip) and NumPy arrays (batches).
+
+Built-in models:
+- base: the documented formula (see profitability_calculator.py)
+- gvd: revenue and production on Gas Volume Dispensed (GVD), falling back to GV
+- fuel_per_km: fuel charged per km of round trip distance instead of per hour
+- imi_per_day: IMI contractor pricing - fixed NGN/day over operation days, with
+  variable NGN/km applied only beyond the included km per day
+- mother_station_wait: truck and skid time includes wait time at the Mother Station
+- gvd_mother_station_wait: gvd and mother_station_wait combined (telematics
+  trips joined to PRMS dispensing records)
+- contractor_tariff: trucking costs precomputed from the contractor tariff
+  table (contractor_tariffs.py), falling back to (FTC + VTC) × RTD
+
+New contractor models are added with register_cost_model().
+
+Expression language: + - * / // and parentheses, numbers, trip_data field
+names and the helpers ceil(x) and positive(x) (= max(x, 0)).
+"""
+
+import ast
+import math
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+
+# Components every model must define, in formula order
+COMPONENTS = ('revenue', 'production_costs', 'truck_expenses', 'trucking_costs', 'skid_costs')
+
+# Values returned by a compiled kernel
+KERNEL_OUTPUTS = COMPONENTS + ('total_costs', 'profit')
+
+
+def ceil(x):
+    """Ceiling that works for floats and NumPy arrays."""
+    return -((-x) // 1)
+
+
+def positive(x):
+    """max(x, 0) that works for floats and NumPy arrays."""
+    return (x + abs(x)) * 0.5
+
+
+HELPERS = {'ceil': ceil, 'positive': positive}
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Name, ast.Load, ast.Constant, ast.Call,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.USub, ast.UAdd,
+)
+
+
+def _parse_expression(expression: str, context: str) -> Tuple[str, List[str]]:
+    """
+    Validate an expression and list the fields it reads.
+
+    Args:
+        expression (str): Formula expression
+        context (str): Description used in error messages
+
+    Returns:
+        tuple: (normalised source, field names in order of first use)
+    """
+    try:
+        tree = ast.parse(expression, mode='eval')
+    except SyntaxError as e:
+        raise ValueError(f"{context}: invalid expression '{expression}' ({e.msg})") from None
+
+    names = []
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"{context}: unsupported syntax '{type(node).__name__}' in '{expression}'")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+            raise ValueError(f"{context}: only numeric constants are allowed in '{expression}'")
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in HELPERS or node.keywords:
+                raise ValueError(f"{context}: only {', '.join(HELPERS)} may be called in '{expression}'")
+        elif isinstance(node, ast.Name) and node.id not in HELPERS:
+            if node.id in KERNEL_OUTPUTS:
+                raise ValueError(f"{context}: '{node.id}' is a result, not a trip_data field")
+            if node.id not in names:
+                names.append(node.id)
+
+    # ast.walk is breadth-first; re-order by position for a readable signature
+    positions = {node.id: (node.lineno, node.col_offset) for node in ast.walk(tree)
+                 if isinstance(node, ast.Name) and node.id in names}
+    names.sort(key=lambda name: positions[name])
+    return ast.unparse(tree), names
+
+
+class CostModel:
+    """
+    A named profitability formula compiled into a fast kernel.
+
+    Attributes:
+        name (str): Registry name
+        description (str): Human-readable summary
+        expressions (dict): Component name -> expression source
+        defaults (dict): Optional field -> expression used when the field is
+            missing, None or NaN
+        inputs (tuple): trip_data fields read by the kernel, in argument order
+        fields (tuple): inputs plus the fields read by the defaults - every
+            trip_data field the model can use
+        default_inputs (dict): Optional field -> fields its default reads
+    """
+
+    def __init__(self, name: str, expressions: Dict[str, str], description: str = '',
+                 defaults: Optional[Dict[str, str]] = None):
+        """
+        Validate and compile a cost model.
+
+        Args:
+            name (str): Registry name
+            expressions (dict): One expression per component in COMPONENTS
+            description (str): Human-readable summary
+            defaults (dict): Optional field -> fallback expression
+        """
+        missing = [component for component in COMPONENTS if component not in expressions]
+        if missing:
+            raise ValueError(f"Cost model '{name}' is missing components: {', '.join(missing)}")
+
+        self.name = name
+        self.description = description
+        self.expressions = {}
+        inputs: List[str] = []
+
+        self._component_code = {}
+        for component in COMPONENTS:
+            source, names = _parse_expression(expressions[component], f"{name}.{component}")
+            self.expressions[component] = source
+            self._component_code[component] = compile(source, f'<{name}.{component}>', 'eval')
+            inputs.extend(field for field in names if field not in inputs)
+
+        self.defaults = {}
+        self.default_inputs = {}
+        self._default_code = {}
+        for field, expression in (defaults or {}).items():
+            source, names = _parse_expression(expression, f"{name}.defaults.{field}")
+            self.defaults[field] = source
+            self.default_inputs[field] = tuple(names)
+            self._default_code[field] = compile(source, f'<{name}.defaults.{field}>', 'eval')
+
+        self.inputs = tuple(inputs)
+        self.fields = self.inputs + tuple(dict.fromkeys(
+            name for names in self.default_inputs.values() for name in names if name not in self.inputs))
+        self.kernel = self._compile()
+
+    def _compile(self):
+        """Generate and compile the kernel function for this model."""
+        body = [f"    {component} = {self.expressions[component]}" for component in COMPONENTS]
+        body.append("    total_costs = production_costs + truck_expenses + trucking_costs + skid_costs")
+        body.append("    profit = revenue - total_costs")
+        body.append(f"    return {', '.join(KERNEL_OUTPUTS)}")
+        source = f"def kernel({', '.join(self.inputs)}):\n" + "\n".join(body) + "\n"
+
+        namespace = dict(HELPERS)
+        exec(compile(source, f'<cost model {self.name}>', 'exec'), namespace)
+        kernel = namespace['kernel']
+        kernel.__name__ = kernel.__qualname__ = f'{self.name}_kernel'
+        return kernel
+
+    def _missing(self, value) -> bool:
+        return value is None or (isinstance(value, float) and math.isnan(value))
+
+    def resolve_inputs(self, trip_data: Mapping[str, Any]) -> List[Any]:
+        """
+        Collect kernel arguments for a single trip, applying defaults.
+
+        Args:
+            trip_data (Mapping): Dictionary containing all trip parameters
+
+        Returns:
+            list: Argument values in self.inputs order
+        """
+        if not self.defaults:
+            return [trip_data[field] for field in self.inputs]
+
+        values = dict(trip_data)
+        for field in self.inputs:
+            if field in self.defaults and self._missing(values.get(field)):
+                values[field] = eval(self._default_code[field], dict(HELPERS), values)
+        return [values[field] for field in self.inputs]
+
+    def resolve_columns(self, trips: Mapping[str, Any]) -> List[Any]:
+        """
+        Collect kernel arguments for a batch as float64 arrays, applying defaults.
+
+        Args:
+            trips (Mapping): Columnar trip data (dict of arrays or DataFrame)
+
+        Returns:
+            list: NumPy arrays in self.inputs order
+        """
+        import numpy as np
+
+        columns = {}
+        for field in self.inputs:
+            if field in trips:
+                columns[field] = np.asarray(trips[field], dtype=np.float64)
+            elif field not in self.defaults:
+                raise KeyError(field)
+
+        for field in self.inputs:
+            if field not in self.defaults:
+                continue
+            scope = dict(columns)
+            scope.update((name, np.asarray(trips[name], dtype=np.float64))
+                         for name in _default_names(self.defaults[field])
+                         if name not in scope and name in trips)
+            if field not in columns:
+                fallback = eval(self._default_code[field], dict(HELPERS), scope)
+                size = len(next(iter(columns.values()))) if columns else len(fallback)
+                columns[field] = np.broadcast_to(np.asarray(fallback, dtype=np.float64), (size,))
+            elif np.isnan(columns[field]).any():
+                fallback = eval(self._default_code[field], dict(HELPERS), scope)
+                columns[field] = np.where(np.isnan(columns[field]), fallback, columns[field])
+
+        return [columns[field] for field in self.inputs]
+
+    def evaluate(self, trip_data: Mapping[str, Any]) -> Dict[str, Any]:
+        """
+        Evaluate the model for a single trip.
+
+        Args:
+            trip_data (Mapping): Dictionary containing all trip parameters
+
+        Returns:
+            dict: Unrounded values keyed by KERNEL_OUTPUTS
+        """
+        return dict(zip(KERNEL_OUTPUTS, self.kernel(*self.resolve_inputs(trip_data))))
+
+    def evaluate_component(self, component: str, values: Mapping[str, Any]) -> Any:
+        """
+        Evaluate one component expression (no defaults are applied).
+
+        Args:
+            component (str): Name from COMPONENTS
+            values (Mapping): Field values read by the expression
+
+        Returns:
+            Unrounded component value
+        """
+        return eval(self._component_code[component], dict(HELPERS), dict(values))
+
+    def evaluate_columns(self, trips: Mapping[str, Any]) -> Dict[str, Any]:
+        """
+        Evaluate the model for a batch of trips in one vectorized call.
+
+        Args:
+            trips (Mapping): Columnar trip data (dict of arrays or DataFrame)
+
+        Returns:
+            dict: Unrounded NumPy arrays keyed by KERNEL_OUTPUTS
+        """
+        return dict(zip(KERNEL_OUTPUTS, self.kernel(*self.resolve_columns(trips))))
+
+    def __reduce__(self):
+        # Generated kernels cannot be pickled; worker processes recompile instead
+        return (CostModel, (self.name, self.expressions, self.description, self.defaults))
+
+    def __repr__(self) -> str:
+        return f"CostModel({self.name!r}, inputs={len(self.inputs)})"
+
+
+def _default_names(expression: str) -> Iterable[str]:
+    return [node.id for node in ast.walk(ast.parse(expression, mode='eval'))
+            if isinstance(node, ast.Name) and node.id not in HELPERS]
+
+
+_REGISTRY: Dict[str, CostModel] = {}
+
+
+def register_cost_model(name: str, expressions: Dict[str, str], description: str = '',
+                        defaults: Optional[Dict[str, str]] = None,
+                        base: Optional[str] = None) -> CostModel:
+    """
+    Compile a cost model and add it to the registry.
+
+    Args:
+        name (str): Registry name (replaces any existing model of that name)
+        expressions (dict): Component name -> expression
+        description (str): Human-readable summary
+        defaults (dict): Optional field -> fallback expression
+        base (str): Existing model whose expressions/defaults fill any gaps
+
+    Returns:
+        CostModel: The compiled model
+    """
+    if base is not None:
+        parent = get_cost_model(base)
+        expressions = {**parent.expressions, **expressions}
+        defaults = {**parent.defaults, **(defaults or {})}
+
+    model = CostModel(name, expressions, description, defaults)
+    _REGISTRY[name] = model
+    return model
+
+
+def get_cost_model(name: str) -> CostModel:
+    """
+    Look up a registered cost model.
+
+    Args:
+        name (str): Registry name
+
+    Returns:
+        CostModel: The compiled model
+    """
+    try:
+        return _REGISTRY[name]
+    except KeyError:
+        raise KeyError(f"Unknown cost model '{name}' (available: {', '.join(_REGISTRY)})") from None
+
+
+def list_cost_models() -> Dict[str, str]:
+    """
+    Names and descriptions of all registered cost models.
+
+    Returns:
+        dict: Model name -> description
+    """
+    return {name: model.description for name, model in _REGISTRY.items()}
+
+
+register_cost_model(
+    'base',
+    {
+        'revenue': 'gas_volume * gas_price',
+        'production_costs': '(gas_cost + plant_cost + ga_cost) * gas_volume',
+        'truck_expenses': '(truck_depreciation + truck_insurance + fuel_cost) * truck_turnaround_time',
+        'trucking_costs': '(fixed_trucking_cost + variable_trucking_cost) * round_trip_distance',
+        'skid_costs': 'skid_depreciation * skid_turnaround_time',
+    },
+    "Profit = (GV × GP) - [ ((GC + PC + G&A) × GV) + ((TD + TIS + FC) × TTAT) "
+    "+ ((FTC + VTC) × RTD) + (SD × STAT) ]",
+)
+
+register_cost_model(
+    'gvd',
+    {
+        'revenue': 'gas_volume_dispensed * gas_price',
+        'production_costs': '(gas_cost + plant_cost + ga_cost) * gas_volume_dispensed',
+    },
+    "Revenue and production on Gas Volume Dispensed (GVD); GV where GVD is missing",
+    defaults={'gas_volume_dispensed': 'gas_volume'},
+    base='base',
+)
+
+register_cost_model(
+    'fuel_per_km',
+    {
+        'truck_expenses': '(truck_depreciation + truck_insurance) * truck_turnaround_time'
+                          ' + fuel_cost_per_km * round_trip_distance',
+    },
+    "Fuel charged per km of RTD (fuel_cost_per_km) instead of per hour of TTAT",
+    base='base',
+)
+
+register_cost_model(
+    'imi_per_day',
+    {
+        'trucking_costs': 'fixed_trucking_cost * operation_days'
+                          ' + variable_trucking_cost * positive(round_trip_distance'
+                          ' - included_km_per_day * operation_days)',
+    },
+    "IMI pricing: FTC in NGN/day over operation days, VTC in NGN/km beyond the included km per day",
+    defaults={'operation_days': 'ceil(truck_turnaround_time / 24)', 'included_km_per_day': '0'},
+    base='base',
+)
+
+register_cost_model(
+    'mother_station_wait',
+    {
+        'truck_expenses': '(truck_depreciation + truck_insurance + fuel_cost)'
+                          ' * (truck_turnaround_time + mother_station_wait_time)',
+        'skid_costs': 'skid_depreciation * (skid_turnaround_time + mother_station_wait_time)',
+    },
+    "Truck and skid time include wait time at the Mother Station (mother_station_wait_time, hours)",
+    defaults={'mother_station_wait_time': '0'},
+    base='base',
+)
+
+register_cost_model(
+    'gvd_mother_station_wait',
+    {
+        'revenue': 'gas_volume_dispensed * gas_price',
+        'production_costs': '(gas_cost + plant_cost + ga_cost) * gas_volume_dispensed',
+    },
+    "GVD revenue and production (GV where GVD is missing) with Mother Station wait time charged",
+    defaults={'gas_volume_dispensed': 'gas_volume'},
+    base='mother_station_wait',
+)
+
+register_cost_model(
+    'contractor_tariff',
+    {
+        'trucking_costs': 'contractor_trucking_costs',
+    },
+    "Trucking costs from the contractor tariff table (contractor_trucking_costs, see contractor_tariffs.py); "
+    "(FTC + VTC) × RTD where missing",
+    defaults={'contractor_trucking_costs': '(fixed_trucking_cost + variable_trucking_cost) * round_trip_distance'},
+    base='base',
+)
@@ -0,0 +1,359 @@
+"""
+PowerGas Time-Saved Counterfactual (Requirement 5)
+
+Re-prices and re-times every historical trip as if it had been served from a
+reference Mother Station (Ebedei by default), to show how much truck time,
+skid time, distance and money sourcing from closer stations saved:
+
+    truck hours saved = reference TTAT - actual TTAT
+    skid hours saved  = reference STAT - actual STAT
+    km saved          = reference RTD  - actual RTD
+    NGN saved         = actual profit  - reference profit
+
+The reference route for each client comes from a per-route table - the
+reference station's routes in sourcing.json, or recorded averages from a
+route index (route_index.py). The reference station's own per-scm rates
+(gas_cost, plant_cost in sourcing.json) replace the trip's. Trip prices,
+volumes and other costs are kept.
+
+Each batch is evaluated with two calculate_batch() passes (actual and
+counterfactual columns), and the savings are summed per client and month
+with np.bincount, so the full trip history streams through in chunks.
+Trips whose client has no reference route are counted as unmatched and
+contribute no savings. Trips already served from the reference station keep
+their recorded values, so they save nothing; they are counted as
+reference_trips and left out of the sums.
+
+Usage:
+    python counterfactual.py trips.csv --reference Ebedei --sourcing sourcing.json
+    python counterfactual.py --store trip_store --route-index route_index.json --statistic p50
+"""
+
+import argparse
+import json
+from typing import Any, Dict, Iterable, Mapping, Optional
+
+from profitability_calculator import ProfitabilityCalculator, get_calculator, TRIP_INPUT_FIELDS
+from profitability_matrix import ALL, factorize
+from route_index import ROUTE_METRICS
+
+
+DEFAULT_REFERENCE_STATION = 'Ebedei'
+
+# Per-trip sums kept for every client and month
+SUM_FIELDS = (
+    'trips', 'matched_trips', 'reference_trips',
+    'actual_truck_hours', 'reference_truck_hours',
+    'actual_skid_hours', 'reference_skid_hours',
+    'actual_km', 'reference_km',
+    'actual_profit', 'reference_profit',
+)
+
+# Route metric -> name used in the sums and savings
+METRIC_NAMES = {
+    'truck_turnaround_time': 'truck_hours',
+    'skid_turnaround_time': 'skid_hours',
+    'round_trip_distance': 'km',
+}
+
+SAVINGS_FIELDS = ('truck_hours_saved', 'skid_hours_saved', 'km_saved', 'ngn_saved')
+
+
+class Counterfactual:
+    """
+    Actual vs. "if sourced from the reference station" for trip histories.
+
+    Attributes:
+        reference_station (str): Mother Station trips are re-timed from
+        routes (dict): Client -> {ROUTE_METRICS value} from the reference station
+        station_rates (dict): Reference station per-scm rates (e.g. gas_cost)
+        totals (dict): (client, month) -> running SUM_FIELDS sums
+    """
+
+    def __init__(self, routes: Mapping[str, Mapping[str, float]],
+                 reference_station: str = DEFAULT_REFERENCE_STATION,
+                 station_rates: Optional[Mapping[str, float]] = None,
+                 calculator: Optional[ProfitabilityCalculator] = None):
+        """
+        Initialize the counterfactual.
+
+        Args:
+            routes (Mapping): Client -> reference route TTAT, STAT and RTD
+            reference_station (str): Reference Mother Station
+            station_rates (Mapping): Per-scm inputs of the reference station
+                that replace the trip's (optional)
+            calculator (ProfitabilityCalculator): Calculator to use (optional)
+        """
+        self.reference_station = reference_station
+        self.routes = {client: {metric: float(values[metric]) for metric in ROUTE_METRICS}
+                       for client, values in routes.items()
+                       if all(values.get(metric) is not None for metric in ROUTE_METRICS)}
+        self.station_rates = {field: float(value) for field, value in (station_rates or {}).items()}
+        self.calculator = calculator or get_calculator()
+        self.totals: Dict[tuple, Any] = {}
+
+    @classmethod
+    def from_sourcing(cls, config_file: str = 'sourcing.json',
+                      reference_station: str = DEFAULT_REFERENCE_STATION,
+                      calculator: Optional[ProfitabilityCalculator] = None) -> 'Counterfactual':
+        """
+        Reference routes and rates from a sourcing configuration.
+
+        Args:
+            config_file (str): Sourcing configuration (see sourcing_optimizer.py)
+            reference_station (str): Reference Mother Station
+            calculator (ProfitabilityCalculator): Calculator to use (optional)
+
+        Returns:
+            Counterfactual: Configured counterfactual
+        """
+        from sourcing_optimizer import SourcingOptimizer
+
+        sourcing = SourcingOptimizer.from_file(config_file)
+        station = next((item for item in sourcing.stations if item['name'] == reference_station), None)
+        if station is None:
+            raise KeyError(f"Reference station {reference_station} is not in {config_file}")
+        routes = {client: route for (mother, client), route in sourcing.routes.items() if mother == reference_station}
+        rates = {field: value for field, value in station.items() if field in TRIP_INPUT_FIELDS}
+        return cls(routes, reference_station, rates, calculator)
+
+    @classmethod
+    def from_route_index(cls, index: Any, reference_station: str = DEFAULT_REFERENCE_STATION,
+                         statistic: str = 'mean', station_rates: Optional[Mapping[str, float]] = None,
+                         calculator: Optional[ProfitabilityCalculator] = None) -> 'Counterfactual':
+        """
+        Reference routes from recorded trips.
+
+        Args:
+            index (RouteIndex): Route index (see route_index.py)
+            reference_station (str): Reference Mother Station
+            statistic (str): Route statistic to use ('mean', 'p50', ...)
+            station_rates (Mapping): Per-scm inputs of the reference station (optional)
+            calculator (ProfitabilityCalculator): Calculator to use (optional)
+
+        Returns:
+            Counterfactual: Configured counterfactual
+        """
+        routes = {client: index.expected_values(mother, client, statistic)
+                  for mother, client in index.routes if mother == reference_station}
+        return cls(routes, reference_station, station_rates, calculator)
+
+    def evaluate(self, trips: Mapping[str, Any]) -> Dict[str, Any]:
+        """
+        Actual and counterfactual values for a batch of trips.
+
+        Args:
+            trips (Mapping): Columnar trip data (see calculate_batch) with
+                daughter_station
+
+        Returns:
+            dict: NumPy arrays - matched (client has a reference route and
+                the trip was served from another station), from_reference,
+                actual_/reference_ ROUTE_METRICS and profit, and the
+                per-trip SAVINGS_FIELDS (zero for unmatched trips)
+        """
+        import numpy as np
+
+        clients, codes = factorize(trips['daughter_station'])
+        lookup = {metric: np.array([self.routes.get(client, {}).get(metric, np.nan) for client in clients])
+                  for metric in ROUTE_METRICS}
+        size = len(codes)
+        mothers = np.asarray(trips.get('mother_station', np.full(size, 'N/A')), dtype=np.str_)
+        from_reference = mothers == self.reference_station
+        matched = ~np.isnan(lookup['truck_turnaround_time'][codes]) & ~from_reference
+
+        actual = {metric: np.asarray(trips[metric], dtype=np.float64) for metric in ROUTE_METRICS}
+        reference_columns = dict(trips)
+        evaluated = {'matched': matched, 'from_reference': from_reference}
+        for metric in ROUTE_METRICS:
+            reference = np.where(matched, lookup[metric][codes], actual[metric])
+            reference_columns[metric] = reference
+            evaluated[f'actual_{metric}'] = actual[metric]
+            evaluated[f'reference_{metric}'] = reference
+        for field, value in self.station_rates.items():
+            reference_columns[field] = np.where(matched, value, np.asarray(trips[field], dtype=np.float64))
+
+        evaluated['actual_profit'] = self.calculator.calculate_batch(trips, round_results=False)['profit']
+        evaluated['reference_profit'] = self.calculator.calculate_batch(reference_columns, round_results=False)['profit']
+        for metric, name in METRIC_NAMES.items():
+            evaluated[f'{name}_saved'] = evaluated[f'reference_{metric}'] - evaluated[f'actual_{metric}']
+        evaluated['ngn_saved'] = evaluated['actual_profit'] - evaluated['reference_profit']
+        return evaluated
+
+    def add(self, trips: Mapping[str, Any], month: Optional[str] = None) -> int:
+        """
+        Evaluate a batch of trips and add it to the per-client, per-month sums.
+
+        Args:
+            trips (Mapping): Columnar trip data with daughter_station,
+                mother_station and trip_date (or pass month)
+            month (str): Month (YYYY-MM) for every trip, used instead of trip_date
+
+        Returns:
+            int: Number of trips added
+        """
+        import numpy as np
+
+        evaluated = self.evaluate(trips)
+        size = len(evaluated['matched'])
+        if not size:
+            return 0
+
+        if month is not None:
+            months = np.full(size, month)
+        elif 'trip_date' in trips:
+            months = np.asarray([str(value)[:7] for value in trips['trip_date']])
+        else:
+            months = np.full(size, ALL)
+
+        matched = evaluated['matched']
+        weights = {
+            'trips': np.ones(size),
+            'matched_trips': matched.astype(np.float64),
+            'reference_trips': evaluated['from_reference'].astype(np.float64),
+            'actual_profit': np.where(matched, evaluated['actual_profit'], 0.0),
+            'reference_profit': np.where(matched, evaluated['reference_profit'], 0.0),
+        }
+        for metric, name in METRIC_NAMES.items():
+            weights[f'actual_{name}'] = np.where(matched, evaluated[f'actual_{metric}'], 0.0)
+            weights[f'reference_{name}'] = np.where(matched, evaluated[f'reference_{metric}'], 0.0)
+
+        clients, client_codes = factorize(trips['daughter_station'])
+        month_labels, month_codes = factorize(months)
+        combined = client_codes * len(month_labels) + month_codes
+        groups = len(clients) * len(month_labels)
+        sums = np.stack([np.bincount(combined, weights[field], minlength=groups) for field in SUM_FIELDS], axis=1)
+
+        for code in np.flatnonzero(sums[:, 0]).tolist():
+            client_code, month_code = divmod(code, len(month_labels))
+            key = (clients[client_code], month_labels[month_code])
+            if key in self.totals:
+                self.totals[key] += sums[code]
+            else:
+                self.totals[key] = sums[code].copy()
+        return size
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Savings per client, per month, per client and month, and in total.
+
+        Only matched trips (client has a reference route, served from
+        another station) contribute hours, km and NGN; 'trips' counts every
+        trip and 'reference_trips' those served from the reference station.
+
+        Returns:
+            dict: clients, months, client_months ('client|month') and totals
+                rows with SUM_FIELDS, SAVINGS_FIELDS and the percentage of
+                reference truck and skid hours saved
+        """
+        import numpy as np
+
+        def row(sums):
+            values = dict(zip(SUM_FIELDS, sums.tolist()))
+            result = {field: int(values[field]) for field in ('trips', 'matched_trips', 'reference_trips')}
+            result.update({field: round(values[field], 2) for field in SUM_FIELDS[3:]})
+            for name in METRIC_NAMES.values():
+                result[f'{name}_saved'] = round(values[f'reference_{name}'] - values[f'actual_{name}'], 2)
+            result['ngn_saved'] = round(values['actual_profit'] - values['reference_profit'], 2)
+            for name in ('truck_hours', 'skid_hours'):
+                reference = values[f'reference_{name}']
+                saved = reference - values[f'actual_{name}']
+                result[f'{name}_saved_percent'] = round(saved / reference * 100, 2) if reference > 0 else 0
+            return result
+
+        clients: Dict[str, Any] = {}
+        months: Dict[str, Any] = {}
+        for (client, month), sums in self.totals.items():
+            clients[client] = clients.get(client, 0) + sums
+            months[month] = months.get(month, 0) + sums
+        totals = sum(self.totals.values(), np.zeros(len(SUM_FIELDS)))
+
+        return {
+            'reference_station': self.reference_station,
+            'clients': {client: row(clients[client]) for client in sorted(clients)},
+            'months': {month: row(months[month]) for month in sorted(months)},
+            'client_months': {f'{client}|{month}': row(self.totals[client, month])
+                              for client, month in sorted(self.totals)},
+            'totals': row(totals),
+        }
+
+    def add_chunks(self, chunks: Iterable[Mapping[str, Any]]) -> int:
+        """
+        Add a stream of trip batches (e.g. read_trip_chunks() or TripStore.scan()).
+
+        Args:
+            chunks (iterable): Columnar trip batches
+
+        Returns:
+            int: Number of trips added
+        """
+        return sum(self.add(chunk) for chunk in chunks)
+
+
+def main():
+    """
+    Command-line entry point for the time-saved counterfactual.
+    """
+    parser = argparse.ArgumentParser(description="Truck/skid hours and NGN saved versus sourcing from a reference station")
+    parser.add_argument('trip_log', nargs='?', help="Trip log (.csv or .jsonl)")
+    parser.add_argument('--store', help="Read trips from a trip store directory instead (see trip_store.py)")
+    parser.add_argument('--start', help="First day read from the store (YYYY-MM-DD)")
+    parser.add_argument('--end', help="Last day read from the store (YYYY-MM-DD)")
+    parser.add_argument('--reference', default=DEFAULT_REFERENCE_STATION, help="Reference Mother Station")
+    parser.add_argument('--sourcing', default='sourcing.json', help="Reference routes and station rates")
+    parser.add_argument('--route-index', help="Take reference routes from a saved route index instead")
+    parser.add_argument('--statistic', default='mean', help="Route index statistic (mean, p50, p90, ...)")
+    parser.add_argument('--json', help="Write the summary to this JSON file")
+    args = parser.parse_args()
+
+    if not args.trip_log and not args.store:
+        parser.error("Give a trip log or --store")
+
+    counterfactual = Counterfactual.from_sourcing(args.sourcing, args.reference)
+    if args.route_index:
+        from route_index import RouteIndex
+        counterfactual = Counterfactual.from_route_index(RouteIndex.load(args.route_index), args.reference,
+                                                         args.statistic, counterfactual.station_rates)
+
+    if args.store:
+        from trip_store import TripStore, UNDATED
+        for day, columns in TripStore(args.store).scan(args.start, args.end):
+            counterfactual.add(columns, month=None if day == UNDATED else day[:7])
+    else:
+        from trip_ingest import read_trip_chunks
+        counterfactual.add_chunks(read_trip_chunks(args.trip_log))
+
+    summary = counterfactual.summary()
+    totals = summary['totals']
+
+    print(f"PowerGas Time Saved vs. Sourcing from {args.reference}")
+    print("="*80)
+    print(f"{'Client / Month':<28}{'Trips':>8}{'Truck h':>11}{'Skid h':>11}{'km':>11}{'NGN saved':>18}")
+    print("-"*87)
+    for client, row in summary['clients'].items():
+        print(f"{client:<28}{row['matched_trips']:>8,}{row['truck_hours_saved']:>11,.1f}"
+              f"{row['skid_hours_saved']:>11,.1f}{row['km_saved']:>11,.0f}{row['ngn_saved']:>18,.0f}")
+        for key, month_row in summary['client_months'].items():
+            if key.split('|')[0] == client and len(summary['months']) > 1:
+                print(f"  {key.split('|', 1)[1]:<26}{month_row['matched_trips']:>8,}"
+                      f"{month_row['truck_hours_saved']:>11,.1f}{month_row['skid_hours_saved']:>11,.1f}"
+                      f"{month_row['km_saved']:>11,.0f}{month_row['ngn_saved']:>18,.0f}")
+    print("-"*87)
+    print(f"{'Total':<28}{totals['matched_trips']:>8,}{totals['truck_hours_saved']:>11,.1f}"
+          f"{totals['skid_hours_saved']:>11,.1f}{totals['km_saved']:>11,.0f}{totals['ngn_saved']:>18,.0f}")
+    print(f"\nTruck hours saved: {totals['truck_hours_saved_percent']:.1f}% of the {args.reference} equivalent; "
+          f"skid hours: {totals['skid_hours_saved_percent']:.1f}%")
+    if totals['reference_trips']:
+        print(f"{totals['reference_trips']:,} trips already served from {args.reference} were left out")
+    unmatched = totals['trips'] - totals['matched_trips'] - totals['reference_trips']
+    if unmatched:
+        print(f"{unmatched:,} trips to clients without a {args.reference} route were left out")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"\nSummary saved to: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+"""
+PowerGas Fleet and Skid Asset-Utilization Simulator (Requirement 6)
+
+Discrete-event simulation of a month of deliveries under a sourcing plan, to
+show the asset utilization impact of changing the sourcing Mother Station.
+
+Each client's monthly demand (sourcing.json) becomes evenly spaced delivery
+requests, split between Mother Stations by the plan's shares. A delivery
+starts when its Mother Station has a free truck, a full skid and a loading
+bay; the bay is held for the loading time, the truck for the route TTAT and
+the skid for the route STAT. Requests wait in a FIFO queue at their Mother
+Station until all three are free.
+
+The engine is a single heapq event queue of (time, sequence, kind, station)
+tuples over per-station resource pools (a deque of free trucks with the time
+each became free, and free skid / bay counters), so a fleet-month of
+thousands of trips simulates in milliseconds.
+
+Reported per plan and per Mother Station: trips requested/completed, backlog,
+truck, skid and bay utilization, truck idle hours and truck wait hours at the
+Mother Station (truck free but no skid or bay), and request wait. Completed
+trips are priced with the 'mother_station_wait' cost model, so waiting
+trucks and skids cost money.
+
+Plans are not capped at station capacity: a station whose requested volume
+exceeds its sourcing.json capacity is reported in capacity_violations, so an
+infeasible plan is flagged rather than silently simulated as feasible.
+
+Plans (fleet.json):
+    {"plans": {"name": [{"mother_station", "daughter_station", "share"}, ...]}}
+The sourcing optimizer's plan is added as 'optimized'.
+
+Usage:
+    python fleet_simulator.py fleet.json
+    python fleet_simulator.py fleet.json --plan split --horizon 720
+"""
+
+import argparse
+import heapq
+import json
+import math
+import os
+import time
+from collections import deque
+from typing import Any, Dict, List, Mapping, Optional
+
+from profitability_calculator import ProfitabilityCalculator, get_calculator
+from sourcing_optimizer import SourcingOptimizer
+
+
+DEFAULT_HORIZON_HOURS = 720
+
+FLEET_DEFAULTS = {'trucks': 0, 'skids': 0, 'loading_bays': 1, 'loading_hours': 0.0}
+
+# Event kinds, in the order simultaneous events are handled
+_TRUCK_RETURN, _SKID_RETURN, _BAY_FREE, _REQUEST = range(4)
+
+
+class FleetSimulator:
+    """
+    Event-driven truck/skid/loading-bay simulation over a planning horizon.
+
+    Attributes:
+        sourcing (SourcingOptimizer): Stations, clients, routes and defaults
+        fleet (dict): Mother Station -> trucks, skids, loading_bays, loading_hours
+        horizon (float): Simulated hours
+        plans (dict): Named plans from the fleet configuration
+    """
+
+    def __init__(self, sourcing: SourcingOptimizer, fleet: Mapping[str, Mapping[str, Any]],
+                 horizon_hours: float = DEFAULT_HORIZON_HOURS):
+        """
+        Initialize the simulator.
+
+        Args:
+            sourcing (SourcingOptimizer): Sourcing configuration (see sourcing.json)
+            fleet (Mapping): Mother Station -> {'trucks', 'skids',
+                'loading_bays', 'loading_hours'}
+            horizon_hours (float): Simulated hours (default: a 30-day month)
+        """
+        self.sourcing = sourcing
+        self.fleet = {station['name']: {**FLEET_DEFAULTS, **fleet.get(station['name'], {})}
+                      for station in sourcing.stations}
+        self.horizon = float(horizon_hours)
+        self.plans: Dict[str, List[Dict[str, Any]]] = {}
+
+    @classmethod
+    def from_file(cls, config_file: str = 'fleet.json') -> 'FleetSimulator':
+        """
+        Load the fleet configuration and its sourcing file.
+
+        Args:
+            config_file (str): Path to the fleet configuration
+
+        Returns:
+            FleetSimulator: Configured simulator (plans are in .plans)
+        """
+        with open(config_file, 'r') as f:
+            config = json.load(f)
+        sourcing_file = os.path.join(os.path.dirname(config_file), config.get('sourcing', 'sourcing.json'))
+        simulator = cls(SourcingOptimizer.from_file(sourcing_file), config.get('fleet', {}),
+                        config.get('horizon_hours', DEFAULT_HORIZON_HOURS))
+        simulator.plans.update(config.get('plans', {}))
+        return simulator
+
+    def optimized_plan(self, require_full_demand: bool = False) -> List[Dict[str, Any]]:
+        """
+        The sourcing optimizer's assignment as a plan.
+
+        Args:
+            require_full_demand (bool): Serve all demand capacity allows
+
+        Returns:
+            list: [{'mother_station', 'daughter_station', 'volume'}]
+        """
+        plan = self.sourcing.optimize(require_full_demand)
+        return [{'mother_station': item['mother_station'], 'daughter_station': item['daughter_station'],
+                 'volume': item['volume']} for item in plan['assignments']]
+
+    def _trip(self, station: str, client: str) -> Dict[str, Any]:
+        """trip_data for a route: defaults < station < client < route."""
+        route = self.sourcing.routes.get((station, client))
+        if route is None:
+            raise KeyError(f"No route from {station} to {client} in the sourcing configuration")
+        trip = dict(self.sourcing.defaults)
+        trip.update(next(item for item in self.sourcing.stations if item['name'] == station))
+        trip.update(next(item for item in self.sourcing.clients if item['name'] == client))
+        trip.update(route)
+        trip.update({'trip_id': f"{station}->{client}", 'mother_station': station, 'daughter_station': client})
+        return trip
+
+    def _volume_per_trip(self, client: Mapping[str, Any]) -> float:
+        return client.get('gas_volume', self.sourcing.defaults.get('gas_volume'))
+
+    def _requests(self, plan: List[Mapping[str, Any]]) -> List[tuple]:
+        """(release time, station, client) per delivery, spread evenly over the horizon."""
+        weights: Dict[str, Dict[str, float]] = {}
+        for item in plan:
+            weight = float(item.get('share', item.get('volume', 0)))
+            if weight > 0:
+                client = weights.setdefault(item['daughter_station'], {})
+                client[item['mother_station']] = client.get(item['mother_station'], 0.0) + weight
+
+        requests = []
+        for client in self.sourcing.clients:
+            stations = weights.get(client['name'])
+            if not stations:
+                continue
+            count = math.ceil(client['demand'] / self._volume_per_trip(client))
+            total = sum(stations.values())
+            assigned = dict.fromkeys(stations, 0)
+            for i in range(count):
+                # Smooth split: the station furthest behind its share gets the next delivery
+                station = max(stations, key=lambda name: stations[name] / total * (i + 1) - assigned[name])
+                assigned[station] += 1
+                requests.append(((i + 0.5) * self.horizon / count, station, client['name']))
+        return requests
+
+    def simulate(self, plan: List[Mapping[str, Any]],
+                 calculator: Optional[ProfitabilityCalculator] = None) -> Dict[str, Any]:
+        """
+        Simulate one sourcing plan over the horizon.
+
+        Args:
+            plan (list): [{'mother_station', 'daughter_station', 'share' or 'volume'}]
+            calculator (ProfitabilityCalculator): Calculator for completed trips
+                (default: 'mother_station_wait' model)
+
+        Returns:
+            dict: totals (trips_requested, trips_completed, backlog, profit,
+                truck/skid utilization, truck wait and idle hours, request
+                wait, capacity_violations), stations and clients breakdowns,
+                events and sim_ms. A station whose requested volume exceeds
+                its sourcing capacity is listed in capacity_violations with
+                the excess scm; the plan is still simulated in full.
+        """
+        import numpy as np
+
+        started = time.perf_counter()
+        horizon = self.horizon
+        requests = self._requests(plan)
+
+        names = list(self.fleet)
+        codes = {name: code for code, name in enumerate(names)}
+        routes = {}
+        for _, station, client in requests:
+            if (station, client) not in routes:
+                trip = self._trip(station, client)
+                routes[station, client] = (trip, float(trip['truck_turnaround_time']),
+                                           float(trip['skid_turnaround_time']))
+
+        free_trucks = [deque([0.0] * int(self.fleet[name]['trucks'])) for name in names]
+        free_skids = [int(self.fleet[name]['skids']) for name in names]
+        free_bays = [int(self.fleet[name]['loading_bays']) for name in names]
+        loading = [float(self.fleet[name]['loading_hours']) for name in names]
+        pending = [deque() for _ in names]
+
+        events = [(release, i, _REQUEST, codes[station], (release, station, client))
+                  for i, (release, station, client) in enumerate(requests)]
+        heapq.heapify(events)
+        sequence = len(events)
+
+        # Per dispatched trip: station code, client, start, truck wait, request wait
+        trips: List[tuple] = []
+        truck_busy = [0.0] * len(names)
+        skid_busy = [0.0] * len(names)
+        bay_busy = [0.0] * len(names)
+        handled = 0
+
+        while events and events[0][0] <= horizon:
+            now, _, kind, code, payload = heapq.heappop(events)
+            handled += 1
+            if kind == _REQUEST:
+                pending[code].append(payload)
+            elif kind == _TRUCK_RETURN:
+                free_trucks[code].append(now)
+            elif kind == _SKID_RETURN:
+                free_skids[code] += 1
+            else:
+                free_bays[code] += 1
+
+            queue, trucks = pending[code], free_trucks[code]
+            while queue and trucks and free_skids[code] and free_bays[code]:
+                release, station, client = queue.popleft()
+                ready = trucks.popleft()
+                free_skids[code] -= 1
+                free_bays[code] -= 1
+                trip, ttat, stat = routes[station, client]
+                trips.append((code, client, now, now - max(ready, release), now - release, ttat))
+                truck_busy[code] += min(now + ttat, horizon) - now
+                skid_busy[code] += min(now + stat, horizon) - now
+                bay_busy[code] += min(now + loading[code], horizon) - now
+                for kind_done, delay in ((_TRUCK_RETURN, ttat), (_SKID_RETURN, stat), (_BAY_FREE, loading[code])):
+                    sequence += 1
+                    heapq.heappush(events, (now + delay, sequence, kind_done, code, None))
+
+        sim_ms = (time.perf_counter() - started) * 1000
+
+        # Price completed trips (truck back within the horizon) in one batch
+        completed = [item for item in trips if item[2] + item[5] <= horizon]
+        calculator = calculator or get_calculator('mother_station_wait')
+        profits = np.zeros(0)
+        if completed:
+            batch = [dict(routes[names[item[0]], item[1]][0], mother_station_wait_time=item[3]) for item in completed]
+            columns = calculator.trip_columns(batch)
+            profits = calculator.calculate_batch(columns)['profit']
+
+        trip_volume = {client['name']: self._volume_per_trip(client) for client in self.sourcing.clients}
+        capacity = {station['name']: station.get('capacity') for station in self.sourcing.stations}
+        station_volume = dict.fromkeys(names, 0.0)
+        for _, station, client in requests:
+            station_volume[station] += trip_volume[client]
+
+        station_rows = {}
+        for code, name in enumerate(names):
+            assets = self.fleet[name]
+            dispatched = [item for item in trips if item[0] == code]
+            done = [item for item in completed if item[0] == code]
+            truck_hours = assets['trucks'] * horizon
+            truck_wait = sum(item[3] for item in dispatched)
+            station_rows[name] = {
+                'trips_requested': sum(1 for _, station, _ in requests if station == name),
+                'trips_completed': len(done),
+                'backlog': len(pending[code]),
+                'volume_requested': round(station_volume[name], 2),
+                'capacity': capacity[name],
+                'truck_utilization_percent': _percent(truck_busy[code], truck_hours),
+                'skid_utilization_percent': _percent(skid_busy[code], assets['skids'] * horizon),
+                'bay_utilization_percent': _percent(bay_busy[code], assets['loading_bays'] * horizon),
+                'truck_wait_hours': round(truck_wait, 2),
+                'truck_idle_hours': round(max(truck_hours - truck_busy[code] - truck_wait, 0.0), 2),
+                'average_request_wait_hours': round(sum(item[4] for item in dispatched) / len(dispatched), 2)
+                                              if dispatched else 0,
+                'profit': round(float(sum(profit for item, profit in zip(completed, profits.tolist())
+                                          if item[0] == code)), 2),
+            }
+
+        client_rows = {}
+        for client in {client for _, _, client in requests}:
+            dispatched = [item for item in trips if item[1] == client]
+            client_rows[client] = {
+                'trips_requested': sum(1 for _, _, name in requests if name == client),
+                'trips_completed': sum(1 for item in completed if item[1] == client),
+                'max_request_wait_hours': round(max((item[4] for item in dispatched), default=0.0), 2),
+            }
+
+        waits = [item[4] for item in trips]
+        totals = {
+            'trips_requested': len(requests),
+            'trips_completed': len(completed),
+            'backlog': sum(len(queue) for queue in pending),
+            'profit': round(float(profits.sum()), 2),
+            'truck_utilization_percent': _percent(sum(truck_busy),
+                                                  sum(self.fleet[name]['trucks'] for name in names) * horizon),
+            'skid_utilization_percent': _percent(sum(skid_busy),
+                                                 sum(self.fleet[name]['skids'] for name in names) * horizon),
+            'truck_wait_hours': round(sum(row['truck_wait_hours'] for row in station_rows.values()), 2),
+            'truck_idle_hours': round(sum(row['truck_idle_hours'] for row in station_rows.values()), 2),
+            'average_request_wait_hours': round(sum(waits) / len(waits), 2) if waits else 0,
+            'p95_request_wait_hours': round(float(np.percentile(waits, 95)), 2) if waits else 0,
+            'capacity_violations': {name: round(station_volume[name] - capacity[name], 2) for name in names
+                                    if capacity[name] is not None and station_volume[name] > capacity[name]},
+        }
+        return {'totals': totals, 'stations': station_rows, 'clients': client_rows,
+                'events': handled, 'sim_ms': round(sim_ms, 2)}
+
+    def compare(self, plans: Mapping[str, List[Mapping[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Simulate several plans on the same fleet.
+
+        Args:
+            plans (Mapping): Plan name -> plan
+
+        Returns:
+            dict: Plan name -> simulate() result
+        """
+        return {name: self.simulate(plan) for name, plan in plans.items()}
+
+
+def _percent(part: float, whole: float) -> float:
+    return round(part / whole * 100, 2) if whole else 0
+
+
+def main():
+    """
+    Command-line entry point for the fleet simulator.
+    """
+    parser = argparse.ArgumentParser(description="Simulate truck and skid utilization for sourcing plans")
+    parser.add_argument('config_file', nargs='?', default='fleet.json')
+    parser.add_argument('--plan', action='append', help="Simulate only these plans (repeatable; 'optimized' included)")
+    parser.add_argument('--horizon', type=float, help="Simulated hours (default: horizon_hours from the config)")
+    parser.add_argument('--json', help="Write the full results to this JSON file")
+    args = parser.parse_args()
+
+    simulator = FleetSimulator.from_file(args.config_file)
+    if args.horizon:
+        simulator.horizon = args.horizon
+    plans = dict(simulator.plans)
+    plans['optimized'] = simulator.optimized_plan()
+    if args.plan:
+        unknown = [name for name in args.plan if name not in plans]
+        if unknown:
+            parser.error(f"Unknown plan(s): {', '.join(unknown)} (available: {', '.join(plans)})")
+        plans = {name: plans[name] for name in args.plan}
+
+    results = simulator.compare(plans)
+
+    print("PowerGas Fleet Utilization Simulator")
+    print("="*80)
+    print(f"{'Plan':<18}{'Trips':>11}{'Backlog':>8}{'Truck %':>9}{'Skid %':>8}{'Wait h':>8}{'Idle h':>8}{'Profit (NGN)':>16}")
+    print("-"*86)
+    for name, result in results.items():
+        totals = result['totals']
+        print(f"{name:<18}{totals['trips_completed']:>5}/{totals['trips_requested']:<5}{totals['backlog']:>8}"
+              f"{totals['truck_utilization_percent']:>9.1f}{totals['skid_utilization_percent']:>8.1f}"
+              f"{totals['truck_wait_hours']:>8.1f}{totals['truck_idle_hours']:>8.0f}{totals['profit']:>16,.0f}")
+
+    for name, result in results.items():
+        print(f"\n{name} ({result['events']:,} events in {result['sim_ms']:.1f} ms)")
+        for station, excess in result['totals']['capacity_violations'].items():
+            row = result['stations'][station]
+            print(f"  WARNING: {station} asked for {row['volume_requested']:,.0f} scm, capacity "
+                  f"{row['capacity']:,.0f} scm ({excess:,.0f} over)")
+        for station, row in result['stations'].items():
+            if row['trips_requested']:
+                print(f"  {station:<12} {row['trips_completed']:>4}/{row['trips_requested']:<4} trips   "
+                      f"trucks {row['truck_utilization_percent']:5.1f}%   skids {row['skid_utilization_percent']:5.1f}%   "
+                      f"bays {row['bay_utilization_percent']:5.1f}%   avg request wait "
+                      f"{row['average_request_wait_hours']:.1f} h")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved to: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
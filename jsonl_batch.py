@@ -0,0 +1,175 @@
+"""
+PowerGas JSONL Batch Processing
+
+Streams a JSONL file of trip_data records (one JSON object per line) through
+the calculator on a pool of worker processes and writes one
+calculate_trip_profit()-shaped result per line.
+
+Lines are sent to the workers in chunks; each chunk is validated and
+calculated with one calculate_batch() call. Records that are not valid JSON
+objects, or lack a required numeric input, are skipped and logged with their
+line number - they never stop the run. Results are written in input order, or
+as soon as each chunk finishes with ordered=False (each result then carries
+its input 'line').
+
+Usage:
+    python profitability_calculator.py batch trips.jsonl results.jsonl --workers 4
+"""
+
+import json
+import os
+import sys
+import time
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from profitability_calculator import get_calculator, batch_result_records
+
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def calculate_lines(cost_model: str, first_line: int, lines: List[str],
+                    with_line: bool = False) -> Tuple[str, int, List[Tuple[int, str]]]:
+    """
+    Parse and calculate a chunk of JSONL lines (runs in a worker process).
+
+    Results are serialized here so the parent process only writes text.
+
+    Args:
+        cost_model (str): Registered cost model name
+        first_line (int): Line number of lines[0]
+        lines (list): Raw JSONL lines
+        with_line (bool): Add the input line number to each result
+
+    Returns:
+        tuple: (JSONL result text, result count, [(line number, error message)])
+    """
+    calculator = get_calculator(cost_model)
+    records, numbers, errors = [], [], []
+    for number, line in enumerate(lines, first_line):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            errors.append((number, f"invalid JSON ({e})"))
+            continue
+        if not isinstance(record, dict):
+            errors.append((number, "not a JSON object"))
+            continue
+        records.append(record)
+        numbers.append(number)
+
+    try:
+        columns = calculator.trip_columns(records)
+    except (KeyError, ValueError):
+        # Fall back to record-by-record validation to find the bad ones
+        valid = []
+        for number, record in zip(numbers, records):
+            try:
+                calculator.trip_columns([record])
+                valid.append((number, record))
+            except (KeyError, ValueError) as e:
+                errors.append((number, e.args[0].replace('Trip 0: ', '')))
+        numbers = [number for number, _ in valid]
+        records = [record for _, record in valid]
+        columns = calculator.trip_columns(records)
+
+    errors.sort(key=lambda error: error[0])
+    if not records:
+        return '', 0, errors
+    results = batch_result_records(columns, calculator.calculate_batch(columns))
+    if with_line:
+        for number, result in zip(numbers, results):
+            result['line'] = number
+    return ''.join(json.dumps(result) + '\n' for result in results), len(results), errors
+
+
+def _read_chunks(f: TextIO, chunk_size: int) -> Iterator[Tuple[int, List[str]]]:
+    chunk: List[str] = []
+    first_line = 1
+    for number, line in enumerate(f, 1):
+        chunk.append(line)
+        if len(chunk) == chunk_size:
+            yield first_line, chunk
+            chunk = []
+            first_line = number + 1
+    if chunk:
+        yield first_line, chunk
+
+
+def process_jsonl(input_path: str, output_path: str, workers: Optional[int] = 1, ordered: bool = True,
+                  chunk_size: int = DEFAULT_CHUNK_SIZE, cost_model: str = 'base',
+                  error_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Calculate every trip_data record in a JSONL file.
+
+    Args:
+        input_path (str): JSONL file of trip_data records
+        output_path (str): JSONL results file
+        workers (int): Worker processes (1 = in this process, None = one per CPU core)
+        ordered (bool): Write results in input order (False: as chunks finish,
+            with a 'line' field on each result)
+        chunk_size (int): Lines per worker task
+        cost_model (str): Registered cost model name
+        error_path (str): JSONL file for skipped records ({"line", "error"});
+            printed to stderr when omitted
+
+    Returns:
+        dict: records, results, errors, seconds and records_per_second
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    get_calculator(cost_model)
+
+    summary = {'records': 0, 'results': 0, 'errors': 0}
+    started = time.perf_counter()
+
+    # The input is opened first so a bad path leaves the output untouched
+    with open(input_path, 'r') as source, open(output_path, 'w') as output, \
+            (open(error_path, 'w') if error_path else open(os.devnull, 'w')) as error_log:
+
+        def write(text, count, errors):
+            output.write(text)
+            for number, message in errors:
+                if error_path:
+                    error_log.write(json.dumps({'line': number, 'error': message}) + '\n')
+                else:
+                    print(f"{input_path}:{number}: skipped - {message}", file=sys.stderr)
+            summary['results'] += count
+            summary['errors'] += len(errors)
+            summary['records'] += count + len(errors)
+
+        if workers == 1:
+            for first_line, lines in _read_chunks(source, chunk_size):
+                write(*calculate_lines(cost_model, first_line, lines, not ordered))
+        else:
+            from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+            in_flight: deque = deque()
+
+            def drain(limit):
+                # Bounded in-flight chunks keep memory flat on any file size
+                while len(in_flight) > limit:
+                    if ordered:
+                        write(*in_flight.popleft().result())
+                        continue
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        in_flight.remove(future)
+                        write(*future.result())
+
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for first_line, lines in _read_chunks(source, chunk_size):
+                    in_flight.append(executor.submit(calculate_lines, cost_model, first_line, lines, not ordered))
+                    drain(workers * 4)
+                drain(0)
+
+    summary['seconds'] = round(time.perf_counter() - started, 3)
+    summary['records_per_second'] = round(summary['records'] / summary['seconds']) if summary['seconds'] else 0
+    return summary
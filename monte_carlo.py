@@ -0,0 +1,296 @@
+"""
+PowerGas Monte Carlo Profit-Risk Simulator
+
+Sensor-tracked inputs such as turnaround time and round trip distance are
+noisy, so a single deterministic profit figure hides risk. This module samples
+selected trip_data fields from user-specified distributions, evaluates the
+profitability formula on every draw with the vectorized batch engine (in
+chunks), and reports profit percentiles, the probability of a loss and how
+much of the profit variance each formula component contributes.
+
+Simulation file format (see simulation.json):
+    {
+      "base_trip": { ... same fields as trip_data ... },
+      "distributions": {
+        "truck_turnaround_time": {"dist": "normal", "mean": 12, "std": 1.5, "min": 0},
+        "round_trip_distance": {"dist": "triangular", "low": 220, "mode": 240, "high": 300}
+      }
+    }
+
+Supported distributions:
+    normal      mean (defaults to the base value), std
+    lognormal   mean (defaults to the base value), std - of the variable itself
+    uniform     low, high
+    triangular  low, mode (defaults to the base value), high
+Optional "min"/"max" keys clip the sampled values.
+
+Usage:
+    python monte_carlo.py simulation.json --draws 1000000 --seed 42
+"""
+
+import argparse
+import json
+import math
+from typing import Any, Dict, Optional
+
+from profitability_calculator import ProfitabilityCalculator, get_calculator
+
+
+DEFAULT_DRAWS = 1000000
+DEFAULT_CHUNK_SIZE = 250000
+
+PERCENTILES = (1, 5, 10, 25, 50, 75, 90, 95, 99)
+
+# Formula components and their sign in the profit equation
+PROFIT_COMPONENTS = (
+    ('revenue', 1.0),
+    ('production_costs', -1.0),
+    ('truck_expenses', -1.0),
+    ('trucking_costs', -1.0),
+    ('skid_costs', -1.0),
+)
+
+DISTRIBUTIONS = ('normal', 'lognormal', 'uniform', 'triangular')
+
+
+def _sampler(spec: Dict[str, Any], base_value: float):
+    """
+    Build a function drawing n samples for one distribution spec.
+
+    Args:
+        spec (dict): Distribution spec with a 'dist' key and its parameters
+        base_value (float): Base trip value, used as the default centre
+
+    Returns:
+        callable: sample(rng, n) -> numpy.ndarray
+    """
+    import numpy as np
+
+    dist = spec.get('dist')
+    if dist not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown distribution '{dist}' (expected one of {', '.join(DISTRIBUTIONS)})")
+
+    if dist == 'normal':
+        mean, std = float(spec.get('mean', base_value)), float(spec['std'])
+        draw = lambda rng, n: rng.normal(mean, std, n)
+    elif dist == 'lognormal':
+        mean, std = float(spec.get('mean', base_value)), float(spec['std'])
+        if mean <= 0:
+            raise ValueError("lognormal mean must be positive")
+        sigma = math.sqrt(math.log1p((std / mean) ** 2))
+        mu = math.log(mean) - sigma ** 2 / 2
+        draw = lambda rng, n: rng.lognormal(mu, sigma, n)
+    elif dist == 'uniform':
+        low, high = float(spec['low']), float(spec['high'])
+        draw = lambda rng, n: rng.uniform(low, high, n)
+    else:
+        low, mode, high = float(spec['low']), float(spec.get('mode', base_value)), float(spec['high'])
+        draw = lambda rng, n: rng.triangular(low, mode, high, n)
+
+    lower, upper = spec.get('min'), spec.get('max')
+    if lower is None and upper is None:
+        return draw
+    return lambda rng, n: np.clip(draw(rng, n), lower, upper)
+
+
+class MonteCarloSimulator:
+    """
+    Vectorized Monte Carlo simulation of trip profit.
+
+    Attributes:
+        base_trip (dict): Trip data for every field that is not sampled
+        distributions (dict): Sampled field name -> distribution spec
+    """
+
+    def __init__(self, base_trip: Dict[str, Any], distributions: Dict[str, Dict[str, Any]]):
+        """
+        Initialize the simulator.
+
+        Args:
+            base_trip (dict): Trip data for every field that is not sampled
+            distributions (dict): Sampled field name -> distribution spec;
+                checked against the calculator's cost model in run()
+        """
+        self.base_trip = base_trip
+        self.distributions = distributions
+        self._samplers = {field: _sampler(spec, float(base_trip.get(field, 0.0)))
+                          for field, spec in distributions.items()}
+
+    @classmethod
+    def from_file(cls, simulation_file: str) -> 'MonteCarloSimulator':
+        """
+        Load a simulation definition from a JSON file.
+
+        Args:
+            simulation_file (str): Path to the simulation JSON file
+
+        Returns:
+            MonteCarloSimulator: The loaded simulator
+        """
+        with open(simulation_file, 'r') as f:
+            simulation_data = json.load(f)
+        return cls(simulation_data['base_trip'], simulation_data['distributions'])
+
+    def run(self, draws: int = DEFAULT_DRAWS, seed: Optional[int] = None,
+            chunk_size: int = DEFAULT_CHUNK_SIZE,
+            calculator: Optional[ProfitabilityCalculator] = None) -> Dict[str, Any]:
+        """
+        Run the simulation.
+
+        Results are reproducible for a given seed and chunk_size. Only the
+        profit of each draw is kept (8 bytes per draw) for exact percentiles;
+        everything else is reduced chunk by chunk.
+
+        Args:
+            draws (int): Number of draws
+            seed (int): Random seed for reproducibility (optional)
+            chunk_size (int): Draws evaluated per vectorized pass
+            calculator (ProfitabilityCalculator): Calculator to use (optional)
+
+        Returns:
+            dict: Profit statistics, percentiles, probability of loss and
+                per-component variance contribution
+        """
+        import numpy as np
+
+        if draws < 1:
+            raise ValueError("draws must be at least 1")
+
+        if calculator is None:
+            calculator = get_calculator()
+
+        fields = calculator.cost_model.fields
+        unknown = [field for field in self.distributions if field not in fields]
+        if unknown:
+            raise ValueError(f"Cannot sample fields not used by cost model "
+                             f"'{calculator.cost_model.name}': {', '.join(unknown)}")
+        # Fields missing from base_trip are left out so cost-model defaults apply
+        fixed = {field: float(self.base_trip[field]) for field in fields
+                 if field not in self._samplers and self.base_trip.get(field) is not None}
+
+        rng = np.random.default_rng(seed)
+        profits = np.empty(draws, dtype=np.float64)
+        covariance = _ProfitCovariance()
+
+        for start in range(0, draws, chunk_size):
+            size = min(chunk_size, draws - start)
+            columns = {field: self._samplers[field](rng, size) for field in fields if field in self._samplers}
+            columns.update((field, np.full(size, value)) for field, value in fixed.items())
+
+            results = calculator.calculate_batch(columns, round_results=False)
+            profits[start:start + size] = results['profit']
+            covariance.update(results)
+
+        profit_variance = covariance.profit_variance()
+        contributions = {}
+        for name, _ in PROFIT_COMPONENTS:
+            share = covariance.component_covariance(name) / profit_variance if profit_variance > 0 else 0.0
+            contributions[name] = round(share * 100, 2)
+
+        percentile_values = np.percentile(profits, PERCENTILES)
+        losses = profits < 0
+
+        return {
+            'draws': draws,
+            'seed': seed,
+            'sampled_fields': list(self.distributions),
+            'profit_mean': round(float(profits.mean()), 2),
+            'profit_std': round(math.sqrt(profit_variance), 2),
+            'profit_min': round(float(profits.min()), 2),
+            'profit_max': round(float(profits.max()), 2),
+            'profit_percentiles': {f'p{p}': round(float(value), 2)
+                                   for p, value in zip(PERCENTILES, percentile_values)},
+            'probability_of_loss': round(float(losses.mean()), 6),
+            'expected_loss_given_loss': round(float(profits[losses].mean()), 2) if losses.any() else 0.0,
+            'variance_contribution_percent': contributions,
+        }
+
+
+class _ProfitCovariance:
+    """
+    Streaming covariance of each signed component with profit.
+
+    Uses the pairwise (Chan et al.) update so chunked results match a single
+    pass over all draws. Because profit is the sum of the signed components,
+    the component covariances divided by Var(profit) sum to 100%. Shares can
+    exceed 100% or go negative when components offset each other (gas volume
+    moves revenue and production costs together).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.means = {}
+        self.comoments = {}
+
+    def update(self, results: Dict[str, Any]):
+        profit = results['profit']
+        count = len(profit)
+        series = {name: sign * results[name] for name, sign in PROFIT_COMPONENTS}
+        series['profit'] = profit
+
+        means = {name: float(values.mean()) for name, values in series.items()}
+        centred_profit = profit - means['profit']
+        comoments = {name: float(((values - means[name]) * centred_profit).sum())
+                     for name, values in series.items()}
+
+        if not self.count:
+            self.count, self.means, self.comoments = count, means, comoments
+            return
+
+        total = self.count + count
+        weight = self.count * count / total
+        profit_delta = means['profit'] - self.means['profit']
+        for name in series:
+            delta = means[name] - self.means[name]
+            self.comoments[name] += comoments[name] + delta * profit_delta * weight
+            self.means[name] += delta * count / total
+        self.count = total
+
+    def profit_variance(self) -> float:
+        return self.comoments['profit'] / self.count
+
+    def component_covariance(self, name: str) -> float:
+        return self.comoments[name] / self.count
+
+
+def main():
+    """
+    Command-line entry point for Monte Carlo simulation.
+    """
+    parser = argparse.ArgumentParser(description="Monte Carlo simulation of trip profit risk")
+    parser.add_argument('simulation_file', nargs='?', default='simulation.json',
+                        help="Simulation definition JSON")
+    parser.add_argument('--draws', type=int, default=DEFAULT_DRAWS)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--json', action='store_true', help="Print the full summary as JSON")
+    args = parser.parse_args()
+
+    simulator = MonteCarloSimulator.from_file(args.simulation_file)
+    summary = simulator.run(args.draws, args.seed, args.chunk_size)
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    print("PowerGas Monte Carlo Profit Simulation")
+    print("="*80)
+    print(f"Draws: {summary['draws']:,}   Seed: {summary['seed']}   "
+          f"Sampled: {', '.join(summary['sampled_fields'])}")
+    print(f"\nMean Profit:          NGN {summary['profit_mean']:>15,.2f}")
+    print(f"Std Deviation:        NGN {summary['profit_std']:>15,.2f}")
+    print(f"Probability of Loss:      {summary['probability_of_loss'] * 100:>15.2f}%")
+
+    print("\nProfit Percentiles:")
+    print("-"*80)
+    for name, value in summary['profit_percentiles'].items():
+        print(f"  {name:<6}NGN {value:>15,.2f}")
+
+    print("\nVariance Contribution by Component:")
+    print("-"*80)
+    for name, share in summary['variance_contribution_percent'].items():
+        print(f"  {name.replace('_', ' ').title():<20}{share:>8.2f}%")
+
+
+if __name__ == "__main__":
+    main()
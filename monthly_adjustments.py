@@ -0,0 +1,319 @@
+"""
+PowerGas Monthly Adjustments (Phase 7: monthly input of updated values)
+
+Every month PEL sends adjustments to exchange rates, selling price, gas costs
+and total volume sold, which set the per-scm plant cost and SG&A (G&A) split.
+Those inputs only affect the trips of one month, so there is no need to
+re-run the whole history. TripLedger stores each trip's cost-model inputs and
+component breakdown once, indexed by (month, Mother Station). An adjustment
+re-evaluates just the affected trips through the ledger's calculator (so GVD
+and other cost models re-price on their own volume basis) and patches the
+client × Mother Station matrix (see profitability_matrix.py) by the
+difference.
+
+Results are rounded per trip like calculate_batch() and
+ProfitabilityMatrix.add(), so ledger totals reconcile with a matrix built
+from the same trips.
+
+Adjustment fields (all optional except month):
+    month                       YYYY-MM the adjustment applies to
+    mother_station              Restrict to one Mother Station
+    daughter_station            Restrict to one client (e.g. client price change)
+    gas_price, gas_cost         NGN per scm
+    exchange_rate               NGN per USD, converts gas_price_usd / gas_cost_usd
+    gas_price_usd, gas_cost_usd USD per scm
+    plant_cost, ga_cost         NGN per scm
+    plant_costs, sga_costs      Total NGN for the month, split per scm using
+    total_volume                total scm sold in the month
+
+Usage:
+    python monthly_adjustments.py trips.csv adjustments.json
+"""
+
+import argparse
+import json
+import time
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from profitability_calculator import ProfitabilityCalculator, get_calculator
+from profitability_matrix import ProfitabilityMatrix, ALL, factorize
+
+
+# Per-scm inputs an adjustment can change
+RATE_FIELDS = ('gas_price', 'gas_cost', 'plant_cost', 'ga_cost')
+
+# Results stored per trip and recomputed by an adjustment
+LEDGER_FIELDS = ('revenue', 'production_costs', 'truck_expenses', 'trucking_costs',
+                 'skid_costs', 'total_costs', 'profit')
+
+
+def resolve_rates(adjustment: Mapping[str, Any]) -> Dict[str, float]:
+    """
+    Convert a PEL adjustment into per-scm NGN rates.
+
+    Args:
+        adjustment (Mapping): Adjustment fields (see module docstring)
+
+    Returns:
+        dict: The RATE_FIELDS set by the adjustment (others are left unchanged)
+    """
+    rates = {}
+    exchange_rate = adjustment.get('exchange_rate')
+
+    for field in ('gas_price', 'gas_cost'):
+        if field in adjustment:
+            rates[field] = float(adjustment[field])
+        elif f'{field}_usd' in adjustment:
+            if exchange_rate is None:
+                raise ValueError(f"{field}_usd requires exchange_rate")
+            rates[field] = float(adjustment[f'{field}_usd']) * float(exchange_rate)
+
+    total_volume = adjustment.get('total_volume')
+    for field, total in (('plant_cost', 'plant_costs'), ('ga_cost', 'sga_costs')):
+        if field in adjustment:
+            rates[field] = float(adjustment[field])
+        elif total in adjustment:
+            if not total_volume:
+                raise ValueError(f"{total} requires a positive total_volume")
+            rates[field] = float(adjustment[total]) / float(total_volume)
+
+    return rates
+
+
+class TripLedger:
+    """
+    Per-trip component ledger supporting incremental re-pricing by month.
+
+    Attributes:
+        matrix (ProfitabilityMatrix): Client × Mother Station × month totals,
+            kept in step with every adjustment
+    """
+
+    def __init__(self, calculator: Optional[ProfitabilityCalculator] = None):
+        """
+        Initialize an empty ledger.
+
+        Args:
+            calculator (ProfitabilityCalculator): Calculator used for new trips
+                (optional)
+        """
+        self.calculator = calculator or get_calculator()
+        self.matrix = ProfitabilityMatrix(self.calculator)
+        # Cost-model inputs kept per trip so adjustments can re-run the model
+        self._inputs = tuple(dict.fromkeys(('gas_volume',) + RATE_FIELDS + self.calculator.cost_model.fields))
+        self._pending: List[Dict[str, Any]] = []
+        self._columns: Dict[str, Any] = {}
+        self._index: Dict[Tuple[str, str], Any] = {}
+
+    def add(self, trips: Mapping[str, Any], month: Optional[str] = None) -> int:
+        """
+        Calculate a batch of trips and record their component breakdown.
+
+        Args:
+            trips (Mapping): Columnar trip data (see calculate_batch) with
+                mother_station, daughter_station and trip_date (or pass month)
+            month (str): Month (YYYY-MM) for every trip, used instead of trip_date
+
+        Returns:
+            int: Number of trips added
+        """
+        import numpy as np
+
+        results = self.calculator.calculate_batch(trips)
+        size = len(results['profit'])
+        if not size:
+            return 0
+
+        if month is not None:
+            months = np.full(size, month)
+        elif 'trip_date' in trips:
+            months = np.asarray([str(value)[:7] for value in trips['trip_date']])
+        else:
+            months = np.full(size, ALL)
+
+        batch = {
+            'month': months,
+            'mother_station': np.asarray(trips.get('mother_station', np.full(size, 'N/A')), dtype=np.str_),
+            'daughter_station': np.asarray(trips.get('daughter_station', np.full(size, 'N/A')), dtype=np.str_),
+        }
+        for field in self._inputs:
+            # Missing optional inputs are stored as NaN so the model's defaults apply
+            batch[field] = (np.array(trips[field], dtype=np.float64) if field in trips
+                            else np.full(size, np.nan))
+        for field in LEDGER_FIELDS:
+            batch[field] = np.asarray(results[field], dtype=np.float64)
+
+        self._pending.append(batch)
+        self.matrix.add(batch, results, month=months)
+        return size
+
+    def _consolidate(self):
+        """Concatenate pending batches and rebuild the (month, station) index."""
+        import numpy as np
+
+        if not self._pending:
+            return
+
+        batches = ([self._columns] if self._columns else []) + self._pending
+        self._columns = {field: np.concatenate([batch[field] for batch in batches])
+                         for field in self._pending[0]}
+        self._pending = []
+
+        months, month_codes = factorize(self._columns['month'])
+        stations, station_codes = factorize(self._columns['mother_station'])
+        combined = month_codes * len(stations) + station_codes
+        order = np.argsort(combined, kind='stable')
+        group_codes, starts = np.unique(combined[order], return_index=True)
+        bounds = np.append(starts, len(order))
+
+        self._index = {}
+        for position, code in enumerate(group_codes.tolist()):
+            month_code, station_code = divmod(code, len(stations))
+            self._index[(months[month_code], stations[station_code])] = order[bounds[position]:bounds[position + 1]]
+
+    def __len__(self) -> int:
+        return len(self._columns.get('profit', ())) + sum(len(batch['profit']) for batch in self._pending)
+
+    def trips(self, month: str, mother_station: Optional[str] = None) -> Any:
+        """
+        Ledger positions of the trips for a month (and Mother Station).
+
+        Args:
+            month (str): Month (YYYY-MM)
+            mother_station (str): Mother Station (all stations if omitted)
+
+        Returns:
+            numpy.ndarray: Positions into the ledger columns
+        """
+        import numpy as np
+
+        self._consolidate()
+        if mother_station is not None:
+            return self._index.get((month, mother_station), np.empty(0, dtype=np.intp))
+        selected = [positions for (key_month, _), positions in self._index.items() if key_month == month]
+        return np.concatenate(selected) if selected else np.empty(0, dtype=np.intp)
+
+    def apply_adjustment(self, adjustment: Mapping[str, Any]) -> Dict[str, Any]:
+        """
+        Re-price the trips affected by a monthly adjustment.
+
+        The matching trips are re-evaluated through the ledger's
+        calculator with the new rates; the matrix is patched by the
+        difference.
+
+        Args:
+            adjustment (Mapping): Adjustment fields (see module docstring)
+
+        Returns:
+            dict: month, trips recomputed, profit before/after, profit change
+                and elapsed_ms
+        """
+        started = time.perf_counter()
+        rates = resolve_rates(adjustment)
+        month = adjustment['month']
+        positions = self.trips(month, adjustment.get('mother_station'))
+
+        columns = self._columns
+        if len(positions) and adjustment.get('daughter_station') is not None:
+            positions = positions[columns['daughter_station'][positions] == adjustment['daughter_station']]
+
+        summary = {'month': month, 'trips': int(len(positions)), 'rates': rates,
+                   'profit_before': 0.0, 'profit_after': 0.0}
+        if not len(positions) or not rates:
+            summary['profit_change'] = 0.0
+            summary['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 3)
+            return summary
+
+        for field, value in rates.items():
+            columns[field][positions] = value
+
+        before = {field: columns[field][positions] for field in LEDGER_FIELDS}
+        after = self.calculator.calculate_batch({field: columns[field][positions] for field in self._inputs})
+        for field in LEDGER_FIELDS:
+            columns[field][positions] = after[field]
+
+        self._patch_matrix(positions, before, after)
+
+        summary['profit_before'] = round(float(before['profit'].sum()), 2)
+        summary['profit_after'] = round(float(after['profit'].sum()), 2)
+        summary['profit_change'] = round(summary['profit_after'] - summary['profit_before'], 2)
+        summary['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 3)
+        return summary
+
+    def _patch_matrix(self, positions: Any, before: Mapping[str, Any], after: Mapping[str, Any]):
+        """Add the per-group change of the recomputed fields to the matrix."""
+        import numpy as np
+
+        clients, client_codes = factorize(self._columns['daughter_station'][positions])
+        stations, station_codes = factorize(self._columns['mother_station'][positions])
+        combined = client_codes * len(stations) + station_codes
+        group_codes, inverse = np.unique(combined, return_inverse=True)
+        inverse = inverse.ravel()
+        month = self._columns['month'][positions[0]]
+
+        deltas = {field: np.bincount(inverse, after[field] - before[field], minlength=len(group_codes)).tolist()
+                  for field in LEDGER_FIELDS}
+        for position, code in enumerate(group_codes.tolist()):
+            client_code, station_code = divmod(code, len(stations))
+            totals = self.matrix.groups[(clients[client_code], stations[station_code], str(month))]
+            for field in LEDGER_FIELDS:
+                totals[field] += deltas[field][position]
+
+    @classmethod
+    def from_trip_log(cls, path: str, chunk_size: int = 50000,
+                      calculator: Optional[ProfitabilityCalculator] = None) -> 'TripLedger':
+        """
+        Build a ledger by streaming a CSV/JSONL trip log.
+
+        Args:
+            path (str): Trip log (see trip_ingest.py)
+            chunk_size (int): Trips per vectorized pass
+            calculator (ProfitabilityCalculator): Calculator to use (optional)
+
+        Returns:
+            TripLedger: Populated ledger
+        """
+        from trip_ingest import read_trip_chunks
+
+        ledger = cls(calculator)
+        for chunk in read_trip_chunks(path, chunk_size, cost_model=ledger.calculator.cost_model):
+            ledger.add(chunk)
+        return ledger
+
+
+def main():
+    """
+    Apply a file of monthly adjustments to a trip log and report the impact.
+    """
+    parser = argparse.ArgumentParser(description="Apply PEL monthly adjustments incrementally")
+    parser.add_argument('trip_log', help="Trip log (.csv or .jsonl)")
+    parser.add_argument('adjustments', nargs='?', default='adjustments.json')
+    args = parser.parse_args()
+
+    with open(args.adjustments, 'r') as f:
+        adjustments = json.load(f)['adjustments']
+
+    started = time.perf_counter()
+    ledger = TripLedger.from_trip_log(args.trip_log)
+    print("PowerGas Monthly Adjustments")
+    print("="*80)
+    print(f"Ledger built: {len(ledger):,} trips in {time.perf_counter() - started:.2f}s\n")
+
+    for adjustment in adjustments:
+        summary = ledger.apply_adjustment(adjustment)
+        scope = adjustment.get('mother_station') or 'all Mother Stations'
+        if adjustment.get('daughter_station'):
+            scope += f" / {adjustment['daughter_station']}"
+        print(f"{summary['month']} ({scope}): {summary['trips']:,} trips re-priced in {summary['elapsed_ms']:.1f} ms")
+        print(f"    Profit: NGN {summary['profit_before']:,.2f} -> NGN {summary['profit_after']:,.2f} "
+              f"({summary['profit_change']:+,.2f})")
+
+    print(f"\n{'Client':<22}{'Mother Station':<18}{'Trips':>10}{'Profit (NGN)':>22}{'Margin %':>10}")
+    print("-"*82)
+    for row in ledger.matrix.table(('daughter_station', 'mother_station')):
+        print(f"{row['daughter_station']:<22}{row['mother_station']:<18}{row['trips']:>10,}"
+              f"{row['profit']:>22,.2f}{row['profit_margin_percent']:>9.2f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""
+PowerGas PRMS Dispensing Join (Phase 6: PRMS dispensing input)
+
+Replaces GV with GVD - the volume actually dispensed according to
+waybills/PRMS - by matching dispensing records to trips on truck, Daughter
+Station and the trip's time window.
+
+Dispensing records (CSV/JSONL, one per dispensing event):
+    truck_id      Truck that dispensed
+    station       Daughter Station dispensed at
+    dispensed_at  Epoch seconds or ISO-8601 UTC time
+    volume        scm dispensed
+
+Records are indexed once, sorted by (truck, station, time) on a single int64
+composite key. Matching a batch of trips is then two searchsorted() calls -
+the events inside each trip window are a contiguous slice - and the volumes
+of a trip's events are summed, so a split delivery (several records in one
+trip) is counted once.
+
+Trips of one truck never overlap in time, but their windows widened by the
+tolerance can: two back-to-back trips to the same station share the gap
+between them. Each event is therefore assigned to exactly one trip - the one
+whose departure -> return window is nearest (distance 0 inside it, ties to
+the earlier departure). The index remembers assigned events, so a later batch
+never counts an event again.
+
+Trips without a matching record get NaN for gas_volume_dispensed; the 'gvd'
+cost model then falls back to GV for them.
+
+Usage:
+    python prms_join.py trip_results.csv dispensing.csv joined.csv
+"""
+
+import argparse
+import csv
+import json
+from typing import Any, Dict, Iterator, List, Sequence
+
+from trip_ingest import detect_format, iter_records
+from telematics import parse_timestamps
+
+
+DISPENSING_FIELDS = ('truck_id', 'station', 'dispensed_at', 'volume')
+
+# Trip columns needed to match dispensing records
+WINDOW_FIELDS = ('truck_id', 'daughter_station', 'departure_time', 'return_time')
+
+DEFAULT_TOLERANCE_MINUTES = 30
+
+
+class DispensingIndex:
+    """
+    Sorted index of PRMS dispensing records for trip-window matching.
+
+    Attributes:
+        tolerance (float): Seconds added to both ends of each trip window to
+            absorb clock differences between PRMS and the telematics
+        events (int): Number of indexed dispensing records
+        matched_events (int): Records matched to a trip so far
+        trips (int): Trips looked up so far
+        matched_trips (int): Trips that got a GVD so far
+    """
+
+    def __init__(self, truck_id: Sequence[Any], station: Sequence[Any], dispensed_at: Sequence[Any],
+                 volume: Sequence[float], tolerance_minutes: float = DEFAULT_TOLERANCE_MINUTES):
+        """
+        Build the index from columnar dispensing records.
+
+        Args:
+            truck_id (sequence): Truck per record
+            station (sequence): Daughter Station per record
+            dispensed_at (sequence): Epoch seconds or ISO-8601 times
+            volume (sequence): scm dispensed per record
+            tolerance_minutes (float): Minutes a record may fall outside the
+                trip window
+        """
+        import numpy as np
+        from profitability_matrix import factorize
+
+        self.tolerance = float(tolerance_minutes) * 60
+        trucks, truck_codes = factorize(truck_id)
+        stations, station_codes = factorize(station)
+        self._trucks = np.asarray(trucks, dtype=np.str_)
+        self._stations = np.asarray(stations, dtype=np.str_)
+
+        seconds = np.floor(parse_timestamps(dispensed_at)).astype(np.int64)
+        volume = np.asarray(volume, dtype=np.float64)
+        self.events = len(seconds)
+        self._origin = int(seconds.min()) if self.events else 0
+        # Offsets lie in [0, span - 2], so span - 1 clamps query bounds past every event
+        self._span = int(seconds.max()) - self._origin + 2 if self.events else 2
+
+        keys = truck_codes.astype(np.int64) * len(stations) + station_codes
+        composite = keys * self._span + (seconds - self._origin)
+        order = np.argsort(composite, kind='stable')
+        self._composite = composite[order]
+        self._seconds = self._composite % self._span
+        self._volume = volume[order]
+        self._assigned = np.zeros(self.events, dtype=bool)
+
+        self.matched_events = 0
+        self.trips = 0
+        self.matched_trips = 0
+
+    @classmethod
+    def from_file(cls, path: str, tolerance_minutes: float = DEFAULT_TOLERANCE_MINUTES) -> 'DispensingIndex':
+        """
+        Index a CSV/JSONL dispensing export.
+
+        Args:
+            path (str): Dispensing records (see DISPENSING_FIELDS)
+            tolerance_minutes (float): Minutes a record may fall outside the
+                trip window
+
+        Returns:
+            DispensingIndex: The index
+        """
+        columns = {field: [] for field in DISPENSING_FIELDS}
+        for line_number, record in enumerate(iter_records(path, detect_format(path)), 1):
+            try:
+                for field in DISPENSING_FIELDS:
+                    columns[field].append(record[field])
+            except KeyError as e:
+                raise KeyError(f"{path}:{line_number}: missing required field {e}") from None
+
+        try:
+            return cls(columns['truck_id'], columns['station'], columns['dispensed_at'],
+                       [float(value) for value in columns['volume']], tolerance_minutes)
+        except ValueError as e:
+            raise ValueError(f"{path}: invalid dispensing value ({e})") from None
+
+    def _codes(self, labels: Any, values: Sequence[Any]) -> Any:
+        """Code of each value in a sorted label array, -1 when absent."""
+        import numpy as np
+
+        values = np.asarray(values, dtype=np.str_)
+        if not len(labels):
+            return np.full(len(values), -1)
+        position = np.minimum(np.searchsorted(labels, values), len(labels) - 1)
+        return np.where(labels[position] == values, position, -1)
+
+    def match(self, truck_id: Sequence[Any], daughter_station: Sequence[Any],
+              departure: Sequence[Any], return_time: Sequence[Any]) -> Dict[str, Any]:
+        """
+        Dispensed volume for a batch of trips.
+
+        Each record is assigned to at most one trip: the nearest window in
+        the batch, unless an earlier batch already took it.
+
+        Args:
+            truck_id (sequence): Truck per trip
+            daughter_station (sequence): Daughter Station per trip
+            departure (sequence): Mother Station departure (epoch/ISO)
+            return_time (sequence): Mother Station return (epoch/ISO)
+
+        Returns:
+            dict: gas_volume_dispensed (NaN where no record matched) and
+                dispensing_events (records matched per trip)
+        """
+        import numpy as np
+
+        trucks = self._codes(self._trucks, truck_id)
+        stations = self._codes(self._stations, daughter_station)
+        start = parse_timestamps(departure) - self.tolerance - self._origin
+        end = parse_timestamps(return_time) + self.tolerance - self._origin
+        valid = (trucks >= 0) & (stations >= 0) & (end >= 0) & (start <= self._span - 2)
+
+        keys = np.where(valid, trucks * len(self._stations) + stations, 0).astype(np.int64) * self._span
+        low = np.searchsorted(self._composite, keys + np.clip(np.ceil(start), 0, self._span - 1).astype(np.int64))
+        high = np.searchsorted(self._composite, keys + np.clip(np.floor(end), 0, self._span - 1).astype(np.int64),
+                               side='right')
+        candidates = np.where(valid, high - low, 0)
+
+        # One (trip, event) pair per event inside a widened window
+        trip = np.repeat(np.arange(len(candidates)), candidates)
+        first = np.cumsum(candidates) - candidates
+        event = np.arange(len(trip)) - np.repeat(first, candidates) + np.repeat(low, candidates)
+        free = ~self._assigned[event]
+        trip, event = trip[free], event[free]
+
+        # Nearest window wins (0 inside it), then the earlier departure
+        seconds = self._seconds[event]
+        core_start = (start + self.tolerance)[trip]
+        core_end = (end - self.tolerance)[trip]
+        distance = np.maximum(np.maximum(core_start - seconds, seconds - core_end), 0)
+        order = np.lexsort((core_start, distance, event))
+        _, winners = np.unique(event[order], return_index=True)
+        trip, event = trip[order[winners]], event[order[winners]]
+        self._assigned[event] = True
+
+        count = np.bincount(trip, minlength=len(candidates))
+        volume = np.where(count > 0, np.bincount(trip, self._volume[event], minlength=len(candidates)), np.nan)
+
+        self.trips += len(count)
+        self.matched_trips += int((count > 0).sum())
+        self.matched_events += int(count.sum())
+        return {'gas_volume_dispensed': volume, 'dispensing_events': count}
+
+    def match_summary(self) -> Dict[str, Any]:
+        """
+        Match rates for the trips looked up so far.
+
+        Returns:
+            dict: trips, matched_trips, trip_match_rate_percent, events,
+                matched_events, event_match_rate_percent
+        """
+        return {
+            'trips': self.trips,
+            'matched_trips': self.matched_trips,
+            'trip_match_rate_percent': round(self.matched_trips / self.trips * 100, 2) if self.trips else 0,
+            'events': self.events,
+            'matched_events': self.matched_events,
+            'event_match_rate_percent': round(self.matched_events / self.events * 100, 2) if self.events else 0,
+        }
+
+
+def _read_trip_chunks(path: str, chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk = []
+    for record in iter_records(path, detect_format(path)):
+        chunk.append(record)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def join_trip_log(trips_path: str, output_path: str, index: DispensingIndex,
+                  chunk_size: int = 50000) -> Dict[str, Any]:
+    """
+    Add gas_volume_dispensed to a trip file (e.g. telematics.py output).
+
+    Args:
+        trips_path (str): CSV/JSONL trips with WINDOW_FIELDS columns
+        output_path (str): CSV/JSONL output with gas_volume_dispensed and
+            dispensing_events appended (empty/null where unmatched)
+        index (DispensingIndex): Indexed dispensing records
+        chunk_size (int): Trips matched per vectorized pass
+
+    Returns:
+        dict: DispensingIndex.match_summary()
+    """
+    fmt = detect_format(output_path)
+    with open(output_path, 'w', newline='') as f:
+        writer = None
+        for chunk in _read_trip_chunks(trips_path, chunk_size):
+            try:
+                windows = [[record[field] for record in chunk] for field in WINDOW_FIELDS]
+            except KeyError as e:
+                raise KeyError(f"{trips_path}: missing required field {e}") from None
+            matched = index.match(*windows)
+            volumes = [None if volume != volume else volume for volume in matched['gas_volume_dispensed'].tolist()]
+
+            for record, volume, events in zip(chunk, volumes, matched['dispensing_events'].tolist()):
+                record['gas_volume_dispensed'] = volume
+                record['dispensing_events'] = events
+            if fmt == 'csv':
+                if writer is None:
+                    writer = csv.DictWriter(f, fieldnames=list(chunk[0]))
+                    writer.writeheader()
+                writer.writerows(chunk)
+            else:
+                f.writelines(json.dumps(record) + '\n' for record in chunk)
+
+    return index.match_summary()
+
+
+def main():
+    """
+    Command-line entry point for the PRMS dispensing join.
+    """
+    parser = argparse.ArgumentParser(description="Match PRMS dispensing records to trips (GVD)")
+    parser.add_argument('trips', help="Trips with truck_id, daughter_station, departure_time, return_time")
+    parser.add_argument('dispensing', help="PRMS dispensing records (.csv or .jsonl)")
+    parser.add_argument('output', help="Joined trips file (.csv or .jsonl)")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE_MINUTES,
+                        help=f"Minutes a record may fall outside the trip window (default: {DEFAULT_TOLERANCE_MINUTES})")
+    args = parser.parse_args()
+
+    print("PowerGas PRMS Dispensing Join")
+    print("="*80)
+
+    summary = join_trip_log(args.trips, args.output, DispensingIndex.from_file(args.dispensing, args.tolerance))
+
+    print(f"Trips matched:     {summary['matched_trips']:,} of {summary['trips']:,} "
+          f"({summary['trip_match_rate_percent']:.2f}%)")
+    print(f"Records matched:   {summary['matched_events']:,} of {summary['events']:,} "
+          f"({summary['event_match_rate_percent']:.2f}%)")
+    print(f"\nResults saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
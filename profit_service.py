@@ -0,0 +1,432 @@
+"""
+PowerGas Profit Calculation Service
+
+Local HTTP endpoint around the calculator for machine callers such as the
+Phase 7 n8n workflow. Built on asyncio with only the standard library (plus
+NumPy for the vectorized kernel).
+
+Endpoints:
+    GET  /health                   Status and micro-batching counters
+    GET  /models                   Registered cost models
+    POST /calculate                One trip_data object -> calculate_trip_profit() result
+    POST /calculate/batch          JSON array (or {"trips": [...]}, or NDJSON body)
+                                   -> {"count", "results"}; NDJSON streaming response
+                                   with ?format=ndjson or Accept: application/x-ndjson
+
+Every endpoint takes ?model=<cost model> (default 'base').
+
+Concurrent /calculate requests are micro-batched: trips arriving within
+max_delay_ms of each other (up to max_batch) are evaluated together in one
+calculate_batch() call, so thousands of requests per second cost a handful of
+vectorized evaluations. Results are identical to calculate_trip_profit().
+
+Usage:
+    python profit_service.py --host 127.0.0.1 --port 8080
+
+    curl -s -X POST localhost:8080/calculate -d @trip.json
+    curl -s -X POST 'localhost:8080/calculate/batch?format=ndjson' --data-binary @trips.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from cost_models import list_cost_models
+from profitability_calculator import (
+    ProfitabilityCalculator,
+    get_calculator,
+    batch_result_records,
+    TRIP_LABEL_FIELDS,
+)
+
+
+DEFAULT_MAX_BATCH = 1024
+
+DEFAULT_MAX_DELAY_MS = 2.0
+
+# Trips per NDJSON chunk written to the socket
+STREAM_CHUNK_SIZE = 5000
+
+MAX_BODY_BYTES = 256 * 1024 * 1024
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            411: 'Length Required', 413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class RequestError(Exception):
+    """Client error reported as an HTTP status with a JSON message."""
+
+    def __init__(self, status: int, message: str, close: bool = False):
+        super().__init__(message)
+        self.status = status
+        # Set when the request body was not read, so the connection cannot be reused
+        self.close = close
+
+
+class _StreamAborted(Exception):
+    """Failure after a streamed response started; the connection is dropped."""
+
+
+def trip_columns(trips: List[Mapping[str, Any]], calculator: ProfitabilityCalculator) -> Dict[str, Any]:
+    """
+    calculator.trip_columns() with validation errors reported as HTTP 400.
+
+    Args:
+        trips (list): trip_data dicts
+        calculator (ProfitabilityCalculator): Calculator whose cost model
+            defines the required inputs
+
+    Returns:
+        dict: calculate_batch() input columns
+    """
+    try:
+        return calculator.trip_columns(trips)
+    except (KeyError, ValueError) as e:
+        raise RequestError(400, e.args[0]) from None
+
+
+def concat_columns(parts: List[Mapping[str, Any]]) -> Dict[str, Any]:
+    """
+    Join trip_columns() outputs into one batch.
+
+    An optional input missing from some parts is NaN there, so the cost
+    model's default applies to those trips only.
+
+    Args:
+        parts (list): trip_columns() outputs
+
+    Returns:
+        dict: calculate_batch() input columns for all parts, in order
+    """
+    import numpy as np
+
+    columns = {}
+    for field in dict.fromkeys(field for part in parts for field in part):
+        if field in TRIP_LABEL_FIELDS:
+            columns[field] = [value for part in parts for value in part[field]]
+        else:
+            columns[field] = np.concatenate([part[field] if field in part
+                                             else np.full(len(part['trip_id']), np.nan) for part in parts])
+    return columns
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-trip requests into vectorized evaluations.
+
+    Each trip is converted to columns once, when submitted; a batch joins
+    them and is evaluated in the loop's default executor so the event loop
+    keeps serving requests meanwhile.
+
+    Attributes:
+        calculator (ProfitabilityCalculator): Calculator used for each batch
+        max_batch (int): Evaluate as soon as this many trips are waiting
+        max_delay (float): Seconds the first waiting trip may wait for others
+        batches (int): Evaluations run so far
+        trips (int): Trips evaluated so far
+    """
+
+    def __init__(self, calculator: ProfitabilityCalculator, max_batch: int = DEFAULT_MAX_BATCH,
+                 max_delay_ms: float = DEFAULT_MAX_DELAY_MS):
+        """
+        Initialize the batcher.
+
+        Args:
+            calculator (ProfitabilityCalculator): Calculator to use
+            max_batch (int): Largest batch
+            max_delay_ms (float): Longest wait for a batch to fill, in ms
+        """
+        self.calculator = calculator
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        self.batches = 0
+        self.trips = 0
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, trip: Mapping[str, Any]) -> Dict[str, Any]:
+        """
+        Queue one trip and wait for its result.
+
+        Args:
+            trip (Mapping): trip_data
+
+        Returns:
+            dict: calculate_trip_profit()-shaped result
+        """
+        # Validate alone so one bad trip cannot fail the rest of its batch
+        columns = trip_columns([trip], self.calculator)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((columns, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        task = asyncio.get_running_loop().create_task(self._evaluate(pending))
+        # Keep a reference until the batch completes
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _records(self, columns: Mapping[str, Any]) -> List[Dict[str, Any]]:
+        return batch_result_records(columns, self.calculator.calculate_batch(columns))
+
+    async def _evaluate(self, pending: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        try:
+            columns = concat_columns([columns for columns, _ in pending])
+            records = await asyncio.get_running_loop().run_in_executor(None, self._records, columns)
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.trips += len(pending)
+        for (_, future), record in zip(pending, records):
+            if not future.done():
+                future.set_result(record)
+
+
+class ProfitService:
+    """
+    asyncio HTTP/1.1 server exposing the calculator.
+
+    Attributes:
+        max_batch (int): Micro-batch size limit for /calculate
+        max_delay_ms (float): Micro-batch wait limit for /calculate
+    """
+
+    def __init__(self, max_batch: int = DEFAULT_MAX_BATCH, max_delay_ms: float = DEFAULT_MAX_DELAY_MS):
+        """
+        Initialize the service.
+
+        Args:
+            max_batch (int): Largest micro-batch
+            max_delay_ms (float): Longest micro-batch wait, in ms
+        """
+        self.max_batch = max_batch
+        self.max_delay_ms = max_delay_ms
+        self._batchers: Dict[str, MicroBatcher] = {}
+
+    def batcher(self, model: str) -> MicroBatcher:
+        """
+        Micro-batcher for a cost model (created on first use).
+
+        Args:
+            model (str): Registered cost model name
+
+        Returns:
+            MicroBatcher: The model's batcher
+        """
+        batcher = self._batchers.get(model)
+        if batcher is None:
+            try:
+                calculator = get_calculator(model)
+            except KeyError as e:
+                raise RequestError(400, e.args[0]) from None
+            batcher = self._batchers[model] = MicroBatcher(calculator, self.max_batch, self.max_delay_ms)
+        return batcher
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 8080):
+        """
+        Run the server until cancelled.
+
+        Args:
+            host (str): Interface to bind
+            port (int): TCP port
+        """
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        async with server:
+            await server.serve_forever()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve requests on one keep-alive connection."""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = lines[0].split(' ', 2)
+                except ValueError:
+                    await self._send_json(writer, 400, {'error': 'Malformed request line'}, False)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    if ':' in line:
+                        name, value = line.split(':', 1)
+                        headers[name.strip().lower()] = value.strip()
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' and (version == 'HTTP/1.1' or connection == 'keep-alive')
+
+                try:
+                    body = await self._read_body(reader, method, headers)
+                    await self.dispatch(method, target, headers, body, writer, keep_alive)
+                except RequestError as e:
+                    keep_alive = keep_alive and not e.close
+                    await self._send_json(writer, e.status, {'error': str(e)}, keep_alive)
+                except (asyncio.IncompleteReadError, ConnectionError, _StreamAborted):
+                    break
+                except Exception as e:
+                    await self._send_json(writer, 500, {'error': f"{type(e).__name__}: {e}"}, keep_alive)
+
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def _read_body(self, reader: asyncio.StreamReader, method: str, headers: Mapping[str, str]) -> bytes:
+        if method != 'POST':
+            return b''
+        if 'content-length' not in headers:
+            raise RequestError(411, "Content-Length required", close=True)
+        try:
+            length = int(headers['content-length'])
+        except ValueError:
+            length = -1
+        if length < 0:
+            raise RequestError(400, f"Invalid Content-Length: {headers['content-length']!r}", close=True)
+        if length > MAX_BODY_BYTES:
+            raise RequestError(413, f"Body larger than {MAX_BODY_BYTES} bytes", close=True)
+        return await reader.readexactly(length)
+
+    async def dispatch(self, method: str, target: str, headers: Mapping[str, str], body: bytes,
+                       writer: asyncio.StreamWriter, keep_alive: bool):
+        """Route one request to its endpoint."""
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        model = query.get('model', 'base')
+        routes = {
+            '/health': ('GET', self._health),
+            '/models': ('GET', self._models),
+            '/calculate': ('POST', self._calculate),
+            '/calculate/batch': ('POST', self._calculate_batch),
+        }
+        if url.path not in routes:
+            raise RequestError(404, f"Unknown endpoint {url.path}")
+        expected, handler = routes[url.path]
+        if method != expected:
+            raise RequestError(405, f"{url.path} expects {expected}")
+        await handler(model, query, headers, body, writer, keep_alive)
+
+    async def _health(self, model, query, headers, body, writer, keep_alive):
+        await self._send_json(writer, 200, {
+            'status': 'ok',
+            'models': {name: {'batches': batcher.batches, 'trips': batcher.trips}
+                       for name, batcher in self._batchers.items()},
+        }, keep_alive)
+
+    async def _models(self, model, query, headers, body, writer, keep_alive):
+        await self._send_json(writer, 200, list_cost_models(), keep_alive)
+
+    async def _calculate(self, model, query, headers, body, writer, keep_alive):
+        trip = _parse_json(body)
+        if not isinstance(trip, dict):
+            raise RequestError(400, "Body must be a trip_data JSON object")
+        result = await self.batcher(model).submit(trip)
+        await self._send_json(writer, 200, result, keep_alive)
+
+    async def _calculate_batch(self, model, query, headers, body, writer, keep_alive):
+        if 'ndjson' in headers.get('content-type', ''):
+            trips = [_parse_json(line) for line in body.splitlines() if line.strip()]
+        else:
+            trips = _parse_json(body)
+            if isinstance(trips, dict):
+                trips = trips.get('trips')
+        if not isinstance(trips, list) or not all(isinstance(trip, dict) for trip in trips):
+            raise RequestError(400, "Body must be a list of trip_data objects")
+
+        calculator = self.batcher(model).calculator
+        columns = trip_columns(trips, calculator)
+        results = {}
+        if trips:
+            results = await asyncio.get_running_loop().run_in_executor(None, calculator.calculate_batch, columns)
+
+        if query.get('format') != 'ndjson' and 'application/x-ndjson' not in headers.get('accept', ''):
+            records = batch_result_records(columns, results) if trips else []
+            await self._send_json(writer, 200, {'count': len(records), 'results': records}, keep_alive)
+            return
+
+        writer.write(_head(200, 'application/x-ndjson', keep_alive, chunked=True))
+        try:
+            for start in range(0, len(trips), STREAM_CHUNK_SIZE):
+                records = batch_result_records(columns, results, start, start + STREAM_CHUNK_SIZE)
+                data = ''.join(json.dumps(record) + '\n' for record in records).encode('utf-8')
+                writer.write(b'%x\r\n%s\r\n' % (len(data), data))
+                await writer.drain()
+            writer.write(b'0\r\n\r\n')
+            await writer.drain()
+        except Exception as e:
+            # The status line is already sent: no error response can follow, so
+            # end the connection without the terminating chunk
+            raise _StreamAborted() from e
+
+    async def _send_json(self, writer: asyncio.StreamWriter, status: int, payload: Any, keep_alive: bool):
+        data = json.dumps(payload).encode('utf-8')
+        writer.write(_head(status, 'application/json', keep_alive, length=len(data)) + data)
+        await writer.drain()
+
+
+def _parse_json(data: bytes) -> Any:
+    try:
+        return json.loads(data)
+    except ValueError as e:
+        raise RequestError(400, f"Invalid JSON: {e}") from None
+
+
+def _head(status: int, content_type: str, keep_alive: bool, length: Optional[int] = None,
+          chunked: bool = False) -> bytes:
+    lines = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}", f"Content-Type: {content_type}",
+             f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    if chunked:
+        lines.append("Transfer-Encoding: chunked")
+    else:
+        lines.append(f"Content-Length: {length}")
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+
+def main():
+    """
+    Command-line entry point for the calculation service.
+    """
+    parser = argparse.ArgumentParser(description="HTTP profit calculation service with request micro-batching")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--max-batch', type=int, default=DEFAULT_MAX_BATCH,
+                        help=f"Largest micro-batch (default: {DEFAULT_MAX_BATCH})")
+    parser.add_argument('--max-delay-ms', type=float, default=DEFAULT_MAX_DELAY_MS,
+                        help=f"Longest wait for a micro-batch to fill (default: {DEFAULT_MAX_DELAY_MS} ms)")
+    args = parser.parse_args()
+
+    print("PowerGas Profit Calculation Service")
+    print("="*80)
+    print(f"Listening on http://{args.host}:{args.port} "
+          f"(micro-batches of up to {args.max_batch} trips, {args.max_delay_ms} ms)")
+
+    try:
+        asyncio.run(ProfitService(args.max_batch, args.max_delay_ms).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -22,36 +22,136 @@ Components:
 - RTD: Round Trip Distance (km)
 - SD: Skid Depreciation (NGN per hour)
 - STAT: Skid Turnaround Time (hours)
+
+The formula is evaluated through a compiled kernel from cost_models.py;
+alternative contractor/volume models can be selected by name.
 """
 
+import argparse
+import functools
+import io
 import json
-from typing import Dict, List, Any
-from datetime import datetime
+import os
+from typing import TYPE_CHECKING, Dict, List, Any, Mapping, Optional, Sequence
+
+from cost_models import CostModel, get_cost_model
+
+if TYPE_CHECKING:
+    from trip_results import TripResult, TripResultTable
+
+
+# Numeric trip_data fields consumed by the formula, in formula order
+TRIP_INPUT_FIELDS = (
+    'gas_volume', 'gas_price',
+    'gas_cost', 'plant_cost', 'ga_cost',
+    'truck_depreciation', 'truck_insurance', 'fuel_cost', 'truck_turnaround_time',
+    'fixed_trucking_cost', 'variable_trucking_cost', 'round_trip_distance',
+    'skid_depreciation', 'skid_turnaround_time',
+)
+
+# The documented formula, used by the per-component helpers
+_BASE_MODEL = get_cost_model('base')
+
+# Descriptive trip_data fields copied into every result
+TRIP_LABEL_FIELDS = ('trip_id', 'mother_station', 'daughter_station')
+
+# Columns returned by calculate_batch (flattened costs_breakdown)
+BATCH_RESULT_FIELDS = (
+    'revenue', 'production_costs', 'truck_expenses', 'trucking_costs',
+    'skid_costs', 'total_costs', 'profit', 'profit_margin_percent',
+)
+
+
+def round2(values):
+    """
+    Round a NumPy array to 2 decimals exactly like Python's round(x, 2).
+
+    numpy.round scales by 100 before rounding, which disagrees with Python's
+    correctly-rounded round() for values that sit on a half-cent boundary.
+    Those few candidates are re-rounded with round() so batch results match
+    the scalar path bit for bit.
+
+    Args:
+        values (numpy.ndarray): Float array to round
+
+    Returns:
+        numpy.ndarray: Rounded float array
+    """
+    import numpy as np
+
+    scaled = values * 100.0
+    rounded = np.round(scaled) / 100.0
+    distance_to_half = np.abs(scaled - np.floor(scaled) - 0.5)
+    ties = np.flatnonzero(distance_to_half <= np.maximum(np.abs(scaled) * 1e-12, 1e-9))
+    for idx in ties.tolist():
+        rounded[idx] = round(float(values[idx]), 2)
+    return rounded
+
+
+def load_config(config_file: str = 'config.json') -> Dict[str, Any]:
+    """
+    Load a configuration JSON file.
+
+    Args:
+        config_file (str): Path to the configuration JSON file
+
+    Returns:
+        dict: Parsed configuration
+    """
+    with open(config_file, 'r') as f:
+        return json.load(f)
 
 
 class ProfitabilityCalculator:
     """
     Calculator for gas delivery profitability analysis.
 
+    The calculator is a stateless engine: every calculation depends only on
+    its arguments and the compiled cost model, so one instance can be shared
+    freely (see get_calculator). The configuration file is only read the
+    first time `config` is accessed.
+
     Attributes:
-        config (dict): Configuration parameters for the calculation
+        config (dict): Configuration parameters for the calculation (lazy)
+        config_file (str): Path the configuration is loaded from
+        cost_model (CostModel): Compiled formula used for calculations
     """
 
-    def __init__(self, config_file: str = 'config.json'):
+    config_file: str = 'config.json'
+    cost_model: CostModel = _BASE_MODEL
+    _config: Optional[Dict[str, Any]] = None
+
+    def __init__(self, config_file: str = 'config.json', cost_model: str = 'base',
+                 config: Optional[Dict[str, Any]] = None):
         """
-        Initialize the calculator with configuration from a JSON file.
+        Initialize the calculator without touching the filesystem.
 
         Args:
-            config_file (str): Path to the configuration JSON file
+            config_file (str): Path to the configuration JSON file, read on
+                first access to `config`
+            cost_model (str): Name of the registered cost model to use
+            config (dict): Already-parsed configuration (skips the file)
         """
-        with open(config_file, 'r') as f:
-            self.config = json.load(f)
+        self.config_file = config_file
+        self.cost_model = get_cost_model(cost_model)
+        self._config = config
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        """Configuration loaded from config_file on first access."""
+        if self._config is None:
+            self._config = load_config(self.config_file)
+        return self._config
+
+    @config.setter
+    def config(self, value: Dict[str, Any]):
+        self._config = value
 
     def calculate_revenue(self, gas_volume: float, gas_price: float) -> float:
         """
         Calculate revenue from gas sales.
 
-        Formula: GV × GP
+        Formula: GV × GP (the 'base' cost model's expression)
 
         Args:
             gas_volume (float): Gas volume in scm
@@ -60,15 +160,14 @@ class ProfitabilityCalculator:
         Returns:
             float: Total revenue in NGN
         """
-        revenue = gas_volume * gas_price
-        return revenue
+        return _BASE_MODEL.evaluate_component('revenue', {'gas_volume': gas_volume, 'gas_price': gas_price})
 
     def calculate_production_costs(self, gas_volume: float, gas_cost: float,
                                    plant_cost: float, ga_cost: float) -> float:
         """
         Calculate production and plant costs.
 
-        Formula: (GC + PC + G&A) × GV
+        Formula: (GC + PC + G&A) × GV (the 'base' cost model's expression)
 
         Args:
             gas_volume (float): Gas volume in scm
@@ -79,16 +178,15 @@ class ProfitabilityCalculator:
         Returns:
             float: Total production costs in NGN
         """
-        per_scm_cost = gas_cost + plant_cost + ga_cost
-        total_cost = per_scm_cost * gas_volume
-        return total_cost
+        return _BASE_MODEL.evaluate_component('production_costs', {
+            'gas_volume': gas_volume, 'gas_cost': gas_cost, 'plant_cost': plant_cost, 'ga_cost': ga_cost})
 
     def calculate_truck_expenses(self, truck_depreciation: float, truck_insurance: float,
                                 fuel_cost: float, turnaround_time: float) -> float:
         """
         Calculate truck-related expenses.
 
-        Formula: (TD + TIS + FC) × TTAT
+        Formula: (TD + TIS + FC) × TTAT (the 'base' cost model's expression)
 
         Args:
             truck_depreciation (float): Truck depreciation in NGN per hour
@@ -99,9 +197,9 @@ class ProfitabilityCalculator:
         Returns:
             float: Total truck expenses in NGN
         """
-        per_hour_cost = truck_depreciation + truck_insurance + fuel_cost
-        total_expense = per_hour_cost * turnaround_time
-        return total_expense
+        return _BASE_MODEL.evaluate_component('truck_expenses', {
+            'truck_depreciation': truck_depreciation, 'truck_insurance': truck_insurance,
+            'fuel_cost': fuel_cost, 'truck_turnaround_time': turnaround_time})
 
     def calculate_trucking_costs(self, fixed_trucking_cost: float,
                                 variable_trucking_cost: float,
@@ -109,7 +207,10 @@ class ProfitabilityCalculator:
         """
         Calculate contractor trucking costs.
 
-        Formula: (FTC + VTC) × RTD
+        Formula: (FTC + VTC) × RTD (the 'base' cost model's expression)
+
+        The same per-km rate for every contractor; contractor_tariffs.py
+        prices Diadem/IMI-style tariffs with thresholds.
 
         Args:
             fixed_trucking_cost (float): Fixed trucking cost in NGN per km
@@ -119,16 +220,16 @@ class ProfitabilityCalculator:
         Returns:
             float: Total trucking costs in NGN
         """
-        per_km_cost = fixed_trucking_cost + variable_trucking_cost
-        total_cost = per_km_cost * round_trip_distance
-        return total_cost
+        return _BASE_MODEL.evaluate_component('trucking_costs', {
+            'fixed_trucking_cost': fixed_trucking_cost, 'variable_trucking_cost': variable_trucking_cost,
+            'round_trip_distance': round_trip_distance})
 
     def calculate_skid_costs(self, skid_depreciation: float,
                             skid_turnaround_time: float) -> float:
         """
         Calculate skid depreciation costs.
 
-        Formula: SD × STAT
+        Formula: SD × STAT (the 'base' cost model's expression)
 
         Args:
             skid_depreciation (float): Skid depreciation in NGN per hour
@@ -137,8 +238,8 @@ class ProfitabilityCalculator:
         Returns:
             float: Total skid costs in NGN
         """
-        total_cost = skid_depreciation * skid_turnaround_time
-        return total_cost
+        return _BASE_MODEL.evaluate_component('skid_costs', {
+            'skid_depreciation': skid_depreciation, 'skid_turnaround_time': skid_turnaround_time})
 
     def calculate_trip_profit(self, trip_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -150,43 +251,14 @@ class ProfitabilityCalculator:
         Returns:
             dict: Detailed breakdown of revenue, costs, and profit
         """
-        # Revenue calculation
-        revenue = self.calculate_revenue(
-            trip_data['gas_volume'],
-            trip_data['gas_price']
-        )
-
-        # Cost calculations
-        production_costs = self.calculate_production_costs(
-            trip_data['gas_volume'],
-            trip_data['gas_cost'],
-            trip_data['plant_cost'],
-            trip_data['ga_cost']
-        )
-
-        truck_expenses = self.calculate_truck_expenses(
-            trip_data['truck_depreciation'],
-            trip_data['truck_insurance'],
-            trip_data['fuel_cost'],
-            trip_data['truck_turnaround_time']
-        )
-
-        trucking_costs = self.calculate_trucking_costs(
-            trip_data['fixed_trucking_cost'],
-            trip_data['variable_trucking_cost'],
-            trip_data['round_trip_distance']
-        )
-
-        skid_costs = self.calculate_skid_costs(
-            trip_data['skid_depreciation'],
-            trip_data['skid_turnaround_time']
-        )
-
-        # Total costs
-        total_costs = production_costs + truck_expenses + trucking_costs + skid_costs
-
-        # Profit
-        profit = revenue - total_costs
+        values = self.cost_model.evaluate(trip_data)
+        revenue = values['revenue']
+        production_costs = values['production_costs']
+        truck_expenses = values['truck_expenses']
+        trucking_costs = values['trucking_costs']
+        skid_costs = values['skid_costs']
+        total_costs = values['total_costs']
+        profit = values['profit']
 
         # Profit margin percentage
         profit_margin = (profit / revenue * 100) if revenue > 0 else 0
@@ -207,12 +279,149 @@ class ProfitabilityCalculator:
             'profit_margin_percent': round(profit_margin, 2)
         }
 
-    def compare_scenarios(self, scenarios_file: str = 'scenarios.json') -> List[Dict[str, Any]]:
+    def calculate_trip_result(self, trip_data: Dict[str, Any]) -> 'TripResult':
+        """
+        Calculate profit for a single trip as a compact TripResult.
+
+        Same values as calculate_trip_profit(), in a __slots__ record that
+        still reads like the result dict (see trip_results.py).
+
+        Args:
+            trip_data (dict): Dictionary containing all trip parameters
+
+        Returns:
+            TripResult: Result record
+        """
+        from trip_results import TripResult
+
+        values = self.cost_model.evaluate(trip_data)
+        revenue = values['revenue']
+        profit_margin = (values['profit'] / revenue * 100) if revenue > 0 else 0
+        return TripResult(trip_data.get('trip_id', 'N/A'), trip_data.get('mother_station', 'N/A'),
+                          trip_data.get('daughter_station', 'N/A'),
+                          *(round(values[field], 2) for field in BATCH_RESULT_FIELDS[:-1]),
+                          round(profit_margin, 2))
+
+    def calculate_batch(self, trips: Mapping[str, Any],
+                        round_results: bool = True) -> Dict[str, Any]:
+        """
+        Calculate profit for many trips in a single vectorized pass.
+
+        Runs the same compiled cost-model kernel as calculate_trip_profit on
+        arrays, so the (rounded) results match the scalar path exactly. Requires NumPy,
+        which is imported on first use so the command-line calculator stays
+        stdlib-only.
+
+        Args:
+            trips (Mapping): Columnar trip data - a dict of NumPy arrays/lists
+                or a pandas DataFrame using the same field names as trip_data
+            round_results (bool): Round every column to 2 decimals like the
+                scalar path (set False to keep full precision)
+
+        Returns:
+            dict: NumPy arrays keyed by BATCH_RESULT_FIELDS
+        """
+        import numpy as np
+
+        values = self.cost_model.evaluate_columns(trips)
+        revenue = values['revenue']
+        profit = values['profit']
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            profit_margin = np.where(revenue > 0, profit / revenue * 100, 0.0)
+
+        results = {}
+        for name in BATCH_RESULT_FIELDS[:-1]:
+            column = np.asarray(values[name], dtype=np.float64)
+            results[name] = column if column.shape == revenue.shape else np.full(revenue.shape, column)
+        results['profit_margin_percent'] = profit_margin
+
+        if round_results:
+            results = {name: round2(values) for name, values in results.items()}
+
+        return results
+
+    def trip_columns(self, trips: List[Mapping[str, Any]],
+                     provided: Sequence[str] = ()) -> Dict[str, Any]:
+        """
+        Validate trip_data dicts and convert them to calculate_batch() columns.
+
+        Every field the cost model can read (CostModel.fields) is collected.
+        Fields with a cost-model default may be missing from some trips; they
+        become NaN so the default applies to those trips only. Fields read
+        only by a default are required just for the trips that need it.
+
+        Args:
+            trips (list): trip_data dicts
+            provided (sequence): Fields the caller adds to the columns itself
+                (e.g. tariff trucking costs); they are skipped here
+
+        Returns:
+            dict: NumPy input columns plus the TRIP_LABEL_FIELDS lists
+
+        Raises:
+            KeyError: A trip is missing a required field
+            ValueError: A trip has a non-numeric input
+        """
+        import numpy as np
+
+        model = self.cost_model
+        columns = {}
+        for field in model.fields:
+            if field in provided:
+                continue
+            optional = field in model.defaults
+            # A field read only by defaults is needed just where a default applies
+            readers = () if field in model.inputs else [
+                target for target, names in model.default_inputs.items()
+                if field in names and target not in provided]
+            column = np.full(len(trips), np.nan)
+            present = False
+            for position, trip in enumerate(trips):
+                value = trip.get(field)
+                if value is None:
+                    if not optional and (field in model.inputs or any(trip.get(target) is None for target in readers)):
+                        raise KeyError(f"Trip {position}: missing required field '{field}'")
+                    continue
+                try:
+                    if isinstance(value, bool):
+                        raise TypeError
+                    column[position] = float(value)
+                except (TypeError, ValueError):
+                    raise ValueError(f"Trip {position}: '{field}' must be a number") from None
+                present = True
+            if present or not trips:
+                columns[field] = column
+
+        for field in TRIP_LABEL_FIELDS:
+            columns[field] = [trip.get(field, 'N/A') for trip in trips]
+        return columns
+
+    def calculate_table(self, trips: Any) -> 'TripResultTable':
+        """
+        Calculate many trips into a struct-of-arrays TripResultTable.
+
+        Args:
+            trips: List of trip_data dicts, or calculate_batch() columns
+                (dict of arrays or DataFrame, with the TRIP_LABEL_FIELDS
+                when available)
+
+        Returns:
+            TripResultTable: One NumPy column per result field
+        """
+        from trip_results import TripResultTable
+
+        columns = self.trip_columns(trips) if isinstance(trips, list) else trips
+        return TripResultTable.from_batch(columns, self.calculate_batch(columns))
+
+    def compare_scenarios(self, scenarios_file: str = 'scenarios.json',
+                          workers: Optional[int] = 1) -> List[Dict[str, Any]]:
         """
         Compare multiple what-if scenarios.
 
         Args:
             scenarios_file (str): Path to the scenarios JSON file
+            workers (int): Worker processes to use (1 = serial, None = one per CPU core)
 
         Returns:
             list: Results for each scenario with comparison metrics
@@ -220,9 +429,53 @@ class ProfitabilityCalculator:
         with open(scenarios_file, 'r') as f:
             scenarios_data = json.load(f)
 
+        return self.evaluate_scenarios(scenarios_data['scenarios'], workers)
+
+    def evaluate_scenarios(self, scenarios: List[Dict[str, Any]],
+                           workers: Optional[int] = 1,
+                           shards_per_worker: int = 4) -> List[Dict[str, Any]]:
+        """
+        Calculate a list of scenarios, optionally across a process pool.
+
+        The list is split into contiguous shards that are mapped over the pool
+        in order, so results always come back in scenario order with the same
+        schema as the serial path.
+
+        Args:
+            scenarios (list): Scenario dicts with name, description and trip_data
+            workers (int): Worker processes to use (1 = serial, None = one per CPU core)
+            shards_per_worker (int): Shards per worker, for load balancing
+
+        Returns:
+            list: Results for each scenario with comparison metrics
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+
+        if workers == 1 or len(scenarios) < 2:
+            return self._evaluate_shard(scenarios)
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        shard_count = min(len(scenarios), workers * shards_per_worker)
+        shard_size = -(-len(scenarios) // shard_count)
+        shards = [scenarios[start:start + shard_size]
+                  for start in range(0, len(scenarios), shard_size)]
+
         results = []
+        with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as executor:
+            for shard_results in executor.map(self._evaluate_shard, shards):
+                results.extend(shard_results)
+
+        return results
 
-        for scenario in scenarios_data['scenarios']:
+    def _evaluate_shard(self, scenarios: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Calculate a contiguous run of scenarios in this process."""
+        results = []
+
+        for scenario in scenarios:
             scenario_result = self.calculate_trip_profit(scenario['trip_data'])
             scenario_result['scenario_name'] = scenario['name']
             scenario_result['description'] = scenario.get('description', '')
@@ -230,122 +483,143 @@ class ProfitabilityCalculator:
 
         return results
 
-    def generate_comparison_report(self, scenarios_file: str = 'scenarios.json') -> str:
+    def generate_comparison_report(self, scenarios_file: str = 'scenarios.json',
+                                   top_n: Optional[int] = None, summary_only: bool = False) -> str:
         """
         Generate a detailed comparison report for multiple scenarios.
 
+        For large scenario sets, write the report straight to a file with
+        comparison_report.write_comparison_report() instead.
+
         Args:
             scenarios_file (str): Path to the scenarios JSON file
+            top_n (int): Detailed breakdown for the N most profitable scenarios only
+            summary_only (bool): Ranked summary without the detailed breakdown
 
         Returns:
             str: Formatted comparison report
         """
-        results = self.compare_scenarios(scenarios_file)
-
-        if not results:
-            return "No scenarios found."
-
-        # Sort by profit (descending)
-        sorted_results = sorted(results, key=lambda x: x['profit'], reverse=True)
-
-        # Build report
-        report = "\n" + "="*80 + "\n"
-        report += "POWERGAS PROFITABILITY COMPARISON REPORT\n"
-        report += f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-        report += "="*80 + "\n\n"
-
-        # Summary table
-        report += "SUMMARY (Ranked by Profit)\n"
-        report += "-"*80 + "\n"
-        report += f"{'Rank':<6}{'Scenario':<25}{'Profit (NGN)':<18}{'Margin %':<12}{'Route'}\n"
-        report += "-"*80 + "\n"
-
-        for idx, result in enumerate(sorted_results, 1):
-            route = f"{result['mother_station']} → {result['daughter_station']}"
-            report += f"{idx:<6}{result['scenario_name']:<25}{result['profit']:>15,.2f}   {result['profit_margin_percent']:>8.2f}%   {route}\n"
-
-        # Detailed breakdown for each scenario
-        report += "\n" + "="*80 + "\n"
-        report += "DETAILED BREAKDOWN\n"
-        report += "="*80 + "\n"
-
-        for idx, result in enumerate(sorted_results, 1):
-            report += f"\n{idx}. {result['scenario_name']}\n"
-            report += f"   Description: {result['description']}\n"
-            report += f"   Route: {result['mother_station']} → {result['daughter_station']}\n"
-            report += f"   -" + "-"*75 + "\n"
-            report += f"   Revenue:                    NGN {result['revenue']:>15,.2f}\n"
-            report += f"   Costs:\n"
-            report += f"     - Production Costs:       NGN {result['costs_breakdown']['production_costs']:>15,.2f}\n"
-            report += f"     - Truck Expenses:         NGN {result['costs_breakdown']['truck_expenses']:>15,.2f}\n"
-            report += f"     - Trucking Costs:         NGN {result['costs_breakdown']['trucking_costs']:>15,.2f}\n"
-            report += f"     - Skid Costs:             NGN {result['costs_breakdown']['skid_costs']:>15,.2f}\n"
-            report += f"   Total Costs:                NGN {result['costs_breakdown']['total_costs']:>15,.2f}\n"
-            report += f"   " + "-"*75 + "\n"
-            report += f"   PROFIT:                     NGN {result['profit']:>15,.2f}\n"
-            report += f"   Profit Margin:              {result['profit_margin_percent']:>15.2f}%\n"
-
-        # Comparative analysis
-        if len(sorted_results) > 1:
-            report += "\n" + "="*80 + "\n"
-            report += "COMPARATIVE ANALYSIS\n"
-            report += "="*80 + "\n\n"
-
-            best = sorted_results[0]
-            worst = sorted_results[-1]
-
-            profit_diff = best['profit'] - worst['profit']
-            margin_diff = best['profit_margin_percent'] - worst['profit_margin_percent']
-
-            report += f"Best Scenario:  {best['scenario_name']}\n"
-            report += f"Worst Scenario: {worst['scenario_name']}\n\n"
-            report += f"Profit Difference:       NGN {profit_diff:>15,.2f}\n"
-            report += f"Margin Difference:       {margin_diff:>15.2f} percentage points\n\n"
-
-            # Cost comparison
-            report += "Cost Component Impact Analysis:\n"
-            report += "-"*80 + "\n"
-
-            prod_diff = best['costs_breakdown']['production_costs'] - worst['costs_breakdown']['production_costs']
-            truck_exp_diff = best['costs_breakdown']['truck_expenses'] - worst['costs_breakdown']['truck_expenses']
-            trucking_diff = best['costs_breakdown']['trucking_costs'] - worst['costs_breakdown']['trucking_costs']
-            skid_diff = best['costs_breakdown']['skid_costs'] - worst['costs_breakdown']['skid_costs']
-
-            report += f"Production Costs Difference:    NGN {prod_diff:>15,.2f}\n"
-            report += f"Truck Expenses Difference:      NGN {truck_exp_diff:>15,.2f}\n"
-            report += f"Trucking Costs Difference:      NGN {trucking_diff:>15,.2f}\n"
-            report += f"Skid Costs Difference:          NGN {skid_diff:>15,.2f}\n"
-
-            # Find biggest impact
-            impacts = {
-                'Production Costs': abs(prod_diff),
-                'Truck Expenses': abs(truck_exp_diff),
-                'Trucking Costs': abs(trucking_diff),
-                'Skid Costs': abs(skid_diff)
-            }
-            biggest_impact = max(impacts, key=impacts.get)
-
-            report += f"\nBiggest Cost Impact: {biggest_impact} (NGN {impacts[biggest_impact]:,.2f})\n"
-
-        report += "\n" + "="*80 + "\n"
-
-        return report
+        from comparison_report import write_comparison_report
+
+        report = io.StringIO()
+        write_comparison_report(report, self.compare_scenarios(scenarios_file), 'text', top_n, summary_only)
+        return report.getvalue()
+
+
+def batch_result_records(columns: Mapping[str, Any], results: Mapping[str, Any],
+                         start: int = 0, stop: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Turn calculate_batch() arrays into calculate_trip_profit()-shaped dicts.
+
+    Args:
+        columns (Mapping): Input columns (for the TRIP_LABEL_FIELDS)
+        results (Mapping): Rounded calculate_batch() results
+        start (int): First trip
+        stop (int): End of the trip range (default: all)
+
+    Returns:
+        list: One result dict per trip
+    """
+    stop = len(results['profit']) if stop is None else stop
+    labels = [columns[field][start:stop] for field in TRIP_LABEL_FIELDS]
+    values = [results[field][start:stop].tolist() for field in BATCH_RESULT_FIELDS]
+
+    records = []
+    for trip_id, mother, daughter, revenue, production, truck, trucking, skid, total, profit, margin \
+            in zip(*labels, *values):
+        records.append({
+            'trip_id': trip_id,
+            'mother_station': mother,
+            'daughter_station': daughter,
+            'revenue': revenue,
+            'costs_breakdown': {
+                'production_costs': production,
+                'truck_expenses': truck,
+                'trucking_costs': trucking,
+                'skid_costs': skid,
+                'total_costs': total,
+            },
+            'profit': profit,
+            'profit_margin_percent': margin,
+        })
+    return records
+
+
+@functools.lru_cache(maxsize=None)
+def get_calculator(cost_model: str = 'base') -> ProfitabilityCalculator:
+    """
+    Shared calculator instance for a cost model.
+
+    Creating it never reads config.json, so batch jobs and the web app can
+    use it freely; every caller in the process gets the same instance.
+
+    Args:
+        cost_model (str): Name of the registered cost model
+
+    Returns:
+        ProfitabilityCalculator: The shared calculator
+    """
+    return ProfitabilityCalculator(cost_model=cost_model)
+
+
+def run_batch(args: argparse.Namespace):
+    """
+    'batch' subcommand: calculate a JSONL file of trip_data records.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments
+    """
+    from jsonl_batch import process_jsonl
+
+    print("PowerGas Profitability Calculator - JSONL Batch")
+    print("="*80)
+
+    try:
+        summary = process_jsonl(args.input, args.output, args.workers, not args.unordered,
+                                args.chunk_size, args.cost_model, args.errors)
+    except OSError as e:
+        raise SystemExit(f"Error: {e}") from None
+
+    print(f"Records read:      {summary['records']:,}")
+    print(f"Results written:   {summary['results']:,}")
+    print(f"Skipped (errors):  {summary['errors']:,}" + (f" - see {args.errors}" if args.errors and summary['errors'] else ''))
+    print(f"Throughput:        {summary['records_per_second']:,} records/s ({summary['seconds']:.2f} s)")
+    print(f"\nResults saved to: {args.output}")
 
 
 def main():
     """
     Main function to demonstrate the calculator usage.
+
+    With the 'batch' subcommand, calculates a JSONL file of trip_data records
+    instead (see jsonl_batch.py).
     """
+    parser = argparse.ArgumentParser(description="PowerGas Profitability Calculator")
+    subcommands = parser.add_subparsers(dest='command')
+    batch = subcommands.add_parser('batch', help="Calculate a JSONL file of trip_data records")
+    batch.add_argument('input', help="JSONL file, one trip_data object per line")
+    batch.add_argument('output', help="JSONL results file")
+    batch.add_argument('--workers', type=int, default=1, help="Worker processes (default: 1)")
+    batch.add_argument('--unordered', action='store_true',
+                       help="Write results as they finish instead of in input order")
+    batch.add_argument('--chunk-size', type=int, default=1000, help="Records per worker task (default: 1000)")
+    batch.add_argument('--cost-model', default='base', help="Registered cost model (default: base)")
+    batch.add_argument('--errors', help="Write skipped records to this JSONL file instead of stderr")
+    args = parser.parse_args()
+
+    if args.command == 'batch':
+        run_batch(args)
+        return
+
     print("PowerGas Profitability Calculator")
     print("="*80)
 
     try:
-        # Initialize calculator with config file
-        calculator = ProfitabilityCalculator('config.json')
+        calculator = get_calculator()
 
         # Calculate single trip from config
         print("\nCalculating trip profitability from config.json...")
-        trip_result = calculator.calculate_trip_profit(calculator.config['trip_data'])
+        trip_result = calculator.calculate_trip_profit(load_config('config.json')['trip_data'])
 
         print(f"\nTrip ID: {trip_result['trip_id']}")
         print(f"Route: {trip_result['mother_station']} → {trip_result['daughter_station']}")
@@ -0,0 +1,296 @@
+"""
+PowerGas Client Profitability Matrix (Requirement 2)
+
+Aggregates per-trip results into a client (Daughter Station) × Mother Station
+matrix, optionally split by month, with trip counts, volume, revenue, every
+cost component, profit and margin.
+
+Each batch of trips is reduced in a single vectorized pass: the three group
+keys are factorised to integer codes, combined into one group code and summed
+with np.bincount. The per-batch totals are merged into a dict keyed by
+(client, mother_station, month), so new trips can be added incrementally and
+memory depends only on the number of groups, not the number of trips.
+
+Usage:
+    python profitability_matrix.py trips.csv --metric profit --by-month
+"""
+
+import argparse
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from profitability_calculator import ProfitabilityCalculator, get_calculator
+
+
+GROUP_FIELDS = ('daughter_station', 'mother_station', 'month')
+
+# Summed per group (trips is the count, gas_volume the scm delivered)
+AGGREGATE_FIELDS = (
+    'trips', 'gas_volume', 'revenue', 'production_costs', 'truck_expenses',
+    'trucking_costs', 'skid_costs', 'total_costs', 'profit',
+)
+
+METRICS = AGGREGATE_FIELDS + ('profit_margin_percent', 'profit_per_scm')
+
+ALL = 'All'
+
+
+def factorize(values: Any) -> Tuple[List[str], Any]:
+    """
+    Encode labels as integer codes for vectorized grouping.
+
+    Args:
+        values: Sequence of labels (strings or anything str() converts)
+
+    Returns:
+        tuple: (sorted unique labels, NumPy array with each value's code)
+    """
+    import numpy as np
+
+    labels, codes = np.unique(np.asarray(values, dtype=np.str_), return_inverse=True)
+    return labels.tolist(), codes.ravel()
+
+
+def _finalize(totals: Mapping[str, float]) -> Dict[str, Any]:
+    """Round the summed fields and add the derived margin metrics."""
+    row = {field: round(totals[field], 2) for field in AGGREGATE_FIELDS}
+    row['trips'] = int(totals['trips'])
+    revenue = totals['revenue']
+    row['profit_margin_percent'] = round(totals['profit'] / revenue * 100, 2) if revenue > 0 else 0
+    volume = totals['gas_volume']
+    row['profit_per_scm'] = round(totals['profit'] / volume, 4) if volume > 0 else 0
+    return row
+
+
+class ProfitabilityMatrix:
+    """
+    Incremental client × Mother Station (× month) profitability aggregation.
+
+    Attributes:
+        groups (dict): (client, mother_station, month) -> summed AGGREGATE_FIELDS
+    """
+
+    def __init__(self, calculator: Optional[ProfitabilityCalculator] = None):
+        """
+        Initialize an empty matrix.
+
+        Args:
+            calculator (ProfitabilityCalculator): Calculator used when add() is
+                given trips without results (optional)
+        """
+        self.calculator = calculator
+        self.groups: Dict[Tuple[str, str, str], Dict[str, float]] = {}
+
+    def add(self, trips: Mapping[str, Any], results: Optional[Mapping[str, Any]] = None,
+            month: Optional[str] = None) -> int:
+        """
+        Aggregate a batch of trips into the matrix.
+
+        Args:
+            trips (Mapping): Columnar trip data with daughter_station,
+                mother_station, gas_volume and trip_date (or pass month)
+            results (Mapping): calculate_batch() output for the same trips
+                (calculated here if omitted)
+            month (str or array): Month (YYYY-MM) for every trip in the
+                batch (or one per trip), used instead of trip_date
+
+        Returns:
+            int: Number of trips added
+        """
+        import numpy as np
+
+        if results is None:
+            calculator = self.calculator or get_calculator()
+            results = calculator.calculate_batch(trips)
+
+        size = len(results['profit'])
+        if not size:
+            return 0
+
+        if month is not None:
+            months = np.broadcast_to(np.asarray(month, dtype=np.str_), (size,))
+        elif 'trip_date' in trips:
+            months = np.asarray([str(value)[:7] for value in trips['trip_date']])
+        else:
+            months = np.full(size, ALL)
+
+        clients, client_codes = factorize(trips.get('daughter_station', np.full(size, 'N/A')))
+        stations, station_codes = factorize(trips.get('mother_station', np.full(size, 'N/A')))
+        month_labels, month_codes = factorize(months)
+
+        combined = (client_codes * len(stations) + station_codes) * len(month_labels) + month_codes
+        group_codes, inverse = np.unique(combined, return_inverse=True)
+        inverse = inverse.ravel()
+
+        sums = {'trips': np.bincount(inverse, minlength=len(group_codes)).astype(np.float64)}
+        sums['gas_volume'] = np.bincount(inverse, np.asarray(trips['gas_volume'], dtype=np.float64),
+                                         minlength=len(group_codes))
+        for field in AGGREGATE_FIELDS[2:]:
+            sums[field] = np.bincount(inverse, np.asarray(results[field], dtype=np.float64),
+                                      minlength=len(group_codes))
+
+        columns = {field: values.tolist() for field, values in sums.items()}
+        for position, code in enumerate(group_codes.tolist()):
+            code, month_code = divmod(code, len(month_labels))
+            client_code, station_code = divmod(code, len(stations))
+            key = (clients[client_code], stations[station_code], month_labels[month_code])
+
+            totals = self.groups.get(key)
+            if totals is None:
+                totals = self.groups[key] = dict.fromkeys(AGGREGATE_FIELDS, 0.0)
+            for field in AGGREGATE_FIELDS:
+                totals[field] += columns[field][position]
+
+        return size
+
+    def merge(self, other: 'ProfitabilityMatrix'):
+        """
+        Add another matrix's totals into this one (e.g. from a parallel worker).
+
+        Args:
+            other (ProfitabilityMatrix): Matrix to merge
+        """
+        for key, other_totals in other.groups.items():
+            totals = self.groups.setdefault(key, dict.fromkeys(AGGREGATE_FIELDS, 0.0))
+            for field in AGGREGATE_FIELDS:
+                totals[field] += other_totals[field]
+
+    def table(self, by: Iterable[str] = ('daughter_station', 'mother_station')) -> List[Dict[str, Any]]:
+        """
+        Roll the matrix up to the requested grouping.
+
+        Args:
+            by (iterable): Any subset of GROUP_FIELDS, in output order
+
+        Returns:
+            list: One row per group with the group labels, AGGREGATE_FIELDS,
+                profit_margin_percent and profit_per_scm, sorted by label
+        """
+        by = tuple(by)
+        unknown = [field for field in by if field not in GROUP_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown group fields: {', '.join(unknown)}")
+        positions = [GROUP_FIELDS.index(field) for field in by]
+
+        rolled: Dict[Tuple[str, ...], Dict[str, float]] = {}
+        for key, totals in self.groups.items():
+            group = tuple(key[position] for position in positions)
+            target = rolled.setdefault(group, dict.fromkeys(AGGREGATE_FIELDS, 0.0))
+            for field in AGGREGATE_FIELDS:
+                target[field] += totals[field]
+
+        rows = []
+        for group in sorted(rolled):
+            row = dict(zip(by, group))
+            row.update(_finalize(rolled[group]))
+            rows.append(row)
+        return rows
+
+    def matrix(self, metric: str = 'profit', month: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Client × Mother Station matrix for one metric.
+
+        Args:
+            metric (str): Any of METRICS
+            month (str): Restrict to one month (YYYY-MM); all months if omitted
+
+        Returns:
+            dict: client -> {mother_station -> value}; only pairs with trips
+                are present
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric: {metric} (expected one of {', '.join(METRICS)})")
+
+        source = self
+        if month is not None:
+            source = ProfitabilityMatrix()
+            source.groups = {key: totals for key, totals in self.groups.items() if key[2] == month}
+
+        result: Dict[str, Dict[str, Any]] = {}
+        for row in source.table(('daughter_station', 'mother_station')):
+            result.setdefault(row['daughter_station'], {})[row['mother_station']] = row[metric]
+        return result
+
+    def months(self) -> List[str]:
+        """
+        Months present in the matrix.
+
+        Returns:
+            list: Sorted month labels (YYYY-MM)
+        """
+        return sorted({key[2] for key in self.groups})
+
+    @classmethod
+    def from_trip_log(cls, path: str, chunk_size: int = 50000,
+                      calculator: Optional[ProfitabilityCalculator] = None) -> 'ProfitabilityMatrix':
+        """
+        Build a matrix by streaming a CSV/JSONL trip log.
+
+        Args:
+            path (str): Trip log (see trip_ingest.py)
+            chunk_size (int): Trips per vectorized pass
+            calculator (ProfitabilityCalculator): Calculator to use (optional)
+
+        Returns:
+            ProfitabilityMatrix: Aggregated matrix
+        """
+        from trip_ingest import read_trip_chunks
+
+        matrix = cls(calculator)
+        cost_model = (calculator or get_calculator()).cost_model
+        for chunk in read_trip_chunks(path, chunk_size, cost_model=cost_model):
+            matrix.add(chunk)
+        return matrix
+
+    @classmethod
+    def from_store(cls, store: Any, start: Optional[str] = None, end: Optional[str] = None,
+                   calculator: Optional[ProfitabilityCalculator] = None) -> 'ProfitabilityMatrix':
+        """
+        Build a matrix from a columnar trip store (see trip_store.py).
+
+        Args:
+            store (TripStore): Trip store
+            start (str): First day (YYYY-MM-DD, inclusive)
+            end (str): Last day (YYYY-MM-DD, inclusive)
+            calculator (ProfitabilityCalculator): Calculator to use (optional)
+
+        Returns:
+            ProfitabilityMatrix: Aggregated matrix
+        """
+        matrix = cls(calculator)
+        for day, columns, results in store.calculate(start, end, calculator):
+            matrix.add(columns, results, month=day[:7])
+        return matrix
+
+
+def main():
+    """
+    Print the client × Mother Station matrix for a trip log.
+    """
+    parser = argparse.ArgumentParser(description="Client profitability matrix split by Mother Station")
+    parser.add_argument('trip_log', help="Trip log (.csv or .jsonl)")
+    parser.add_argument('--metric', default='profit', choices=METRICS)
+    parser.add_argument('--by-month', action='store_true', help="One matrix per month")
+    parser.add_argument('--chunk-size', type=int, default=50000)
+    args = parser.parse_args()
+
+    matrix = ProfitabilityMatrix.from_trip_log(args.trip_log, args.chunk_size)
+    months = matrix.months() if args.by_month else [None]
+
+    print("PowerGas Client Profitability Matrix")
+    print("="*80)
+
+    for month in months:
+        table = matrix.matrix(args.metric, month)
+        stations = sorted({station for row in table.values() for station in row})
+
+        print(f"\n{args.metric} - {month or 'all months'}")
+        print(f"{'Client':<22}" + ''.join(f"{station:>18}" for station in stations))
+        print("-"*(22 + 18 * len(stations)))
+        for client, row in table.items():
+            cells = ''.join(f"{row[station]:>18,.2f}" if station in row else f"{'-':>18}"
+                            for station in stations)
+            print(f"{client:<22}{cells}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+PowerGas Result Cache
+
+Content-addressed, thread-safe LRU cache for repeated trip/scenario
+evaluations and the tables and charts built from them. Keys are a canonical
+hash of the input data, so the same trip_data always maps to the same entry
+regardless of key order or int/float spelling (5000 vs 5000.0).
+
+Used by the Streamlit app (one instance shared across all sessions) so
+unchanged scenarios and charts come back instantly on every rerun.
+"""
+
+import hashlib
+import json
+import pickle
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+
+def _canonical(value: Any) -> Any:
+    """Normalise numbers so equal inputs serialise identically."""
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    return str(value)
+
+
+def canonical_key(*parts: Any) -> str:
+    """
+    Build a content hash for cache lookups.
+
+    Args:
+        *parts: JSON-like values (dicts, lists, numbers, strings) identifying
+            the cached computation, e.g. ('trip', trip_data)
+
+    Returns:
+        str: SHA-256 hex digest of the canonical JSON encoding
+    """
+    encoded = json.dumps(_canonical(parts), sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Approximate memory footprint of a cached value in bytes.
+
+    Args:
+        value: Any cached value
+
+    Returns:
+        int: Pickled size, or sys.getsizeof when the value cannot be pickled
+    """
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+class LRUCache:
+    """
+    Least-recently-used cache bounded by entry count and total size.
+
+    Attributes:
+        max_entries (int): Maximum number of entries
+        max_bytes (int): Maximum total estimated size in bytes
+        hits (int): Lookups answered from the cache
+        misses (int): Lookups that had to compute the value
+        evictions (int): Entries dropped to respect the limits
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024,
+                 sizeof: Callable[[Any], int] = estimate_size):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_entries (int): Maximum number of entries
+            max_bytes (int): Maximum total estimated size in bytes
+            sizeof (callable): Function estimating the size of a value
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Optional[Any] = None) -> Any:
+        """
+        Look up a value and mark it as recently used.
+
+        Args:
+            key (str): Cache key (see canonical_key)
+            default: Returned when the key is not cached
+
+        Returns:
+            The cached value or default
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, value: Any):
+        """
+        Store a value, evicting least-recently-used entries if needed.
+
+        Values larger than max_bytes on their own are not cached.
+
+        Args:
+            key (str): Cache key (see canonical_key)
+            value: Value to store
+        """
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for key, computing and storing it on a miss.
+
+        Args:
+            key (str): Cache key (see canonical_key)
+            compute (callable): Zero-argument function producing the value
+
+        Returns:
+            The cached or freshly computed value
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """
+        Drop every entry and reset the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Current cache counters.
+
+        Returns:
+            dict: hits, misses, hit_rate_percent, entries, bytes and evictions
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate_percent': round(self.hits / lookups * 100, 2) if lookups else 0.0,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'evictions': self.evictions,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
@@ -0,0 +1,503 @@
+"""
+PowerGas Route Turnaround Index (Requirements 1 and 5)
+
+Keeps running statistics of truck turnaround time (TTAT), skid turnaround time
+(STAT) and round trip distance (RTD) for every Mother Station → Daughter
+Station route, so expected values for any route - including a hypothetical
+one in a what-if scenario - come from recorded trips instead of hand-typed
+numbers.
+
+Per route and metric the index stores:
+    count, mean, std      Welford running moments (merged per batch with
+                          Chan's parallel update)
+    min, max
+    p50, p90, ...         P² streaming quantile estimates (Jain & Chlamtac),
+                          five markers per quantile - no trip values are kept
+
+Updates are incremental and lookups are a single dict access.
+
+Usage:
+    python route_index.py trips.csv --save route_index.json
+    python route_index.py --load route_index.json --fill config.json
+"""
+
+import argparse
+import json
+import math
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from profitability_calculator import ProfitabilityCalculator, get_calculator
+
+
+ROUTE_METRICS = ('truck_turnaround_time', 'skid_turnaround_time', 'round_trip_distance')
+
+DEFAULT_QUANTILES = (0.5, 0.9)
+
+
+def _quantile_name(p: float) -> str:
+    return f"p{p * 100:g}"
+
+
+class P2Quantile:
+    """
+    Streaming estimate of one quantile using the P² algorithm.
+
+    Keeps five markers whose heights track the minimum, p/2, p, (1+p)/2 and
+    maximum quantiles, adjusted with a piecewise-parabolic formula as values
+    arrive.
+
+    Attributes:
+        p (float): Quantile being estimated (0 < p < 1)
+    """
+
+    def __init__(self, p: float):
+        """
+        Initialize the estimator.
+
+        Args:
+            p (float): Quantile to estimate, e.g. 0.9
+        """
+        if not 0 < p < 1:
+            raise ValueError("Quantile must be between 0 and 1")
+        self.p = p
+        self.heights: List[float] = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, value: float):
+        """
+        Add one observation.
+
+        Args:
+            value (float): Observed value
+        """
+        heights = self.heights
+        if len(heights) < 5:
+            heights.append(value)
+            heights.sort()
+            return
+
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = 0
+            while value >= heights[cell + 1]:
+                cell += 1
+
+        positions = self.positions
+        for i in range(cell + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        for i in (1, 2, 3):
+            offset = self.desired[i] - positions[i]
+            if ((offset >= 1 and positions[i + 1] - positions[i] > 1)
+                    or (offset <= -1 and positions[i - 1] - positions[i] < -1)):
+                step = 1 if offset > 0 else -1
+                height = self._parabolic(i, step)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + step * (heights[i + step] - heights[i]) / (positions[i + step] - positions[i])
+                heights[i] = height
+                positions[i] += step
+
+    def _parabolic(self, i: int, step: int) -> float:
+        heights, positions = self.heights, self.positions
+        return heights[i] + step / (positions[i + 1] - positions[i - 1]) * (
+            (positions[i] - positions[i - 1] + step) * (heights[i + 1] - heights[i]) / (positions[i + 1] - positions[i])
+            + (positions[i + 1] - positions[i] - step) * (heights[i] - heights[i - 1]) / (positions[i] - positions[i - 1]))
+
+    def value(self) -> Optional[float]:
+        """
+        Current quantile estimate.
+
+        Returns:
+            float: Estimate (exact while fewer than five values were seen), or
+                None before the first value
+        """
+        if not self.heights:
+            return None
+        if len(self.heights) < 5:
+            ordered = sorted(self.heights)
+            return ordered[min(len(ordered) - 1, int(round(self.p * (len(ordered) - 1))))]
+        return self.heights[2]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'p': self.p, 'heights': self.heights, 'positions': self.positions, 'desired': self.desired}
+
+    @classmethod
+    def from_dict(cls, state: Mapping[str, Any]) -> 'P2Quantile':
+        estimator = cls(state['p'])
+        estimator.heights = list(state['heights'])
+        estimator.positions = list(state['positions'])
+        estimator.desired = list(state['desired'])
+        return estimator
+
+
+class RunningStats:
+    """
+    Welford mean/variance, min/max and P² quantiles for one route metric.
+
+    Attributes:
+        count (int): Number of observations
+        mean (float): Running mean
+        quantiles (list): P2Quantile estimators
+    """
+
+    def __init__(self, quantiles: Sequence[float] = DEFAULT_QUANTILES):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.quantiles = [P2Quantile(p) for p in quantiles]
+
+    def add(self, value: float):
+        """
+        Add one observation.
+
+        Args:
+            value (float): Observed value
+        """
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+        for estimator in self.quantiles:
+            estimator.add(value)
+
+    def add_many(self, values: Any):
+        """
+        Add a batch of observations (NumPy array).
+
+        Moments are merged in one step with Chan's parallel update; the
+        quantile sketches still see every value in order.
+
+        Args:
+            values (numpy.ndarray): Observed values
+        """
+        count = len(values)
+        if not count:
+            return
+
+        batch_mean = float(values.mean())
+        batch_m2 = float(((values - batch_mean) ** 2).sum())
+        total = self.count + count
+        delta = batch_mean - self.mean
+        self.m2 += batch_m2 + delta * delta * self.count * count / total
+        self.mean += delta * count / total
+        self.count = total
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+
+        for value in values.tolist():
+            for estimator in self.quantiles:
+                estimator.add(value)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Current statistics.
+
+        Returns:
+            dict: count, mean, std, min, max and one entry per quantile (p50, ...)
+        """
+        if not self.count:
+            return {'count': 0}
+        std = math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+        summary = {
+            'count': self.count,
+            'mean': round(self.mean, 4),
+            'std': round(std, 4),
+            'min': self.minimum,
+            'max': self.maximum,
+        }
+        for estimator in self.quantiles:
+            summary[_quantile_name(estimator.p)] = round(estimator.value(), 4)
+        return summary
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2,
+                'min': self.minimum, 'max': self.maximum,
+                'quantiles': [estimator.to_dict() for estimator in self.quantiles]}
+
+    @classmethod
+    def from_dict(cls, state: Mapping[str, Any]) -> 'RunningStats':
+        stats = cls(())
+        stats.count = state['count']
+        stats.mean = state['mean']
+        stats.m2 = state['m2']
+        stats.minimum = state['min']
+        stats.maximum = state['max']
+        stats.quantiles = [P2Quantile.from_dict(item) for item in state['quantiles']]
+        return stats
+
+
+class RouteIndex:
+    """
+    Per-route TTAT/STAT/RTD statistics keyed by (mother_station, daughter_station).
+
+    Attributes:
+        quantiles (tuple): Quantiles tracked for every metric
+        routes (dict): (mother_station, daughter_station) -> {metric: RunningStats}
+    """
+
+    def __init__(self, quantiles: Sequence[float] = DEFAULT_QUANTILES):
+        """
+        Initialize an empty index.
+
+        Args:
+            quantiles (sequence): Quantiles to track, e.g. (0.5, 0.9)
+        """
+        self.quantiles = tuple(quantiles)
+        self.routes: Dict[Tuple[str, str], Dict[str, RunningStats]] = {}
+        self._summaries: Dict[Tuple[str, str], Dict[str, Dict[str, Any]]] = {}
+
+    def _route(self, route: Tuple[str, str]) -> Dict[str, RunningStats]:
+        stats = self.routes.get(route)
+        if stats is None:
+            stats = self.routes[route] = {metric: RunningStats(self.quantiles) for metric in ROUTE_METRICS}
+        self._summaries.pop(route, None)
+        return stats
+
+    def add_trip(self, trip_data: Mapping[str, Any]):
+        """
+        Record one trip.
+
+        Args:
+            trip_data (Mapping): Trip with mother_station, daughter_station and
+                any of ROUTE_METRICS
+        """
+        stats = self._route((trip_data['mother_station'], trip_data['daughter_station']))
+        for metric in ROUTE_METRICS:
+            value = trip_data.get(metric)
+            if value is not None:
+                stats[metric].add(float(value))
+
+    def add_batch(self, trips: Mapping[str, Any]) -> int:
+        """
+        Record a batch of trips.
+
+        Args:
+            trips (Mapping): Columnar trip data with mother_station,
+                daughter_station and ROUTE_METRICS columns
+
+        Returns:
+            int: Number of trips recorded
+        """
+        import numpy as np
+        from profitability_matrix import factorize
+
+        mothers, mother_codes = factorize(trips['mother_station'])
+        daughters, daughter_codes = factorize(trips['daughter_station'])
+        combined = mother_codes * len(daughters) + daughter_codes
+        order = np.argsort(combined, kind='stable')
+        group_codes, starts = np.unique(combined[order], return_index=True)
+        bounds = np.append(starts, len(order))
+
+        columns = {metric: np.asarray(trips[metric], dtype=np.float64)[order]
+                   for metric in ROUTE_METRICS if metric in trips}
+
+        for position, code in enumerate(group_codes.tolist()):
+            mother_code, daughter_code = divmod(code, len(daughters))
+            stats = self._route((mothers[mother_code], daughters[daughter_code]))
+            for metric, values in columns.items():
+                values = values[bounds[position]:bounds[position + 1]]
+                stats[metric].add_many(values[~np.isnan(values)])
+
+        return len(order)
+
+    def lookup(self, mother_station: str, daughter_station: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Statistics for one route.
+
+        Args:
+            mother_station (str): Mother Station
+            daughter_station (str): Daughter Station
+
+        Returns:
+            dict: metric -> summary (see RunningStats.summary), or None for an
+                unknown route
+        """
+        route = (mother_station, daughter_station)
+        summary = self._summaries.get(route)
+        if summary is None:
+            stats = self.routes.get(route)
+            if stats is None:
+                return None
+            summary = self._summaries[route] = {metric: item.summary() for metric, item in stats.items()}
+        return summary
+
+    def expected_values(self, mother_station: str, daughter_station: str,
+                        statistic: str = 'mean') -> Dict[str, float]:
+        """
+        Expected TTAT, STAT and RTD for a route.
+
+        Args:
+            mother_station (str): Mother Station
+            daughter_station (str): Daughter Station
+            statistic (str): 'mean', 'min', 'max' or a tracked quantile ('p90')
+
+        Returns:
+            dict: metric -> value, for metrics with recorded trips
+        """
+        summary = self.lookup(mother_station, daughter_station)
+        if summary is None:
+            raise KeyError(f"No trips recorded for route {mother_station} -> {daughter_station}")
+        return {metric: values[statistic] for metric, values in summary.items()
+                if values['count'] and statistic in values}
+
+    def fill_trip(self, trip_data: Mapping[str, Any], statistic: str = 'mean',
+                  overwrite: bool = False) -> Dict[str, Any]:
+        """
+        Fill a trip's TTAT/STAT/RTD from the route index.
+
+        Args:
+            trip_data (Mapping): Trip with mother_station and daughter_station
+            statistic (str): Statistic to use (see expected_values)
+            overwrite (bool): Replace values already present in trip_data
+
+        Returns:
+            dict: Copy of trip_data with the route metrics filled in
+        """
+        filled = dict(trip_data)
+        expected = self.expected_values(trip_data['mother_station'], trip_data['daughter_station'], statistic)
+        for metric, value in expected.items():
+            if overwrite or filled.get(metric) is None:
+                filled[metric] = value
+        return filled
+
+    def calculate_route_profit(self, trip_data: Mapping[str, Any], statistic: str = 'mean',
+                               calculator: Optional[ProfitabilityCalculator] = None) -> Dict[str, Any]:
+        """
+        Calculate profit for a (possibly hypothetical) route using indexed
+        turnaround times and distance.
+
+        Args:
+            trip_data (Mapping): Trip prices/rates plus mother_station and
+                daughter_station; route metrics are taken from the index
+            statistic (str): Statistic to use (see expected_values)
+            calculator (ProfitabilityCalculator): Calculator to use (optional)
+
+        Returns:
+            dict: calculate_trip_profit() result
+        """
+        calculator = calculator or get_calculator()
+        return calculator.calculate_trip_profit(self.fill_trip(trip_data, statistic, overwrite=True))
+
+    def save(self, path: str):
+        """
+        Save the index (including the quantile sketches) to JSON.
+
+        Args:
+            path (str): Output file
+        """
+        state = {
+            'quantiles': list(self.quantiles),
+            'routes': [
+                {'mother_station': mother, 'daughter_station': daughter,
+                 'metrics': {metric: stats.to_dict() for metric, stats in metrics.items()}}
+                for (mother, daughter), metrics in self.routes.items()
+            ],
+        }
+        with open(path, 'w') as f:
+            json.dump(state, f)
+
+    @classmethod
+    def load(cls, path: str) -> 'RouteIndex':
+        """
+        Load an index saved with save(); it can keep being updated.
+
+        Args:
+            path (str): Index file
+
+        Returns:
+            RouteIndex: Restored index
+        """
+        with open(path, 'r') as f:
+            state = json.load(f)
+
+        index = cls(state['quantiles'])
+        for route in state['routes']:
+            index.routes[(route['mother_station'], route['daughter_station'])] = {
+                metric: RunningStats.from_dict(stats) for metric, stats in route['metrics'].items()
+            }
+        return index
+
+    @classmethod
+    def from_trip_log(cls, path: str, chunk_size: int = 50000,
+                      quantiles: Sequence[float] = DEFAULT_QUANTILES) -> 'RouteIndex':
+        """
+        Build an index by streaming a CSV/JSONL trip log.
+
+        Args:
+            path (str): Trip log (see trip_ingest.py)
+            chunk_size (int): Trips per batch
+            quantiles (sequence): Quantiles to track
+
+        Returns:
+            RouteIndex: Populated index
+        """
+        from trip_ingest import read_trip_chunks
+
+        index = cls(quantiles)
+        for chunk in read_trip_chunks(path, chunk_size):
+            index.add_batch(chunk)
+        return index
+
+
+def main():
+    """
+    Build or load a route index and print per-route turnaround statistics.
+    """
+    parser = argparse.ArgumentParser(description="Per-route TTAT/STAT/RTD statistics")
+    parser.add_argument('trip_log', nargs='?', help="Trip log (.csv or .jsonl) to add to the index")
+    parser.add_argument('--load', help="Existing index file to start from")
+    parser.add_argument('--save', help="Write the updated index to this file")
+    parser.add_argument('--fill', metavar='CONFIG', help="Calculate config.json's trip with route values from the index")
+    parser.add_argument('--statistic', default='mean', help="Statistic used by --fill (mean, p50, p90, ...)")
+    args = parser.parse_args()
+
+    index = RouteIndex.load(args.load) if args.load else RouteIndex()
+    if args.trip_log:
+        from trip_ingest import read_trip_chunks
+        for chunk in read_trip_chunks(args.trip_log):
+            index.add_batch(chunk)
+    if args.save:
+        index.save(args.save)
+
+    print("PowerGas Route Turnaround Index")
+    print("="*80)
+    labels = {'truck_turnaround_time': 'TTAT (h)', 'skid_turnaround_time': 'STAT (h)', 'round_trip_distance': 'RTD (km)'}
+    columns = ['mean'] + [_quantile_name(p) for p in index.quantiles]
+
+    for mother, daughter in sorted(index.routes):
+        summary = index.lookup(mother, daughter)
+        print(f"\n{mother} -> {daughter} ({summary['truck_turnaround_time']['count']:,} trips)")
+        for metric in ROUTE_METRICS:
+            values = summary[metric]
+            if values['count']:
+                cells = ''.join(f"  {column} {values[column]:>9,.2f}" for column in columns)
+                print(f"    {labels[metric]:<10}{cells}")
+
+    if args.fill:
+        with open(args.fill, 'r') as f:
+            trip_data = json.load(f)['trip_data']
+        try:
+            result = index.calculate_route_profit(trip_data, args.statistic)
+        except KeyError as e:
+            print(f"\nError: {e.args[0]}")
+            return
+        print(f"\n{trip_data['mother_station']} -> {trip_data['daughter_station']} "
+              f"({args.statistic} route values): profit NGN {result['profit']:,.2f} "
+              f"({result['profit_margin_percent']:.2f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""
+PowerGas Parameter Sweep (What-If Grid)
+
+Expands a base trip plus value lists/ranges for selected fields into the
+Cartesian product of what-if scenarios, without ever materialising the grid.
+Points are generated in chunks straight from their index, calculated with the
+vectorized batch formula, and reduced to top-K/bottom-K points and summary
+statistics, so a million-point sweep runs in bounded memory.
+
+Sweep file format (see sweep.json):
+    {
+      "base_trip": { ... same fields as trip_data ... },
+      "parameters": {
+        "gas_price": [800, 850, 900],
+        "round_trip_distance": {"start": 100, "stop": 300, "step": 10}
+      }
+    }
+
+Ranges include "stop" when it falls on a step.
+
+Usage:
+    python scenario_sweep.py sweep.json --top 10
+"""
+
+import argparse
+import heapq
+import json
+import math
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from profitability_calculator import (
+    ProfitabilityCalculator,
+    get_calculator,
+    TRIP_INPUT_FIELDS,
+    BATCH_RESULT_FIELDS,
+)
+
+
+DEFAULT_CHUNK_SIZE = 100000
+
+
+def expand_values(spec: Any) -> List[float]:
+    """
+    Expand one parameter spec into its list of values.
+
+    Args:
+        spec: A list of values, or a dict with start/stop/step (inclusive stop)
+
+    Returns:
+        list: Values for the parameter
+    """
+    if isinstance(spec, dict):
+        start, stop, step = float(spec['start']), float(spec['stop']), float(spec['step'])
+        if step <= 0 or stop < start:
+            raise ValueError(f"Invalid range {spec}: need step > 0 and stop >= start")
+        count = int(math.floor((stop - start) / step + 1e-9)) + 1
+        return [start + i * step for i in range(count)]
+
+    values = [float(value) for value in spec]
+    if not values:
+        raise ValueError("A swept parameter needs at least one value")
+    return values
+
+
+class ParameterSweep:
+    """
+    Lazy Cartesian-product sweep over trip_data fields.
+
+    Points are numbered in itertools.product order (last parameter varies
+    fastest), so any point can be rebuilt from its index alone.
+
+    Attributes:
+        base_trip (dict): Trip data shared by every point
+        parameters (dict): Swept field name -> list of values
+    """
+
+    def __init__(self, base_trip: Dict[str, Any], parameters: Dict[str, Any]):
+        """
+        Initialize the sweep.
+
+        Args:
+            base_trip (dict): Trip data shared by every point
+            parameters (dict): Swept field name -> value list or range spec;
+                checked against the calculator's cost model in run()
+        """
+        self.base_trip = base_trip
+        self.parameters = {field: expand_values(spec) for field, spec in parameters.items()}
+
+    @classmethod
+    def from_file(cls, sweep_file: str) -> 'ParameterSweep':
+        """
+        Load a sweep definition from a JSON file.
+
+        Args:
+            sweep_file (str): Path to the sweep JSON file
+
+        Returns:
+            ParameterSweep: The loaded sweep
+        """
+        with open(sweep_file, 'r') as f:
+            sweep_data = json.load(f)
+        return cls(sweep_data['base_trip'], sweep_data['parameters'])
+
+    def __len__(self) -> int:
+        return math.prod(len(values) for values in self.parameters.values())
+
+    def point(self, index: int) -> Dict[str, float]:
+        """
+        Rebuild the swept parameter values of one point.
+
+        Args:
+            index (int): Point index in product order
+
+        Returns:
+            dict: Swept field name -> value
+        """
+        values = {}
+        for field in reversed(list(self.parameters)):
+            options = self.parameters[field]
+            index, position = divmod(index, len(options))
+            values[field] = options[position]
+        return dict(reversed(list(values.items())))
+
+    def iter_chunks(self, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    fields: Sequence[str] = TRIP_INPUT_FIELDS) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Lazily yield the grid as columnar chunks for calculate_batch.
+
+        Args:
+            chunk_size (int): Points per chunk
+            fields (sequence): trip_data fields to fill from base_trip when not
+                swept (e.g. CostModel.fields); fields missing from base_trip
+                are left out so cost-model defaults apply
+
+        Yields:
+            tuple: (index of the first point, dict of NumPy columns)
+        """
+        import numpy as np
+
+        lookup = {field: np.asarray(values, dtype=np.float64)
+                  for field, values in self.parameters.items()}
+        total = len(self)
+
+        for start in range(0, total, chunk_size):
+            remainder = np.arange(start, min(start + chunk_size, total), dtype=np.int64)
+            size = len(remainder)
+            columns = {}
+            for field in reversed(list(self.parameters)):
+                remainder, position = np.divmod(remainder, len(lookup[field]))
+                columns[field] = lookup[field][position]
+            for field in fields:
+                if field not in columns and self.base_trip.get(field) is not None:
+                    columns[field] = np.full(size, float(self.base_trip[field]))
+            yield start, columns
+
+    def run(self, calculator: Optional[ProfitabilityCalculator] = None,
+            top_k: int = 10, sort_by: str = 'profit',
+            chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, Any]:
+        """
+        Stream every point through the calculator and keep only a summary.
+
+        Args:
+            calculator (ProfitabilityCalculator): Calculator to use (optional)
+            top_k (int): Number of best and worst points to keep
+            sort_by (str): Result column used for ranking
+            chunk_size (int): Points calculated per vectorized pass
+
+        Returns:
+            dict: Point count, statistics per result column, loss-making
+                point count, and the top/bottom points with their results
+        """
+        if sort_by not in BATCH_RESULT_FIELDS:
+            raise ValueError(f"Unknown result column: {sort_by}")
+
+        if calculator is None:
+            calculator = get_calculator()
+
+        fields = calculator.cost_model.fields
+        unknown = [field for field in self.parameters if field not in fields]
+        if unknown:
+            raise ValueError(f"Cannot sweep fields not used by cost model "
+                             f"'{calculator.cost_model.name}': {', '.join(unknown)}")
+
+        stats = {field: _RunningStats() for field in BATCH_RESULT_FIELDS}
+        top: List[Tuple[float, int, Dict[str, float]]] = []
+        bottom: List[Tuple[float, int, Dict[str, float]]] = []
+        loss_making = 0
+
+        for start, columns in self.iter_chunks(chunk_size, fields):
+            results = calculator.calculate_batch(columns)
+            for field in BATCH_RESULT_FIELDS:
+                stats[field].update(results[field])
+            loss_making += int((results['profit'] < 0).sum())
+
+            key = results[sort_by]
+            for position in _extreme_positions(key, top_k, largest=True):
+                _push(top, top_k, float(key[position]), start + position, results, position)
+            for position in _extreme_positions(key, top_k, largest=False):
+                _push(bottom, top_k, -float(key[position]), start + position, results, position)
+
+        return {
+            'points': len(self),
+            'parameters': {field: len(values) for field, values in self.parameters.items()},
+            'statistics': {field: stats[field].summary() for field in BATCH_RESULT_FIELDS},
+            'loss_making_points': loss_making,
+            'top': [self._ranked_point(entry) for entry in sorted(top, reverse=True)],
+            'bottom': [self._ranked_point(entry) for entry in sorted(bottom, reverse=True)],
+        }
+
+    def _ranked_point(self, entry: Tuple[float, int, Dict[str, float]]) -> Dict[str, Any]:
+        _, negative_index, result = entry
+        index = -negative_index
+        return {'index': index, 'parameters': self.point(index), **result}
+
+
+def _extreme_positions(values, k: int, largest: bool):
+    """
+    Positions of the k largest (or smallest) values in a chunk.
+
+    Values tied with the k-th value are kept earliest first, so the selection
+    does not depend on where chunk boundaries fall.
+    """
+    import numpy as np
+
+    if k <= 0:
+        return []
+    if len(values) <= k:
+        return range(len(values))
+    if largest:
+        kth = np.partition(values, -k)[-k]
+        beyond = np.flatnonzero(values > kth)
+    else:
+        kth = np.partition(values, k - 1)[k - 1]
+        beyond = np.flatnonzero(values < kth)
+    tied = np.flatnonzero(values == kth)[:k - len(beyond)]
+    return np.concatenate([beyond, tied]).tolist()
+
+
+def _push(heap: list, k: int, key: float, index: int, results: Dict[str, Any], position: int):
+    """Keep the k entries with the largest key (ties go to the earlier point)."""
+    entry = (key, -index)
+    if len(heap) == k and entry <= heap[0][:2]:
+        return
+    item = (key, -index, {field: float(results[field][position]) for field in BATCH_RESULT_FIELDS})
+    if len(heap) < k:
+        heapq.heappush(heap, item)
+    else:
+        heapq.heapreplace(heap, item)
+
+
+class _RunningStats:
+    """Chunk-wise count/mean/variance/min/max (Chan et al. parallel update)."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def update(self, values):
+        count = len(values)
+        if not count:
+            return
+        mean = float(values.mean())
+        m2 = float(((values - mean) ** 2).sum())
+        delta = mean - self.mean
+        total = self.count + count
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.mean += delta * count / total
+        self.count = total
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+
+    def summary(self) -> Dict[str, float]:
+        std = math.sqrt(self.m2 / self.count) if self.count else 0.0
+        return {
+            'min': round(self.minimum, 2),
+            'max': round(self.maximum, 2),
+            'mean': round(self.mean, 2),
+            'std': round(std, 2),
+        }
+
+
+def main():
+    """
+    Command-line entry point for parameter sweeps.
+    """
+    parser = argparse.ArgumentParser(description="Run a what-if parameter sweep")
+    parser.add_argument('sweep_file', nargs='?', default='sweep.json', help="Sweep definition JSON")
+    parser.add_argument('--top', type=int, default=10, help="Best/worst points to report")
+    parser.add_argument('--sort-by', default='profit', choices=BATCH_RESULT_FIELDS)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--json', action='store_true', help="Print the full summary as JSON")
+    args = parser.parse_args()
+
+    sweep = ParameterSweep.from_file(args.sweep_file)
+    summary = sweep.run(top_k=args.top, sort_by=args.sort_by, chunk_size=args.chunk_size)
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    print("PowerGas Parameter Sweep")
+    print("="*80)
+    grid = ' × '.join(f"{field} ({count})" for field, count in summary['parameters'].items())
+    print(f"Points evaluated: {summary['points']:,}  [{grid}]")
+    print(f"Loss-making points: {summary['loss_making_points']:,}")
+
+    profit = summary['statistics']['profit']
+    print(f"\nProfit (NGN): min {profit['min']:,.2f}  mean {profit['mean']:,.2f}  "
+          f"max {profit['max']:,.2f}  std {profit['std']:,.2f}")
+
+    for title, points in (("TOP", summary['top']), ("BOTTOM", summary['bottom'])):
+        print(f"\n{title} {len(points)} by {args.sort_by}")
+        print("-"*80)
+        for point in points:
+            params = ', '.join(f"{field}={value:g}" for field, value in point['parameters'].items())
+            print(f"{point[args.sort_by]:>18,.2f}   {params}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""
+PowerGas Sensitivity & Break-Even Analysis
+
+The base profitability formula is linear in each input when the others are
+held fixed, so its sensitivities have exact closed forms:
+
+    dP/dGV   = GP - (GC + PC + G&A)      dP/dGP = GV
+    dP/dGC   = dP/dPC = dP/dG&A = -GV
+    dP/dTD   = dP/dTIS = dP/dFC = -TTAT   dP/dTTAT = -(TD + TIS + FC)
+    dP/dFTC  = dP/dVTC = -RTD            dP/dRTD  = -(FTC + VTC)
+    dP/dSD   = -STAT                     dP/dSTAT = -SD
+
+Elasticity:  E = dP/dx × x / P  (% change in profit per 1% change in x)
+Break-even:  x* with P(x*) = 0  (the value of x at which profit is zero)
+
+When dP/dx < 0 the break-even is the maximum value that still gives
+profit >= 0 (e.g. the longest viable round trip distance); when dP/dx > 0 it
+is the minimum (e.g. the lowest viable gas price).
+
+Other cost models (see cost_models.py) are differentiated numerically with
+central differences on the model's kernel, over the model's fields present
+in the trip (e.g. gas_volume_dispensed). Those models are linear or
+piecewise linear (ceil, positive), so the derivative is exact away from the
+kinks but the linear extrapolation x - P / (dP/dx) can land past a step
+(e.g. an extra IMI operation day). The break-even is therefore found on the
+kernel itself: starting from the linear estimate, the step is doubled until
+profit changes sign, then the bracket is bisected. Inputs whose root lies
+beyond the search range get no break-even.
+
+Works on a single trip (plain floats, no dependencies) or on columnar batches
+of NumPy arrays / a pandas DataFrame.
+
+Usage:
+    python sensitivity.py [config.json]
+    python sensitivity.py config.json --cost-model gvd
+"""
+
+import argparse
+import json
+from typing import Any, Dict, Mapping, Optional
+
+from profitability_calculator import ProfitabilityCalculator, get_calculator
+
+
+# Relative step for numeric derivatives (models are piecewise linear)
+_STEP = 1e-3
+
+# Break-even search: bracket doublings, bisection rounds, and the relative
+# profit accepted as zero (linear models stop at the first estimate)
+_EXPANSIONS = 50
+_BISECTIONS = 80
+_TOLERANCE = 1e-9
+
+
+def sensitivity_fields(trip_data: Mapping[str, Any],
+                       calculator: Optional[ProfitabilityCalculator] = None) -> tuple:
+    """
+    Inputs analysed for a trip: the cost model's fields (CostModel.fields)
+    that the trip provides.
+
+    Args:
+        trip_data (Mapping): trip_data dict or columns
+        calculator (ProfitabilityCalculator): Calculator whose cost model is used
+
+    Returns:
+        tuple: Field names
+    """
+    calculator = calculator or get_calculator()
+    return tuple(field for field in calculator.cost_model.fields
+                 if field in trip_data and trip_data[field] is not None)
+
+
+def _base_derivatives(trip_data: Mapping[str, Any]) -> Dict[str, Any]:
+    """Closed-form derivatives of the base formula."""
+    gas_volume = trip_data['gas_volume']
+    truck_turnaround_time = trip_data['truck_turnaround_time']
+    round_trip_distance = trip_data['round_trip_distance']
+
+    return {
+        'gas_volume': trip_data['gas_price']
+                      - (trip_data['gas_cost'] + trip_data['plant_cost'] + trip_data['ga_cost']),
+        'gas_price': gas_volume,
+        'gas_cost': -gas_volume,
+        'plant_cost': -gas_volume,
+        'ga_cost': -gas_volume,
+        'truck_depreciation': -truck_turnaround_time,
+        'truck_insurance': -truck_turnaround_time,
+        'fuel_cost': -truck_turnaround_time,
+        'truck_turnaround_time': -(trip_data['truck_depreciation'] + trip_data['truck_insurance']
+                                   + trip_data['fuel_cost']),
+        'fixed_trucking_cost': -round_trip_distance,
+        'variable_trucking_cost': -round_trip_distance,
+        'round_trip_distance': -(trip_data['fixed_trucking_cost'] + trip_data['variable_trucking_cost']),
+        'skid_depreciation': -trip_data['skid_turnaround_time'],
+        'skid_turnaround_time': -trip_data['skid_depreciation'],
+    }
+
+
+def _numeric_derivatives(trip_data: Mapping[str, Any], calculator: ProfitabilityCalculator) -> Dict[str, Any]:
+    """Central-difference derivatives of the calculator's cost model."""
+    cost_model = calculator.cost_model
+    vectorized = not isinstance(trip_data['gas_volume'], (int, float))
+    if vectorized:
+        import numpy as np
+        evaluate = cost_model.evaluate_columns
+    else:
+        evaluate = cost_model.evaluate
+
+    derivatives = {}
+    for field in sensitivity_fields(trip_data, calculator):
+        value = trip_data[field]
+        if vectorized:
+            value = np.asarray(value, dtype=np.float64)
+            step = _STEP * np.maximum(np.abs(value), 1.0)
+        else:
+            value = float(value)
+            step = _STEP * max(abs(value), 1.0)
+        higher = evaluate({**trip_data, field: value + step})['profit']
+        lower = evaluate({**trip_data, field: value - step})['profit']
+        derivatives[field] = (higher - lower) / (2 * step)
+    return derivatives
+
+
+def partial_derivatives(trip_data: Mapping[str, Any],
+                        calculator: Optional[ProfitabilityCalculator] = None) -> Dict[str, Any]:
+    """
+    Partial derivative of profit with respect to every analysed input.
+
+    Closed form for the base cost model, central differences on the model
+    kernel otherwise.
+
+    Args:
+        trip_data (Mapping): trip_data dict (floats) or columns (NumPy arrays)
+        calculator (ProfitabilityCalculator): Calculator whose cost model is
+            differentiated (default: get_calculator())
+
+    Returns:
+        dict: Field name -> dP/dfield (NGN per unit of the field), for
+            sensitivity_fields()
+    """
+    calculator = calculator or get_calculator()
+    if calculator.cost_model.name == 'base':
+        return _base_derivatives(trip_data)
+    return _numeric_derivatives(trip_data, calculator)
+
+
+def _break_even(trip_data: Mapping[str, Any], field: str, profit: float, derivative: float,
+                calculator: ProfitabilityCalculator) -> Optional[float]:
+    """Value of one input at which the trip's kernel profit crosses zero."""
+    value = float(trip_data[field])
+    if profit == 0:
+        return value
+
+    def profit_at(x):
+        return calculator.cost_model.evaluate({**trip_data, field: x})['profit']
+
+    # Walk from the linear estimate, doubling the step until profit changes sign
+    step = -profit / derivative
+    near, far = value, value + step
+    for _ in range(_EXPANSIONS):
+        far_profit = profit_at(far)
+        if abs(far_profit) <= _TOLERANCE * max(abs(profit), 1.0):
+            return far
+        if (far_profit > 0) != (profit > 0):
+            break
+        near, step = far, step * 2
+        far = near + step
+    else:
+        return None
+
+    for _ in range(_BISECTIONS):
+        middle = (near + far) / 2
+        if (profit_at(middle) > 0) == (profit > 0):
+            near = middle
+        else:
+            far = middle
+    # The end of the bracket that still gives profit >= 0
+    return near if profit > 0 else far
+
+
+def _break_even_columns(columns: Mapping[str, Any], field: str, profit: Any, derivative: Any,
+                        calculator: ProfitabilityCalculator) -> Any:
+    """Vectorized _break_even(); NaN where no root is found."""
+    import numpy as np
+
+    evaluate = calculator.cost_model.evaluate_columns
+    value = columns[field]
+    break_even = np.where(profit == 0, value, np.nan)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        step = np.where(derivative != 0, -profit / derivative, np.nan)
+    active = (profit != 0) & np.isfinite(step)
+    bracketed = np.zeros(profit.shape, dtype=bool)
+    near, far = value, value + np.where(active, step, 0.0)
+    for _ in range(_EXPANSIONS):
+        if not active.any():
+            break
+        far_profit = evaluate({**columns, field: far})['profit']
+        done = active & (np.abs(far_profit) <= _TOLERANCE * np.maximum(np.abs(profit), 1.0))
+        break_even[done] = far[done]
+        crossed = active & ~done & ((far_profit > 0) != (profit > 0))
+        bracketed |= crossed
+        active &= ~(done | crossed)
+        near = np.where(active, far, near)
+        step = np.where(active, step * 2, step)
+        far = np.where(active, near + step, far)
+
+    if bracketed.any():
+        for _ in range(_BISECTIONS):
+            middle = np.where(bracketed, (near + far) / 2, value)
+            same = (evaluate({**columns, field: middle})['profit'] > 0) == (profit > 0)
+            near = np.where(bracketed & same, middle, near)
+            far = np.where(bracketed & ~same, middle, far)
+        break_even[bracketed] = np.where(profit > 0, near, far)[bracketed]
+    return break_even
+
+
+def analyze_trip(trip_data: Dict[str, Any],
+                 calculator: Optional[ProfitabilityCalculator] = None) -> Dict[str, Any]:
+    """
+    Sensitivity, elasticity and break-even value of every input for one trip.
+
+    Args:
+        trip_data (dict): Dictionary containing all trip parameters
+        calculator (ProfitabilityCalculator): Calculator whose cost model is
+            analysed (default: get_calculator())
+
+    Returns:
+        dict: Trip profit plus, per field: value, derivative, elasticity
+            (None at zero profit), break_even (None when profit does not
+            depend on the field or never reaches zero) and bound ('max' or
+            'min')
+    """
+    calculator = calculator or get_calculator()
+
+    profit = calculator.cost_model.evaluate(trip_data)['profit']
+    derivatives = partial_derivatives(trip_data, calculator)
+
+    fields = {}
+    for field, derivative in derivatives.items():
+        value = trip_data[field]
+        elasticity = derivative * value / profit if profit != 0 else None
+        if derivative == 0:
+            break_even, bound = None, None
+        else:
+            break_even = _break_even(trip_data, field, profit, derivative, calculator)
+            bound = 'max' if derivative < 0 else 'min'
+
+        fields[field] = {
+            'value': value,
+            'derivative': round(derivative, 4),
+            'elasticity': round(elasticity, 4) if elasticity is not None else None,
+            'break_even': round(break_even, 4) if break_even is not None else None,
+            'bound': bound,
+        }
+
+    return {
+        'trip_id': trip_data.get('trip_id', 'N/A'),
+        'profit': round(profit, 2),
+        'sensitivities': fields,
+    }
+
+
+def analyze_batch(trips: Mapping[str, Any],
+                  calculator: Optional[ProfitabilityCalculator] = None) -> Dict[str, Any]:
+    """
+    Sensitivity, elasticity and break-even values for a batch of trips.
+
+    Args:
+        trips (Mapping): Columnar trip data - a dict of NumPy arrays/lists
+            or a pandas DataFrame using the same field names as trip_data
+        calculator (ProfitabilityCalculator): Calculator whose cost model is
+            analysed (default: get_calculator())
+
+    Returns:
+        dict: 'profit' array plus, per field, a dict of 'derivative',
+            'elasticity' and 'break_even' arrays (NaN where undefined)
+    """
+    import numpy as np
+
+    calculator = calculator or get_calculator()
+
+    columns = {field: np.asarray(trips[field], dtype=np.float64)
+               for field in sensitivity_fields(trips, calculator)}
+    profit = calculator.cost_model.evaluate_columns(columns)['profit']
+    derivatives = partial_derivatives(columns, calculator)
+
+    fields = {}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for field, derivative in derivatives.items():
+            derivative = np.broadcast_to(derivative, profit.shape)
+            elasticity = np.where(profit != 0, derivative * columns[field] / profit, np.nan)
+            fields[field] = {
+                'derivative': derivative,
+                'elasticity': elasticity,
+                'break_even': _break_even_columns(columns, field, profit, derivative, calculator),
+            }
+
+    return {'profit': profit, 'sensitivities': fields}
+
+
+def main():
+    """
+    Print the sensitivity and break-even table for the trip in config.json.
+    """
+    parser = argparse.ArgumentParser(description="Sensitivity and break-even analysis for a trip")
+    parser.add_argument('config_file', nargs='?', default='config.json')
+    parser.add_argument('--cost-model', default='base', help="Registered cost model to analyse (see cost_models.py)")
+    args = parser.parse_args()
+
+    with open(args.config_file, 'r') as f:
+        trip_data = json.load(f)['trip_data']
+
+    calculator = get_calculator(args.cost_model)
+    analysis = analyze_trip(trip_data, calculator)
+
+    print("PowerGas Sensitivity & Break-Even Analysis")
+    print("="*80)
+    print(f"Trip ID: {analysis['trip_id']}   Profit: NGN {analysis['profit']:,.2f}\n")
+    print(f"{'Input':<26}{'Value':>12}{'dProfit/dx':>14}{'Elasticity':>12}{'Break-even':>16}")
+    print("-"*80)
+
+    ranked = sorted(analysis['sensitivities'].items(),
+                    key=lambda item: abs(item[1]['elasticity'] or 0), reverse=True)
+    for field, s in ranked:
+        elasticity = f"{s['elasticity']:.3f}" if s['elasticity'] is not None else 'n/a'
+        break_even = f"{s['bound']} {s['break_even']:,.2f}" if s['break_even'] is not None else 'n/a'
+        print(f"{field:<26}{s['value']:>12,.2f}{s['derivative']:>14,.2f}{elasticity:>12}{break_even:>16}")
+
+
+if __name__ == "__main__":
+    main()
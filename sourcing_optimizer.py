@@ -0,0 +1,359 @@
+"""
+PowerGas Sourcing Optimizer
+
+Finds the profit-maximising assignment of client (Daughter Station) demand to
+Mother Stations under station capacity limits, instead of ranking a handful of
+hand-written scenarios.
+
+Each Mother Station → client route gets a profit per scm from the
+profitability formula (route trip profit / gas volume per trip). The
+assignment is then a min-cost flow on the bipartite network
+
+    source --capacity--> Mother Stations --(-profit/scm)--> clients --demand--> sink
+
+solved locally with successive shortest paths. Shortest paths are found with
+a Bellman-Ford relaxation vectorized over the station × client cost matrix,
+which converges in a few rounds on this two-layer graph, so dozens of stations
+× hundreds of clients solve well under a second.
+
+By default only profitable volume is assigned (a client is left partly
+unserved if every remaining route loses money); use require_full_demand to
+serve all demand that capacity allows.
+
+Usage:
+    python sourcing_optimizer.py [sourcing.json] [--require-full-demand]
+"""
+
+import argparse
+import json
+import time
+from typing import Any, Dict, List, Mapping, Optional
+
+from profitability_calculator import ProfitabilityCalculator, get_calculator
+
+
+ROUTE_FIELDS = ('round_trip_distance', 'truck_turnaround_time', 'skid_turnaround_time')
+
+_EPSILON = 1e-9
+
+
+def route_trip(defaults: Mapping[str, Any], station: Mapping[str, Any], client: Mapping[str, Any],
+               route: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Trip inputs of one route, layered defaults < station < client < route.
+
+    Args:
+        defaults (Mapping): trip_data values shared by every route
+        station (Mapping): Mother Station inputs
+        client (Mapping): Client inputs
+        route (Mapping): Route inputs
+
+    Returns:
+        dict: Merged trip_data
+    """
+    trip = dict(defaults)
+    trip.update(station)
+    trip.update(client)
+    trip.update(route)
+    return trip
+
+
+def route_profit_per_scm(defaults: Mapping[str, Any], stations: List[Mapping[str, Any]],
+                         clients: List[Mapping[str, Any]], routes: Mapping[tuple, Mapping[str, Any]],
+                         calculator: Optional[ProfitabilityCalculator] = None) -> Any:
+    """
+    Profit per scm for every Mother Station × client route.
+
+    Trip inputs are layered defaults < station < client < route (see
+    route_trip), then all routes are calculated in one calculate_batch()
+    call. Every field the cost model reads is collected; fields with a model
+    default may be missing.
+
+    Args:
+        defaults (Mapping): trip_data values shared by every route
+        stations (list): Station dicts with 'name' and station-specific inputs
+            (e.g. gas_cost, plant_cost)
+        clients (list): Client dicts with 'name' and client-specific inputs
+            (e.g. gas_price)
+        routes (Mapping): (station, client) -> route inputs (RTD, TTAT, STAT)
+        calculator (ProfitabilityCalculator): Calculator to use (optional)
+
+    Returns:
+        numpy.ndarray: stations × clients matrix of NGN profit per scm, NaN
+            where no route is defined
+    """
+    import numpy as np
+
+    if calculator is None:
+        calculator = get_calculator()
+
+    pairs = [(i, j) for i, station in enumerate(stations) for j, client in enumerate(clients)
+             if (station['name'], client['name']) in routes]
+    profit_per_scm = np.full((len(stations), len(clients)), np.nan)
+    if not pairs:
+        return profit_per_scm
+
+    model = calculator.cost_model
+    trips = [route_trip(defaults, stations[i], clients[j], routes[(stations[i]['name'], clients[j]['name'])])
+             for i, j in pairs]
+    columns = {}
+    for field in model.fields + ('gas_volume',):
+        if field in columns:
+            continue
+        # A field read only by defaults is needed just where a default applies
+        readers = () if field in model.inputs or field == 'gas_volume' else [
+            target for target, names in model.default_inputs.items() if field in names]
+        column = np.full(len(trips), np.nan)
+        for position, trip in enumerate(trips):
+            if trip.get(field) is not None:
+                column[position] = trip[field]
+            elif field not in model.defaults and (not readers or any(trip.get(target) is None
+                                                                     for target in readers)):
+                i, j = pairs[position]
+                raise KeyError(f"Route {stations[i]['name']} -> {clients[j]['name']} is missing {field}")
+        if not np.isnan(column).all():
+            columns[field] = column
+
+    results = calculator.calculate_batch(columns, round_results=False)
+    rows, cols = zip(*pairs)
+    profit_per_scm[list(rows), list(cols)] = results['profit'] / columns['gas_volume']
+    return profit_per_scm
+
+
+def solve_min_cost_flow(cost: Any, supply: Any, demand: Any, require_full_demand: bool = False) -> Any:
+    """
+    Min-cost bipartite flow by successive shortest augmenting paths.
+
+    Args:
+        cost (numpy.ndarray): stations × clients cost per unit (inf = no arc)
+        supply (numpy.ndarray): Capacity of each station
+        demand (numpy.ndarray): Demand of each client
+        require_full_demand (bool): Keep augmenting along non-negative cost
+            paths; otherwise stop once no path lowers the total cost
+
+    Returns:
+        numpy.ndarray: stations × clients flow matrix
+    """
+    import numpy as np
+
+    stations, clients = cost.shape
+    flow = np.zeros((stations, clients))
+    supply_left = np.asarray(supply, dtype=np.float64).copy()
+    demand_left = np.asarray(demand, dtype=np.float64).copy()
+    finite = np.isfinite(cost)
+    arc_cost = np.where(finite, cost, np.inf)
+    reverse_cost = np.where(finite, -cost, np.inf)
+    client_index = np.arange(clients)
+
+    while True:
+        open_stations = supply_left > _EPSILON
+        open_clients = demand_left > _EPSILON
+        if not open_stations.any() or not open_clients.any():
+            break
+
+        # Bellman-Ford over the residual graph: source -> station -> client
+        # (forward arcs) and client -> station (reverse arcs with flow).
+        # Labels only change on a strict improvement so ties cannot turn the
+        # predecessor links into a cycle.
+        station_distance = np.where(open_stations, 0.0, np.inf)
+        station_from = np.full(stations, -1)
+        client_distance = np.full(clients, np.inf)
+        client_from = np.full(clients, -1)
+        for _ in range(stations + clients + 1):
+            through = station_distance[:, None] + arc_cost
+            best_from = through.argmin(axis=0)
+            best_distance = through[best_from, client_index]
+            better = best_distance < client_distance - _EPSILON
+            client_distance = np.where(better, best_distance, client_distance)
+            client_from = np.where(better, best_from, client_from)
+
+            back = np.where(flow > _EPSILON, client_distance[None, :] + reverse_cost, np.inf)
+            back_from = back.argmin(axis=1)
+            back_distance = back[np.arange(stations), back_from]
+            improved = back_distance < station_distance - _EPSILON
+            if not improved.any():
+                break
+            station_distance = np.where(improved, back_distance, station_distance)
+            station_from = np.where(improved, back_from, station_from)
+
+        candidates = np.where(open_clients, client_distance, np.inf)
+        target = int(candidates.argmin())
+        if not np.isfinite(candidates[target]):
+            break
+        if candidates[target] >= 0 and not require_full_demand:
+            break
+
+        # Trace the path back to the source and find its bottleneck
+        path = []
+        client = target
+        while True:
+            station = int(client_from[client])
+            path.append((station, client))
+            previous = int(station_from[station])
+            if previous < 0:
+                break
+            path.append((station, previous))
+            client = previous
+
+        amount = min(demand_left[target], supply_left[path[-1][0]])
+        for position, (station, client) in enumerate(path):
+            if position % 2:
+                amount = min(amount, flow[station, client])
+
+        for position, (station, client) in enumerate(path):
+            flow[station, client] += -amount if position % 2 else amount
+        supply_left[path[-1][0]] -= amount
+        demand_left[target] -= amount
+
+    return flow
+
+
+class SourcingOptimizer:
+    """
+    Profit-maximising client → Mother Station assignment under capacities.
+
+    Attributes:
+        defaults (dict): trip_data values shared by every route
+        stations (list): Station dicts with name, capacity (scm) and inputs
+        clients (list): Client dicts with name, demand (scm) and inputs
+        routes (dict): (station, client) -> route inputs
+    """
+
+    def __init__(self, defaults: Mapping[str, Any], stations: List[Mapping[str, Any]],
+                 clients: List[Mapping[str, Any]], routes: List[Mapping[str, Any]]):
+        """
+        Initialize the optimizer.
+
+        Args:
+            defaults (Mapping): trip_data values shared by every route
+            stations (list): [{'name', 'capacity', ...station inputs}]
+            clients (list): [{'name', 'demand', ...client inputs}]
+            routes (list): [{'mother_station', 'daughter_station', ...route inputs}]
+        """
+        self.defaults = dict(defaults)
+        self.stations = [dict(station) for station in stations]
+        self.clients = [dict(client) for client in clients]
+        self.routes = {
+            (route['mother_station'], route['daughter_station']):
+                {key: value for key, value in route.items() if key not in ('mother_station', 'daughter_station')}
+            for route in routes
+        }
+
+    @classmethod
+    def from_file(cls, config_file: str = 'sourcing.json') -> 'SourcingOptimizer':
+        """
+        Load stations, clients and routes from a JSON file.
+
+        Route metrics missing from the file are filled from a saved route
+        index when 'route_index' names one (see route_index.py).
+
+        Args:
+            config_file (str): Path to the sourcing configuration
+
+        Returns:
+            SourcingOptimizer: Configured optimizer
+        """
+        with open(config_file, 'r') as f:
+            config = json.load(f)
+
+        routes = config.get('routes', [])
+        if config.get('route_index'):
+            from route_index import RouteIndex
+            index = RouteIndex.load(config['route_index'])
+            for route in routes:
+                summary = index.lookup(route['mother_station'], route['daughter_station'])
+                for field in ROUTE_FIELDS:
+                    if field not in route and summary and summary[field]['count']:
+                        route[field] = summary[field]['mean']
+
+        return cls(config['defaults'], config['stations'], config['clients'], routes)
+
+    def optimize(self, require_full_demand: bool = False,
+                 calculator: Optional[ProfitabilityCalculator] = None) -> Dict[str, Any]:
+        """
+        Solve the assignment.
+
+        Args:
+            require_full_demand (bool): Serve all demand capacity allows, even
+                at a loss
+            calculator (ProfitabilityCalculator): Calculator to use (optional)
+
+        Returns:
+            dict: assignments (station, client, volume, trips, profit_per_scm,
+                profit), total_profit, volume_served, unserved demand per
+                client, station utilization and solve_ms
+        """
+        import numpy as np
+
+        started = time.perf_counter()
+        profit_per_scm = route_profit_per_scm(self.defaults, self.stations, self.clients, self.routes, calculator)
+        cost = np.where(np.isnan(profit_per_scm), np.inf, -profit_per_scm)
+        supply = np.array([station['capacity'] for station in self.stations], dtype=np.float64)
+        demand = np.array([client['demand'] for client in self.clients], dtype=np.float64)
+
+        flow = solve_min_cost_flow(cost, supply, demand, require_full_demand)
+        solve_ms = (time.perf_counter() - started) * 1000
+
+        assignments = []
+        for i, j in zip(*np.nonzero(flow > _EPSILON)):
+            volume = float(flow[i, j])
+            trip = route_trip(self.defaults, self.stations[i], self.clients[j],
+                              self.routes[(self.stations[i]['name'], self.clients[j]['name'])])
+            assignments.append({
+                'mother_station': self.stations[i]['name'],
+                'daughter_station': self.clients[j]['name'],
+                'volume': round(volume, 2),
+                'trips': round(volume / trip['gas_volume'], 2),
+                'profit_per_scm': round(float(profit_per_scm[i, j]), 4),
+                'profit': round(volume * float(profit_per_scm[i, j]), 2),
+            })
+        assignments.sort(key=lambda item: (item['daughter_station'], -item['volume']))
+
+        served = flow.sum(axis=0)
+        used = flow.sum(axis=1)
+        return {
+            'assignments': assignments,
+            'total_profit': round(sum(item['profit'] for item in assignments), 2),
+            'volume_served': round(float(served.sum()), 2),
+            'unserved': {client['name']: round(float(client['demand'] - served[j]), 2)
+                         for j, client in enumerate(self.clients) if client['demand'] - served[j] > 0.005},
+            'station_utilization_percent': {
+                station['name']: round(float(used[i] / station['capacity'] * 100), 2) if station['capacity'] else 0
+                for i, station in enumerate(self.stations)
+            },
+            'solve_ms': round(solve_ms, 2),
+        }
+
+
+def main():
+    """
+    Print the optimal sourcing plan for sourcing.json.
+    """
+    parser = argparse.ArgumentParser(description="Profit-maximising client sourcing under station capacities")
+    parser.add_argument('config_file', nargs='?', default='sourcing.json')
+    parser.add_argument('--require-full-demand', action='store_true',
+                        help="Serve all demand capacity allows, even on loss-making routes")
+    args = parser.parse_args()
+
+    optimizer = SourcingOptimizer.from_file(args.config_file)
+    plan = optimizer.optimize(args.require_full_demand)
+
+    print("PowerGas Sourcing Optimizer")
+    print("="*80)
+    print(f"{'Client':<24}{'Mother Station':<16}{'Volume (scm)':>14}{'Trips':>8}{'NGN/scm':>9}{'Profit (NGN)':>18}")
+    print("-"*89)
+    for item in plan['assignments']:
+        print(f"{item['daughter_station']:<24}{item['mother_station']:<16}{item['volume']:>14,.0f}"
+              f"{item['trips']:>8,.1f}{item['profit_per_scm']:>9,.2f}{item['profit']:>18,.2f}")
+
+    print(f"\nTotal Profit:   NGN {plan['total_profit']:,.2f}")
+    print(f"Volume Served:  {plan['volume_served']:,.0f} scm")
+    for client, volume in plan['unserved'].items():
+        print(f"Unserved:       {client} {volume:,.0f} scm")
+    print("Station utilization: " + ", ".join(f"{name} {value:.1f}%"
+                                              for name, value in plan['station_utilization_percent'].items()))
+    print(f"Solved in {plan['solve_ms']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
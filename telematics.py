@@ -0,0 +1,562 @@
+"""
+PowerGas Telematics Trip Derivation (Phase 5: Using trip data as input)
+
+TTAT and RTD are sensor-tracked: every truck reports GPS pings. This module
+streams raw ping logs, segments each truck's track into trips and derives the
+trip inputs the profitability formula needs, then feeds them straight into
+calculate_batch().
+
+Input: one ping per CSV row/JSONL line with
+    truck_id     Truck identifier
+    timestamp    Epoch seconds or ISO-8601 UTC time (2025-12-01T06:00:00)
+    latitude     Degrees
+    longitude    Degrees
+
+Pings must be in time order for each truck; trucks may be interleaved.
+
+Trips are cut on Mother Station geofence arrivals:
+
+    arrive MS ──wait──> leave MS ──> Daughter Station ──> arrive MS (next trip)
+    |<- mother_station_wait_time ->|<----- truck_turnaround_time ------>|
+                                   |<------ round_trip_distance ------->|
+
+A return to a Mother Station without visiting a Daughter Station (yard move,
+refuelling) does not end the trip. Distances are summed haversine steps; steps
+implying more than max_speed_kmh are GPS jumps and count as zero. Pings of a
+trip still in progress are carried into the next chunk, so memory stays flat
+and every per-ping step (geofencing, distances, segmentation) is vectorized.
+
+Skid turnaround time is not observable from truck pings and comes from the
+rate defaults. Trips are calculated with the 'mother_station_wait' cost model
+so the derived wait time is charged; with PRMS dispensing records (see
+prms_join.py) GVD replaces GV where a record matches.
+
+Usage:
+    python telematics.py pings.csv trip_results.csv --config telematics.json
+    python telematics.py pings.csv trip_results.csv --dispensing dispensing.csv
+"""
+
+import argparse
+import csv
+import json
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence
+
+from profitability_calculator import (
+    ProfitabilityCalculator,
+    get_calculator,
+    TRIP_INPUT_FIELDS,
+    BATCH_RESULT_FIELDS,
+)
+from trip_ingest import detect_format, iter_records
+
+
+PING_FIELDS = ('truck_id', 'timestamp', 'latitude', 'longitude')
+
+# Columns of every derived trip, in output order
+TRIP_FIELDS = (
+    'trip_id', 'truck_id', 'mother_station', 'daughter_station', 'return_mother_station',
+    'trip_date', 'departure_time', 'return_time',
+    'truck_turnaround_time', 'round_trip_distance', 'mother_station_wait_time', 'pings',
+)
+
+DEFAULT_CHUNK_SIZE = 200000
+
+DEFAULT_MAX_SPEED_KMH = 150.0
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1: Any, lon1: Any, lat2: Any, lon2: Any) -> Any:
+    """
+    Great-circle distance in km between coordinate arrays (broadcasting).
+
+    Args:
+        lat1, lon1 (numpy.ndarray): First points in degrees
+        lat2, lon2 (numpy.ndarray): Second points in degrees
+
+    Returns:
+        numpy.ndarray: Distances in km
+    """
+    import numpy as np
+
+    lat1, lon1, lat2, lon2 = (np.radians(values) for values in (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def parse_timestamps(values: Sequence[Any]) -> Any:
+    """
+    Convert timestamps to epoch seconds.
+
+    Args:
+        values (sequence): Epoch seconds or ISO-8601 UTC strings
+
+    Returns:
+        numpy.ndarray: float64 epoch seconds
+    """
+    import numpy as np
+
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except ValueError:
+        pass
+    text = np.char.rstrip(np.asarray(values, dtype=str), 'Z')
+    return text.astype('datetime64[s]').astype(np.int64).astype(np.float64)
+
+
+def _format_times(seconds: Any) -> List[str]:
+    import numpy as np
+
+    return np.datetime_as_string(seconds.astype(np.int64).astype('datetime64[s]')).tolist()
+
+
+def read_ping_chunks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                     fmt: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Stream a ping log as fixed-size columnar chunks.
+
+    Args:
+        path (str): CSV or JSONL ping log
+        chunk_size (int): Pings per chunk
+        fmt (str): 'csv' or 'jsonl' (detected from the extension if omitted)
+
+    Yields:
+        dict: truck_id (object array), timestamp (epoch seconds), latitude
+            and longitude arrays
+    """
+    import numpy as np
+
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+
+    def columns(rows):
+        trucks, times, lats, lons = rows
+        try:
+            return {'truck_id': np.asarray(trucks, dtype=object),
+                    'timestamp': parse_timestamps(times),
+                    'latitude': np.asarray(lats, dtype=np.float64),
+                    'longitude': np.asarray(lons, dtype=np.float64)}
+        except ValueError as e:
+            raise ValueError(f"{path}: invalid ping value ({e})") from None
+
+    rows = ([], [], [], [])
+    for line_number, record in enumerate(iter_records(path, fmt or detect_format(path)), 1):
+        try:
+            for column, field in zip(rows, PING_FIELDS):
+                column.append(record[field])
+        except KeyError as e:
+            raise KeyError(f"{path}:{line_number}: missing required field {e}") from None
+
+        if len(rows[0]) == chunk_size:
+            yield columns(rows)
+            rows = ([], [], [], [])
+
+    if rows[0]:
+        yield columns(rows)
+
+
+class Geofences:
+    """
+    Circular Mother/Daughter Station geofences.
+
+    Attributes:
+        names (list): Geofence names (Mother and Daughter Station names)
+        is_mother (numpy.ndarray): True for Mother Stations, with a trailing
+            False entry so zone code -1 (outside every geofence) indexes it
+        is_daughter (numpy.ndarray): True for Daughter Stations, same layout
+        rates (list): Per-geofence trip_data overrides (e.g. gas_cost for a
+            Mother Station, gas_price for a client)
+    """
+
+    def __init__(self, geofences: Sequence[Mapping[str, Any]], fields: Sequence[str] = TRIP_INPUT_FIELDS):
+        """
+        Initialize from geofence definitions.
+
+        Args:
+            geofences (sequence): [{'name', 'kind' ('mother' or 'daughter'),
+                'latitude', 'longitude', 'radius_km', ...trip_data overrides}]
+            fields (sequence): trip_data fields kept as overrides (e.g. the
+                calculator's CostModel.fields)
+        """
+        import numpy as np
+
+        for geofence in geofences:
+            if geofence['kind'] not in ('mother', 'daughter'):
+                raise ValueError(f"Geofence {geofence['name']}: kind must be 'mother' or 'daughter'")
+
+        self.names = [geofence['name'] for geofence in geofences]
+        self.latitude = np.array([geofence['latitude'] for geofence in geofences], dtype=np.float64)
+        self.longitude = np.array([geofence['longitude'] for geofence in geofences], dtype=np.float64)
+        self.radius = np.array([geofence['radius_km'] for geofence in geofences], dtype=np.float64)
+        self.is_mother = np.array([geofence['kind'] == 'mother' for geofence in geofences] + [False])
+        self.is_daughter = np.array([geofence['kind'] == 'daughter' for geofence in geofences] + [False])
+        self.rates = [{key: value for key, value in geofence.items() if key in fields}
+                      for geofence in geofences]
+
+    def locate(self, latitude: Any, longitude: Any) -> Any:
+        """
+        Geofence containing each point.
+
+        Overlapping geofences resolve to the one the point is deepest inside.
+
+        Args:
+            latitude (numpy.ndarray): Point latitudes
+            longitude (numpy.ndarray): Point longitudes
+
+        Returns:
+            numpy.ndarray: Geofence index per point, -1 outside every geofence
+        """
+        import numpy as np
+
+        if not self.names:
+            return np.full(len(latitude), -1)
+        ratio = haversine_km(latitude[:, None], longitude[:, None],
+                             self.latitude[None, :], self.longitude[None, :]) / self.radius[None, :]
+        zone = ratio.argmin(axis=1)
+        return np.where(ratio[np.arange(len(zone)), zone] <= 1.0, zone, -1)
+
+
+class TripSegmenter:
+    """
+    Incremental trip segmentation of interleaved truck ping streams.
+
+    Attributes:
+        geofences (Geofences): Station geofences
+        max_speed_kmh (float): Steps implying a higher speed are GPS jumps
+    """
+
+    def __init__(self, geofences: Geofences, max_speed_kmh: float = DEFAULT_MAX_SPEED_KMH):
+        """
+        Initialize the segmenter.
+
+        Args:
+            geofences (Geofences): Station geofences
+            max_speed_kmh (float): Speed above which a step is discarded
+        """
+        self.geofences = geofences
+        self.max_speed_kmh = max_speed_kmh
+        self._carry: Dict[Any, Dict[str, Any]] = {}
+
+    @property
+    def open_trips(self) -> int:
+        """Number of trucks with a trip still in progress."""
+        return sum(1 for pings in self._carry.values() if self.geofences.is_mother[pings['zone'][0]])
+
+    def add(self, pings: Mapping[str, Any]) -> Dict[str, Any]:
+        """
+        Add a chunk of pings and return the trips it completes.
+
+        Args:
+            pings (Mapping): Columnar pings (see read_ping_chunks)
+
+        Returns:
+            dict: TRIP_FIELDS columns (NumPy arrays / lists) plus
+                mother_zone and daughter_zone geofence codes
+        """
+        import numpy as np
+        from profitability_matrix import factorize
+
+        trucks, codes = factorize(pings['truck_id'])
+        time = np.asarray(pings['timestamp'], dtype=np.float64)
+        order = np.lexsort((time, codes))
+        starts = np.flatnonzero(np.diff(codes[order], prepend=-1))
+        bounds = np.append(starts, len(order))
+
+        columns = {'time': time[order],
+                   'latitude': np.asarray(pings['latitude'], dtype=np.float64)[order],
+                   'longitude': np.asarray(pings['longitude'], dtype=np.float64)[order]}
+        columns['zone'] = self.geofences.locate(columns['latitude'], columns['longitude'])
+
+        parts = []
+        for position, start in enumerate(starts.tolist()):
+            truck = trucks[codes[order[start]]]
+            track = {name: values[start:bounds[position + 1]] for name, values in columns.items()}
+            carried = self._carry.get(truck)
+            if carried is not None:
+                track = {name: np.concatenate((carried[name], values)) for name, values in track.items()}
+            trips = self._segment(truck, track)
+            if trips is not None:
+                parts.append(trips)
+
+        return self._combine(parts)
+
+    def _segment(self, truck: Any, track: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Cut one truck's track into completed trips and carry the open remainder."""
+        import numpy as np
+
+        geofences = self.geofences
+        time, zone = track['time'], track['zone']
+        at_mother = geofences.is_mother[zone]
+        at_daughter = geofences.is_daughter[zone]
+
+        step = haversine_km(track['latitude'][:-1], track['longitude'][:-1],
+                            track['latitude'][1:], track['longitude'][1:])
+        elapsed = np.diff(time)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            jump = (elapsed <= 0) | (step / (elapsed / 3600) > self.max_speed_kmh)
+        distance = np.concatenate(([0.0], np.cumsum(np.where(jump, 0.0, step))))
+
+        # Trips are cut at Mother Station arrivals with a Daughter Station
+        # visit since the previous arrival
+        arrivals = np.flatnonzero(at_mother & ~np.concatenate(([False], at_mother[:-1])))
+        delivered = np.cumsum(at_daughter)[arrivals]
+        cuts = arrivals[np.concatenate(([True], np.diff(delivered) > 0))] if len(arrivals) else arrivals
+
+        # Carry the open trip (from the last cut), or only the last ping
+        keep_from = int(cuts[-1]) if len(cuts) else len(time) - 1
+        self._carry[truck] = {name: values[keep_from:].copy() for name, values in track.items()}
+        if len(cuts) < 2:
+            return None
+
+        start, end = cuts[:-1], cuts[1:]
+        leaves = np.flatnonzero(at_mother[:-1] & ~at_mother[1:]) + 1
+        departure = leaves[np.searchsorted(leaves, start, side='right')]
+        daughter_pings = np.flatnonzero(at_daughter)
+        first_daughter = daughter_pings[np.searchsorted(daughter_pings, start)]
+
+        return {
+            'truck_id': np.full(len(start), truck, dtype=object),
+            'mother_zone': zone[start],
+            'daughter_zone': zone[first_daughter],
+            'return_zone': zone[end],
+            'arrival': time[start],
+            'departure': time[departure],
+            'return': time[end],
+            'round_trip_distance': distance[end] - distance[departure - 1],
+            'pings': end - start,
+        }
+
+    def _combine(self, parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Concatenate per-truck trips into TRIP_FIELDS columns."""
+        import numpy as np
+
+        if parts:
+            raw = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+        else:
+            raw = {name: np.empty(0, dtype=object if name == 'truck_id' else np.float64)
+                   for name in ('truck_id', 'mother_zone', 'daughter_zone', 'return_zone',
+                                'arrival', 'departure', 'return', 'round_trip_distance', 'pings')}
+            for name in ('mother_zone', 'daughter_zone', 'return_zone', 'pings'):
+                raw[name] = raw[name].astype(np.int64)
+
+        names = np.array(self.geofences.names + [''], dtype=object)
+        departure_time = _format_times(raw['departure'])
+        return {
+            'trip_id': [f"{truck}-{departed}" for truck, departed in zip(raw['truck_id'].tolist(), departure_time)],
+            'truck_id': raw['truck_id'],
+            'mother_station': names[raw['mother_zone']],
+            'daughter_station': names[raw['daughter_zone']],
+            'return_mother_station': names[raw['return_zone']],
+            'trip_date': [departed[:10] for departed in departure_time],
+            'departure_time': departure_time,
+            'return_time': _format_times(raw['return']),
+            'truck_turnaround_time': (raw['return'] - raw['departure']) / 3600,
+            'round_trip_distance': raw['round_trip_distance'],
+            'mother_station_wait_time': (raw['departure'] - raw['arrival']) / 3600,
+            'pings': raw['pings'],
+            'mother_zone': raw['mother_zone'],
+            'daughter_zone': raw['daughter_zone'],
+        }
+
+
+def derive_trips(path: str, geofences: Geofences, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 max_speed_kmh: float = DEFAULT_MAX_SPEED_KMH) -> Iterator[Dict[str, Any]]:
+    """
+    Stream a ping log and yield the trips completed by each chunk.
+
+    Trips still in progress at the end of the log are not yielded.
+
+    Args:
+        path (str): CSV or JSONL ping log
+        geofences (Geofences): Station geofences
+        chunk_size (int): Pings per chunk
+        max_speed_kmh (float): Speed above which a step is a GPS jump
+
+    Yields:
+        dict: Trip columns (see TripSegmenter.add), skipping empty chunks
+    """
+    segmenter = TripSegmenter(geofences, max_speed_kmh)
+    for pings in read_ping_chunks(path, chunk_size):
+        trips = segmenter.add(pings)
+        if len(trips['pings']):
+            yield trips
+
+
+def trip_inputs(trips: Mapping[str, Any], geofences: Geofences,
+                defaults: Mapping[str, Any], fields: Sequence[str] = TRIP_INPUT_FIELDS) -> Dict[str, Any]:
+    """
+    Build calculate_batch() input columns for derived trips.
+
+    Values are layered defaults < Mother Station < Daughter Station <
+    derived TTAT/RTD/wait time. A rate set only on some geofences needs a
+    default for trips at the other stations.
+
+    Args:
+        trips (Mapping): Derived trip columns (see TripSegmenter.add)
+        geofences (Geofences): Geofences the trips were derived with
+        defaults (Mapping): trip_data rates shared by every trip
+        fields (sequence): trip_data fields taken from defaults (e.g. the
+            calculator's CostModel.fields)
+
+    Returns:
+        dict: Columnar trip data for calculate_batch
+
+    Raises:
+        KeyError: A geofence rate has no default and some trips lack it
+    """
+    import numpy as np
+
+    size = len(trips['pings'])
+    columns = {field: np.full(size, float(value)) for field, value in defaults.items() if field in fields}
+    for zone_field in ('mother_zone', 'daughter_zone'):
+        for zone, rates in enumerate(geofences.rates):
+            if not rates:
+                continue
+            mask = trips[zone_field] == zone
+            if mask.any():
+                for field, value in rates.items():
+                    columns.setdefault(field, np.full(size, np.nan))[mask] = float(value)
+
+    for field, values in columns.items():
+        if field not in defaults and np.isnan(values).any():
+            raise KeyError(f"{field} is set by some geofences but has no value in 'defaults' "
+                           f"for {int(np.isnan(values).sum())} trips at other stations")
+
+    for field in ('truck_turnaround_time', 'round_trip_distance', 'mother_station_wait_time'):
+        columns[field] = np.asarray(trips[field], dtype=np.float64)
+    for field in ('trip_id', 'mother_station', 'daughter_station'):
+        columns[field] = trips[field]
+    return columns
+
+
+def process_ping_log(input_path: str, output_path: str, config_file: str = 'telematics.json',
+                     chunk_size: int = DEFAULT_CHUNK_SIZE,
+                     calculator: Optional[ProfitabilityCalculator] = None,
+                     dispensing: Optional[Any] = None) -> Dict[str, Any]:
+    """
+    Derive trips from a ping log, calculate their profitability and write them.
+
+    With a PRMS dispensing index, each trip's gas_volume_dispensed (GVD) is
+    matched and written out, and GV is used only for unmatched trips.
+
+    Args:
+        input_path (str): CSV or JSONL ping log
+        output_path (str): CSV or JSONL results file (format from extension)
+        config_file (str): Geofences and rate defaults (see telematics.json)
+        chunk_size (int): Pings per chunk
+        calculator (ProfitabilityCalculator): Calculator to use (optional;
+            defaults to the mother_station_wait model, or
+            gvd_mother_station_wait with dispensing)
+        dispensing (DispensingIndex): PRMS dispensing records (optional, see
+            prms_join.py)
+
+    Returns:
+        dict: Run summary with trip count, profit totals, average
+            TTAT/RTD/wait time and, with dispensing, the GVD match rates
+    """
+    if calculator is None:
+        calculator = get_calculator('gvd_mother_station_wait' if dispensing is not None else 'mother_station_wait')
+
+    with open(config_file, 'r') as f:
+        config = json.load(f)
+    geofences = Geofences(config['geofences'], calculator.cost_model.fields)
+    max_speed_kmh = config.get('max_speed_kmh', DEFAULT_MAX_SPEED_KMH)
+
+    summary = {
+        'trips': 0,
+        'total_revenue': 0.0,
+        'total_costs': 0.0,
+        'total_profit': 0.0,
+        'loss_making_trips': 0,
+        'truck_turnaround_time': 0.0,
+        'round_trip_distance': 0.0,
+        'mother_station_wait_time': 0.0,
+    }
+    trip_fields = TRIP_FIELDS + (('gas_volume_dispensed',) if dispensing is not None else ())
+    fields = trip_fields + BATCH_RESULT_FIELDS
+
+    with open(output_path, 'w', newline='') as f:
+        fmt = detect_format(output_path)
+        if fmt == 'csv':
+            writer = csv.writer(f)
+            writer.writerow(fields)
+
+        for trips in derive_trips(input_path, geofences, chunk_size, max_speed_kmh):
+            inputs = trip_inputs(trips, geofences, config.get('defaults', {}), calculator.cost_model.fields)
+            if dispensing is not None:
+                matched = dispensing.match(trips['truck_id'], trips['daughter_station'],
+                                           trips['departure_time'], trips['return_time'])
+                inputs['gas_volume_dispensed'] = matched['gas_volume_dispensed']
+                trips['gas_volume_dispensed'] = [None if volume != volume else volume
+                                                 for volume in matched['gas_volume_dispensed'].tolist()]
+            results = calculator.calculate_batch(inputs)
+            values = [trips[field].tolist() if hasattr(trips[field], 'tolist') else trips[field]
+                      for field in trip_fields]
+            values += [results[field].tolist() for field in BATCH_RESULT_FIELDS]
+            if fmt == 'csv':
+                writer.writerows(zip(*values))
+            else:
+                f.writelines(json.dumps(dict(zip(fields, row))) + '\n' for row in zip(*values))
+
+            summary['trips'] += len(results['profit'])
+            summary['total_revenue'] += float(results['revenue'].sum())
+            summary['total_costs'] += float(results['total_costs'].sum())
+            summary['total_profit'] += float(results['profit'].sum())
+            summary['loss_making_trips'] += int((results['profit'] < 0).sum())
+            for field in ('truck_turnaround_time', 'round_trip_distance', 'mother_station_wait_time'):
+                summary[field] += float(trips[field].sum())
+
+    for field in ('truck_turnaround_time', 'round_trip_distance', 'mother_station_wait_time'):
+        summary[field] = round(summary[field] / summary['trips'], 2) if summary['trips'] else 0.0
+    for key in ('total_revenue', 'total_costs', 'total_profit'):
+        summary[key] = round(summary[key], 2)
+    if dispensing is not None:
+        summary['dispensing'] = dispensing.match_summary()
+
+    return summary
+
+
+def main():
+    """
+    Command-line entry point for ping log processing.
+    """
+    parser = argparse.ArgumentParser(description="Derive trips from GPS pings and calculate their profitability")
+    parser.add_argument('input', help="Ping log (.csv or .jsonl)")
+    parser.add_argument('output', help="Trip results file (.csv or .jsonl)")
+    parser.add_argument('--config', default='telematics.json', help="Geofences and rate defaults")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Pings per processing chunk (default: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument('--dispensing', help="PRMS dispensing records to match for GVD (.csv or .jsonl)")
+    parser.add_argument('--cost-model',
+                        help="Cost model (default charges the derived Mother Station wait time, "
+                             "on GVD when --dispensing is given)")
+    args = parser.parse_args()
+
+    print("PowerGas Telematics Trip Derivation")
+    print("="*80)
+
+    dispensing = None
+    if args.dispensing:
+        from prms_join import DispensingIndex
+        dispensing = DispensingIndex.from_file(args.dispensing)
+    calculator = get_calculator(args.cost_model) if args.cost_model else None
+    summary = process_ping_log(args.input, args.output, args.config, args.chunk_size, calculator, dispensing)
+
+    print(f"Trips derived:     {summary['trips']:,}")
+    print(f"Average TTAT:      {summary['truck_turnaround_time']:,.2f} hours")
+    print(f"Average RTD:       {summary['round_trip_distance']:,.2f} km")
+    print(f"Average MS wait:   {summary['mother_station_wait_time']:,.2f} hours")
+    print(f"Total Revenue:     NGN {summary['total_revenue']:,.2f}")
+    print(f"Total Costs:       NGN {summary['total_costs']:,.2f}")
+    print(f"Total Profit:      NGN {summary['total_profit']:,.2f}")
+    print(f"Loss-making trips: {summary['loss_making_trips']:,}")
+    if dispensing is not None:
+        matched = summary['dispensing']
+        print(f"GVD matched:       {matched['matched_trips']:,} trips ({matched['trip_match_rate_percent']:.2f}%), "
+              f"{matched['matched_events']:,} of {matched['events']:,} PRMS records")
+    print(f"\nResults saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
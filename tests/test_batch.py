@@ -0,0 +1,52 @@
+import random
+
+import numpy as np
+
+from profitability_calculator import BATCH_RESULT_FIELDS, TRIP_INPUT_FIELDS, get_calculator, round2
+
+
+def _random_trips(count, seed):
+    rng = random.Random(seed)
+    trips = []
+    for number in range(count):
+        trip = {field: round(rng.uniform(0, 5000), rng.choice((0, 1, 2, 3))) for field in TRIP_INPUT_FIELDS}
+        trip['trip_id'] = f'T{number}'
+        trips.append(trip)
+    # Unprofitable and zero-revenue trips exercise the margin branch
+    trips[0]['gas_volume'] = 0
+    trips[1]['gas_price'] = 1
+    return trips
+
+
+def _flatten(result):
+    flat = dict(result, **result['costs_breakdown'])
+    return [flat[field] for field in BATCH_RESULT_FIELDS]
+
+
+def test_batch_matches_scalar_exactly():
+    calculator = get_calculator()
+    trips = _random_trips(2000, seed=7)
+
+    columns = calculator.trip_columns(trips)
+    results = calculator.calculate_batch(columns)
+
+    for position, trip in enumerate(trips):
+        batch = [results[field][position] for field in BATCH_RESULT_FIELDS]
+        assert batch == _flatten(calculator.calculate_trip_profit(trip)), trip['trip_id']
+
+
+def test_batch_accepts_plain_lists():
+    calculator = get_calculator()
+    trips = _random_trips(5, seed=1)
+
+    columns = {field: [trip[field] for trip in trips] for field in TRIP_INPUT_FIELDS}
+    results = calculator.calculate_batch(columns)
+    assert results['profit'].tolist() == [calculator.calculate_trip_profit(trip)['profit'] for trip in trips]
+
+
+def test_round2_matches_python_round_on_half_cents():
+    rng = random.Random(3)
+    values = [rng.randrange(-10 ** 9, 10 ** 9) / 1000 + 0.005 for _ in range(5000)]
+    values += [0.125, 2.675, 1.005, -0.125, 1e12 + 0.005]
+
+    assert round2(np.array(values)).tolist() == [round(value, 2) for value in values]
@@ -0,0 +1,78 @@
+import json
+import os
+import random
+
+import pytest
+
+from contractor_tariffs import TariffTable
+from profitability_calculator import BATCH_RESULT_FIELDS
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _table():
+    return TariffTable({
+        'Diadem': {'basis': 'km', 'fixed_bands': [{'from': 0, 'rate': 180}],
+                   'variable_bands': [{'from': 0, 'rate': 0}, {'from': 200, 'rate': 45}, {'from': 500, 'rate': 35}]},
+        'IMI': {'basis': 'day', 'fixed_bands': [{'from': 0, 'rate': 45000}, {'from': 3, 'rate': 40000}],
+                'variable_bands': [{'from': 0, 'rate': 0}, {'from': 300, 'rate': 45}]},
+    }, default_contractor='Diadem')
+
+
+def _trip(**overrides):
+    with open(os.path.join(ROOT, 'config.json')) as f:
+        trip = json.load(f)['trip_data']
+    # Tariff trips carry no FTC/VTC
+    del trip['fixed_trucking_cost'], trip['variable_trucking_cost']
+    trip.update(overrides)
+    return trip
+
+
+def test_bands_are_marginal():
+    table = _table()
+
+    diadem = table.trucking_split(_trip(contractor='Diadem', round_trip_distance=600))
+    assert diadem['trucking_fixed_costs'] == 180 * 600
+    assert diadem['trucking_variable_costs'] == 45 * 300 + 35 * 100
+
+    # 60 h -> 3 operation days, 450 km/day of which 150 beyond the threshold
+    imi = table.trucking_split(_trip(contractor='IMI', round_trip_distance=1350, truck_turnaround_time=60))
+    assert imi['trucking_fixed_costs'] == 45000 * 3
+    assert imi['trucking_variable_costs'] == 3 * 45 * 150
+
+
+def test_batch_matches_scalar():
+    table = _table()
+    rng = random.Random(23)
+    trips = [_trip(contractor=rng.choice(['Diadem', 'IMI', None]),
+                   round_trip_distance=rng.uniform(0, 1500),
+                   truck_turnaround_time=rng.uniform(1, 120),
+                   **({'operation_days': rng.randint(1, 6)} if rng.random() < 0.3 else {}))
+             for _ in range(500)]
+
+    results = table.calculate_batch(table.trip_columns(trips))
+    for position, trip in enumerate(trips):
+        expected = table.calculate_trip_profit(trip)
+        flat = dict(expected, **expected['costs_breakdown'])
+        for field in BATCH_RESULT_FIELDS + ('trucking_fixed_costs', 'trucking_variable_costs'):
+            assert results[field][position] == flat[field]
+        assert table.contractors[results['contractor_code'][position]] == expected['contractor']
+
+
+def test_contractor_summary_totals():
+    table = _table()
+    trips = [_trip(contractor='IMI'), _trip(contractor='Diadem'), _trip()]
+
+    results = table.calculate_batch(table.trip_columns(trips))
+    summary = table.contractor_summary(results)
+    assert summary['Diadem']['trips'] == 2
+    assert summary['IMI']['trips'] == 1
+    assert summary['Diadem']['trucking_costs'] == pytest.approx(results['trucking_costs'][1:].sum())
+
+
+def test_unknown_contractor_and_bad_bands_are_rejected():
+    with pytest.raises(KeyError, match='Acme'):
+        _table().trucking_split(_trip(contractor='Acme'))
+    with pytest.raises(ValueError, match='increase'):
+        TariffTable({'X': {'fixed_bands': [{'from': 0, 'rate': 1}, {'from': 0, 'rate': 2}]}})
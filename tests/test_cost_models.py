@@ -0,0 +1,89 @@
+import json
+import os
+
+import pytest
+
+from cost_models import list_cost_models
+from profitability_calculator import BATCH_RESULT_FIELDS, get_calculator
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _config_trip():
+    with open(os.path.join(ROOT, 'config.json')) as f:
+        return json.load(f)['trip_data']
+
+
+def _model_trips(model):
+    # Every field the model reads, plus one trip leaving each default to apply
+    full = dict(_config_trip())
+    for offset, field in enumerate(model.fields):
+        full.setdefault(field, 1.5 + offset)
+    sparse = {field: value for field, value in full.items() if field not in model.defaults}
+    return [full, sparse]
+
+
+def _flatten(result):
+    flat = dict(result, **result['costs_breakdown'])
+    return [flat[field] for field in BATCH_RESULT_FIELDS]
+
+
+@pytest.mark.parametrize('name', list(list_cost_models()))
+def test_batch_matches_scalar_for_every_model(name):
+    calculator = get_calculator(name)
+    trips = _model_trips(calculator.cost_model)
+
+    results = calculator.calculate_batch(calculator.trip_columns(trips))
+    for position, trip in enumerate(trips):
+        batch = [results[field][position] for field in BATCH_RESULT_FIELDS]
+        assert batch == _flatten(calculator.calculate_trip_profit(trip))
+
+
+def test_contractor_tariff_falls_back_to_per_km_rate():
+    calculator = get_calculator('contractor_tariff')
+    trip = _config_trip()
+
+    results = calculator.calculate_batch(calculator.trip_columns([trip]))
+    assert results['trucking_costs'].tolist() == [(180 + 45) * 240]
+    assert results['profit'].tolist() == [calculator.calculate_trip_profit(trip)['profit']]
+
+
+def test_missing_required_field_is_reported():
+    calculator = get_calculator('contractor_tariff')
+    trip = _config_trip()
+    del trip['fixed_trucking_cost']
+
+    with pytest.raises(KeyError, match='fixed_trucking_cost'):
+        calculator.trip_columns([trip])
+
+
+def test_fields_read_only_by_defaults_are_needed_only_where_the_default_applies():
+    calculator = get_calculator('contractor_tariff')
+    trip = _config_trip()
+    del trip['fixed_trucking_cost'], trip['variable_trucking_cost']
+    trips = [dict(trip, contractor_trucking_costs=50000.0), dict(_config_trip())]
+
+    results = calculator.calculate_batch(calculator.trip_columns(trips))
+    assert results['trucking_costs'].tolist() == [50000.0, (180 + 45) * 240]
+
+    with pytest.raises(KeyError, match='fixed_trucking_cost'):
+        calculator.trip_columns([trip])
+
+
+def test_component_helpers_agree_with_base_model():
+    calculator = get_calculator()
+    trip = _config_trip()
+    values = calculator.cost_model.evaluate(trip)
+
+    assert calculator.calculate_revenue(trip['gas_volume'], trip['gas_price']) == values['revenue']
+    assert calculator.calculate_production_costs(
+        trip['gas_volume'], trip['gas_cost'], trip['plant_cost'], trip['ga_cost']) == values['production_costs']
+    assert calculator.calculate_truck_expenses(
+        trip['truck_depreciation'], trip['truck_insurance'], trip['fuel_cost'],
+        trip['truck_turnaround_time']) == values['truck_expenses']
+    assert calculator.calculate_trucking_costs(
+        trip['fixed_trucking_cost'], trip['variable_trucking_cost'],
+        trip['round_trip_distance']) == values['trucking_costs']
+    assert calculator.calculate_skid_costs(
+        trip['skid_depreciation'], trip['skid_turnaround_time']) == values['skid_costs']
@@ -0,0 +1,94 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from counterfactual import Counterfactual
+from profitability_calculator import get_calculator
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ROUTES = {'Customer Location A': {'truck_turnaround_time': 20, 'skid_turnaround_time': 24,
+                                  'round_trip_distance': 400}}
+
+
+def _trips(rows):
+    with open(os.path.join(ROOT, 'config.json')) as f:
+        base = json.load(f)['trip_data']
+    trips = [dict(base, **row) for row in rows]
+    fields = ('mother_station', 'daughter_station', 'trip_date')
+    columns = {field: [trip[field] for trip in trips] for field in fields}
+    columns.update((field, np.array([trip[field] for trip in trips], dtype=np.float64))
+                   for field in get_calculator().cost_model.fields)
+    return trips, columns
+
+
+def test_trip_from_reference_station_saves_nothing():
+    trips, columns = _trips([{'mother_station': 'Ebedei', 'trip_date': '2025-01-03'}])
+    counterfactual = Counterfactual(ROUTES, 'Ebedei', {'gas_cost': 500})
+    evaluated = counterfactual.evaluate(columns)
+
+    assert evaluated['from_reference'].tolist() == [True]
+    assert evaluated['matched'].tolist() == [False]
+    for field in ('truck_hours_saved', 'skid_hours_saved', 'km_saved', 'ngn_saved'):
+        assert evaluated[field].tolist() == [0]
+
+    counterfactual.add(columns)
+    totals = counterfactual.summary()['totals']
+    assert (totals['trips'], totals['matched_trips'], totals['reference_trips']) == (1, 0, 1)
+    assert totals['ngn_saved'] == 0
+
+
+def test_unmatched_client_is_counted_without_savings():
+    trips, columns = _trips([{'mother_station': 'Ogbele', 'daughter_station': 'Nowhere', 'trip_date': '2025-01-03'}])
+    counterfactual = Counterfactual(ROUTES, 'Ebedei')
+    counterfactual.add(columns)
+
+    row = counterfactual.summary()['clients']['Nowhere']
+    assert (row['trips'], row['matched_trips'], row['reference_trips']) == (1, 0, 0)
+    for field in ('truck_hours_saved', 'skid_hours_saved', 'km_saved', 'ngn_saved',
+                  'actual_profit', 'reference_profit'):
+        assert row[field] == 0
+
+
+def test_matched_trip_is_repriced_from_reference_route():
+    trips, columns = _trips([{'mother_station': 'Ogbele', 'trip_date': '2025-01-03'}])
+    counterfactual = Counterfactual(ROUTES, 'Ebedei', {'gas_cost': 500})
+    evaluated = counterfactual.evaluate(columns)
+
+    calculator = get_calculator()
+    reference = dict(trips[0], gas_cost=500, **ROUTES['Customer Location A'])
+    assert evaluated['truck_hours_saved'][0] == 20 - trips[0]['truck_turnaround_time']
+    assert evaluated['km_saved'][0] == 400 - trips[0]['round_trip_distance']
+    assert evaluated['ngn_saved'][0] == pytest.approx(calculator.calculate_trip_profit(trips[0])['profit']
+                                                      - calculator.calculate_trip_profit(reference)['profit'])
+
+
+def test_monthly_sums_match_per_trip_savings():
+    rows = [
+        {'mother_station': 'Ogbele', 'trip_date': '2025-01-03', 'truck_turnaround_time': 8},
+        {'mother_station': 'Ikorodu', 'trip_date': '2025-01-20', 'round_trip_distance': 150},
+        {'mother_station': 'Ogbele', 'trip_date': '2025-02-11', 'skid_turnaround_time': 10},
+        {'mother_station': 'Ebedei', 'trip_date': '2025-02-12'},
+        {'mother_station': 'Ogbele', 'daughter_station': 'Nowhere', 'trip_date': '2025-02-15'},
+    ]
+    trips, columns = _trips(rows)
+    counterfactual = Counterfactual(ROUTES, 'Ebedei', {'gas_cost': 500})
+    evaluated = counterfactual.evaluate(columns)
+    counterfactual.add(columns)
+    months = counterfactual.summary()['months']
+
+    assert evaluated['matched'].tolist() == [True, True, True, False, False]
+    assert not evaluated['ngn_saved'][~evaluated['matched']].any()
+
+    assert sorted(months) == ['2025-01', '2025-02']
+    for month, row in months.items():
+        selected = np.array([trip['trip_date'][:7] == month for trip in trips]) & evaluated['matched']
+        assert row['trips'] == sum(trip['trip_date'][:7] == month for trip in trips)
+        assert row['matched_trips'] == int(selected.sum())
+        for field in ('truck_hours_saved', 'skid_hours_saved', 'km_saved', 'ngn_saved'):
+            assert row[field] == pytest.approx(float(evaluated[field][selected].sum()), abs=0.01), (month, field)
+    assert counterfactual.summary()['totals']['ngn_saved'] == pytest.approx(
+        float(evaluated['ngn_saved'][evaluated['matched']].sum()), abs=0.01)
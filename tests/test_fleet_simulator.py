@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+from fleet_simulator import FleetSimulator
+from profitability_calculator import get_calculator
+from sourcing_optimizer import SourcingOptimizer
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULTS = {'gas_volume': 5000, 'ga_cost': 80, 'truck_depreciation': 2500, 'truck_insurance': 1200,
+            'fuel_cost': 3500, 'fixed_trucking_cost': 180, 'variable_trucking_cost': 45, 'skid_depreciation': 800}
+
+PLAN = [{'mother_station': 'Ebedei', 'daughter_station': 'Client', 'share': 1}]
+
+
+def _simulator(horizon_hours, capacity=100000):
+    # Two deliveries of 5000 scm, released at 1/4 and 3/4 of the horizon
+    sourcing = SourcingOptimizer(
+        DEFAULTS,
+        [{'name': 'Ebedei', 'capacity': capacity, 'gas_cost': 450, 'plant_cost': 120}],
+        [{'name': 'Client', 'demand': 10000, 'gas_price': 850}],
+        [{'mother_station': 'Ebedei', 'daughter_station': 'Client', 'round_trip_distance': 240,
+          'truck_turnaround_time': 25, 'skid_turnaround_time': 25}],
+    )
+    return FleetSimulator(sourcing, {'Ebedei': {'trucks': 1, 'skids': 1}}, horizon_hours)
+
+
+def test_second_request_waits_for_the_only_truck():
+    # Requests at 10 h and 30 h; the truck and skid are back at 35 h
+    result = _simulator(40).simulate(PLAN)
+    totals = result['totals']
+
+    assert totals['trips_requested'] == 2
+    assert totals['trips_completed'] == 1
+    assert totals['backlog'] == 0
+    assert totals['truck_utilization_percent'] == 75.0
+    assert totals['skid_utilization_percent'] == 75.0
+    assert totals['average_request_wait_hours'] == 2.5
+    assert totals['truck_wait_hours'] == 0
+    assert totals['truck_idle_hours'] == 10.0
+    assert result['clients']['Client']['max_request_wait_hours'] == 5.0
+
+    trip = _simulator(40)._trip('Ebedei', 'Client')
+    expected = get_calculator('mother_station_wait').calculate_trip_profit(dict(trip, mother_station_wait_time=0))
+    assert totals['profit'] == pytest.approx(expected['profit'])
+    assert totals['capacity_violations'] == {}
+
+
+def test_request_left_in_backlog_at_horizon():
+    # Requests at 7.5 h and 22.5 h; the truck is still out when the month ends
+    result = _simulator(30).simulate(PLAN)
+    totals = result['totals']
+
+    assert totals['trips_completed'] == 0
+    assert totals['backlog'] == 1
+    assert result['stations']['Ebedei']['backlog'] == 1
+    assert totals['truck_utilization_percent'] == 75.0
+    assert totals['profit'] == 0
+
+
+def test_over_capacity_plan_is_flagged():
+    result = _simulator(40, capacity=6000).simulate(PLAN)
+    assert result['totals']['capacity_violations'] == {'Ebedei': 4000}
+    # The plan is still simulated in full
+    assert result['totals']['trips_requested'] == 2
+    assert result['stations']['Ebedei']['volume_requested'] == 10000
+
+
+def test_fleet_configuration_simulates_every_plan():
+    simulator = FleetSimulator.from_file(os.path.join(ROOT, 'fleet.json'))
+    results = simulator.compare(simulator.plans)
+    assert set(results) == set(simulator.plans)
+    for result in results.values():
+        totals = result['totals']
+        assert totals['trips_completed'] + totals['backlog'] <= totals['trips_requested']
@@ -0,0 +1,67 @@
+import json
+import os
+
+import pytest
+
+from jsonl_batch import calculate_lines, process_jsonl
+from profitability_calculator import get_calculator
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _config_trip(**overrides):
+    with open(os.path.join(ROOT, 'config.json')) as f:
+        trip = json.load(f)['trip_data']
+    trip.update(overrides)
+    return trip
+
+
+def _lines():
+    bad = _config_trip()
+    del bad['gas_price']
+    return [
+        json.dumps(_config_trip(trip_id='A')) + '\n',
+        json.dumps(bad) + '\n',
+        '{not json\n',
+        '\n',
+        json.dumps(_config_trip(trip_id='B', gas_price='high')) + '\n',
+        '[1, 2]\n',
+        json.dumps(_config_trip(trip_id='C', gas_volume=4000)) + '\n',
+    ]
+
+
+def test_errors_are_reported_in_line_order():
+    text, count, errors = calculate_lines('base', 10, _lines())
+
+    assert count == 2
+    assert [number for number, _ in errors] == [11, 12, 14, 15]
+    assert 'gas_price' in errors[0][1]
+
+    results = [json.loads(line) for line in text.splitlines()]
+    assert [result['trip_id'] for result in results] == ['A', 'C']
+    assert results[1] == get_calculator().calculate_trip_profit(_config_trip(trip_id='C', gas_volume=4000))
+
+
+@pytest.mark.parametrize('workers,ordered', [(1, True), (2, True), (2, False)])
+def test_process_jsonl_writes_every_valid_record(tmp_path, workers, ordered):
+    source = tmp_path / 'trips.jsonl'
+    source.write_text(''.join(_lines() * 5))
+
+    summary = process_jsonl(str(source), str(tmp_path / 'out.jsonl'), workers, ordered, chunk_size=3,
+                            error_path=str(tmp_path / 'errors.jsonl'))
+    assert (summary['records'], summary['results'], summary['errors']) == (30, 10, 20)
+
+    results = [json.loads(line) for line in (tmp_path / 'out.jsonl').read_text().splitlines()]
+    if ordered:
+        assert [result['trip_id'] for result in results] == ['A', 'C'] * 5
+    else:
+        assert sorted(result['line'] for result in results) == [1 + 7 * k + offset for k in range(5) for offset in (0, 6)]
+    errors = [json.loads(line)['line'] for line in (tmp_path / 'errors.jsonl').read_text().splitlines()]
+    assert sorted(errors) == [2 + 7 * k + offset for k in range(5) for offset in (0, 1, 3, 4)]
+
+
+def test_missing_input_leaves_no_output(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        process_jsonl(str(tmp_path / 'missing.jsonl'), str(tmp_path / 'out.jsonl'))
+    assert not (tmp_path / 'out.jsonl').exists()
@@ -0,0 +1,56 @@
+import json
+import os
+
+import pytest
+
+from monte_carlo import MonteCarloSimulator
+from profitability_calculator import get_calculator
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _base_trip(**extra):
+    with open(os.path.join(ROOT, 'simulation.json')) as f:
+        return dict(json.load(f)['base_trip'], **extra)
+
+
+def test_fixed_inputs_reproduce_the_deterministic_profit():
+    # A degenerate uniform distribution samples the base value every draw
+    simulator = MonteCarloSimulator(_base_trip(), {'gas_price': {'dist': 'uniform', 'low': 850, 'high': 850}})
+    summary = simulator.run(draws=1000, seed=1)
+
+    profit = get_calculator().calculate_trip_profit(_base_trip())['profit']
+    assert summary['profit_mean'] == profit
+    assert summary['profit_std'] == 0
+    assert summary['probability_of_loss'] == 0
+
+
+def test_results_are_reproducible_for_a_seed_and_chunk_size():
+    simulator = MonteCarloSimulator.from_file(os.path.join(ROOT, 'simulation.json'))
+
+    first = simulator.run(draws=20000, seed=7, chunk_size=5000)
+    assert simulator.run(draws=20000, seed=7, chunk_size=5000) == first
+    assert sum(first['variance_contribution_percent'].values()) == pytest.approx(100, abs=0.1)
+
+
+@pytest.mark.parametrize('model,extra,field,spec', [
+    ('fuel_per_km', {'fuel_cost_per_km': 60}, 'fuel_cost_per_km', {'dist': 'uniform', 'low': 40, 'high': 80}),
+    ('imi_per_day', {'included_km_per_day': 100}, 'operation_days', {'dist': 'uniform', 'low': 1, 'high': 3}),
+    ('mother_station_wait', {}, 'mother_station_wait_time', {'dist': 'uniform', 'low': 0, 'high': 4}),
+])
+def test_model_inputs_can_be_sampled(model, extra, field, spec):
+    calculator = get_calculator(model)
+    simulator = MonteCarloSimulator(_base_trip(**extra), {field: spec})
+    summary = simulator.run(draws=5000, seed=3, calculator=calculator)
+
+    at_low = calculator.calculate_trip_profit(_base_trip(**{**extra, field: spec['low']}))['profit']
+    at_high = calculator.calculate_trip_profit(_base_trip(**{**extra, field: spec['high']}))['profit']
+    assert min(at_low, at_high) <= summary['profit_mean'] <= max(at_low, at_high)
+    assert summary['profit_std'] > 0
+
+
+def test_unused_fields_are_rejected():
+    simulator = MonteCarloSimulator(_base_trip(), {'fuel_cost_per_km': {'dist': 'uniform', 'low': 1, 'high': 2}})
+    with pytest.raises(ValueError, match='fuel_cost_per_km'):
+        simulator.run(draws=10)
@@ -0,0 +1,75 @@
+import csv
+import json
+import os
+
+import pytest
+
+from monthly_adjustments import TripLedger, resolve_rates
+from profitability_calculator import get_calculator
+from profitability_matrix import ProfitabilityMatrix
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _trips(**extra):
+    with open(os.path.join(ROOT, 'config.json')) as f:
+        base = json.load(f)['trip_data']
+    return [{**base, **extra, 'trip_id': f'T{number}', 'daughter_station': client,
+             'mother_station': station, 'trip_date': date}
+            for number, (client, station, date) in enumerate([
+                ('A', 'Ebedei', '2025-10-03'), ('B', 'Ore', '2025-10-09'),
+                ('A', 'Ore', '2025-10-21'), ('A', 'Ebedei', '2025-11-02')])]
+
+
+def _write_log(path, trips):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(trips[0]))
+        writer.writeheader()
+        writer.writerows(trips)
+
+
+def test_resolve_rates_converts_usd_and_monthly_totals():
+    rates = resolve_rates({'month': '2025-10', 'exchange_rate': 1500, 'gas_cost_usd': 0.3,
+                           'plant_costs': 1000, 'total_volume': 10})
+    assert rates == {'gas_cost': pytest.approx(450.0), 'plant_cost': 100.0}
+
+    with pytest.raises(ValueError, match='exchange_rate'):
+        resolve_rates({'month': '2025-10', 'gas_price_usd': 0.5})
+
+
+@pytest.mark.parametrize('model,extra', [
+    ('base', {}),
+    ('gvd', {'gas_volume_dispensed': 4000}),
+    ('fuel_per_km', {'fuel_cost_per_km': 60}),
+])
+def test_adjustment_matches_a_full_recalculation(tmp_path, model, extra):
+    trips = _trips(**extra)
+    _write_log(tmp_path / 'trips.csv', trips)
+    calculator = get_calculator(model)
+
+    ledger = TripLedger.from_trip_log(str(tmp_path / 'trips.csv'), calculator=calculator)
+    summary = ledger.apply_adjustment({'month': '2025-10', 'mother_station': 'Ore', 'gas_price': 900})
+    assert summary['trips'] == 2
+
+    repriced = [dict(trip, gas_price=900) if trip['trip_date'] < '2025-11' and trip['mother_station'] == 'Ore'
+                else trip for trip in trips]
+    columns = calculator.trip_columns(repriced)
+    columns['trip_date'] = [trip['trip_date'] for trip in repriced]
+    expected = ProfitabilityMatrix(calculator)
+    expected.add(columns)
+
+    assert ledger.matrix.table(('daughter_station', 'mother_station', 'month')) == pytest.approx(
+        expected.table(('daughter_station', 'mother_station', 'month')))
+    profits = [calculator.calculate_trip_profit(trip)['profit'] for trip in repriced]
+    assert summary['profit_after'] == pytest.approx(profits[1] + profits[2])
+
+
+def test_adjustment_for_other_month_changes_nothing(tmp_path):
+    _write_log(tmp_path / 'trips.csv', _trips())
+    ledger = TripLedger.from_trip_log(str(tmp_path / 'trips.csv'))
+
+    before = ledger.matrix.table(('daughter_station', 'mother_station', 'month'))
+    summary = ledger.apply_adjustment({'month': '2025-12', 'gas_price': 900})
+    assert (summary['trips'], summary['profit_change']) == (0, 0.0)
+    assert ledger.matrix.table(('daughter_station', 'mother_station', 'month')) == before
@@ -0,0 +1,38 @@
+import math
+
+from prms_join import DispensingIndex
+
+
+HOUR = 3600
+
+
+def test_event_between_adjacent_windows_counts_once():
+    # Back-to-back trips: the 30-minute tolerance makes their windows overlap
+    # between 1:00 and 1:10, so each event must go to exactly one trip
+    index = DispensingIndex(
+        truck_id=['T1', 'T1', 'T1', 'T1'],
+        station=['A', 'A', 'A', 'A'],
+        dispensed_at=[0.5 * HOUR, HOUR + 100, HOUR + 500, 1.5 * HOUR],
+        volume=[100.0, 10.0, 20.0, 200.0],
+        tolerance_minutes=30,
+    )
+
+    matched = index.match(['T1', 'T1'], ['A', 'A'], [0, HOUR + 600], [HOUR, 2 * HOUR])
+
+    # 1:01:40 is nearer the first trip, 1:08:20 nearer the second
+    assert matched['gas_volume_dispensed'].tolist() == [110.0, 220.0]
+    assert matched['dispensing_events'].tolist() == [2, 2]
+    assert index.match_summary()['matched_events'] == 4
+
+
+def test_tie_goes_to_earlier_trip_and_events_are_not_reused():
+    index = DispensingIndex(['T1'], ['A'], [HOUR + 300], [50.0], tolerance_minutes=30)
+
+    matched = index.match(['T1', 'T1'], ['A', 'A'], [0, HOUR + 600], [HOUR, 2 * HOUR])
+    assert matched['dispensing_events'].tolist() == [1, 0]
+    assert math.isnan(matched['gas_volume_dispensed'][1])
+
+    # A later batch with the same window finds the record already assigned
+    again = index.match(['T1'], ['A'], [HOUR + 600], [2 * HOUR])
+    assert again['dispensing_events'].tolist() == [0]
+    assert index.match_summary()['matched_events'] == 1
@@ -0,0 +1,121 @@
+import asyncio
+import json
+import os
+
+from profit_service import MicroBatcher, ProfitService
+from profitability_calculator import get_calculator
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _config_trip(**overrides):
+    with open(os.path.join(ROOT, 'config.json')) as f:
+        trip = json.load(f)['trip_data']
+    trip.update(overrides)
+    return trip
+
+
+async def _request(port, method, target, body=b'', headers=None):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    lines = [f"{method} {target} HTTP/1.1", "Host: localhost", "Connection: close"]
+    if method == 'POST':
+        lines.append(f"Content-Length: {len(body)}")
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b'\r\n\r\n')
+    return int(head.split()[1]), head.decode('latin-1'), payload
+
+
+def _run(requests):
+    """Start a service on a free port, run the requests concurrently and stop it."""
+    async def scenario():
+        service = ProfitService(max_delay_ms=20)
+        server = await asyncio.start_server(service.handle_connection, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            responses = await asyncio.gather(*(_request(port, *request) for request in requests))
+        return service, responses
+
+    return asyncio.run(scenario())
+
+
+def test_concurrent_requests_are_micro_batched():
+    trips = [_config_trip(trip_id=f'T{number}', gas_price=800 + number) for number in range(20)]
+    service, responses = _run([('POST', '/calculate', json.dumps(trip).encode()) for trip in trips])
+
+    calculator = get_calculator()
+    for trip, (status, _, payload) in zip(trips, responses):
+        assert status == 200
+        assert json.loads(payload) == calculator.calculate_trip_profit(trip)
+    assert service.batcher('base').trips == 20
+    assert service.batcher('base').batches < 20
+
+
+def test_batch_endpoint_matches_scalar_for_every_format():
+    trips = [_config_trip(trip_id='A'), _config_trip(trip_id='B', gas_volume=4000)]
+    expected = [get_calculator('gvd').calculate_trip_profit(trip) for trip in trips]
+    ndjson = ''.join(json.dumps(trip) + '\n' for trip in trips).encode()
+
+    _, responses = _run([
+        ('POST', '/calculate/batch?model=gvd', json.dumps(trips).encode()),
+        ('POST', '/calculate/batch?model=gvd', json.dumps({'trips': trips}).encode()),
+        ('POST', '/calculate/batch?model=gvd&format=ndjson', ndjson, {'Content-Type': 'application/x-ndjson'}),
+    ])
+
+    for status, _, payload in responses[:2]:
+        assert status == 200
+        assert json.loads(payload) == {'count': 2, 'results': expected}
+
+    status, head, payload = responses[2]
+    assert status == 200 and 'Transfer-Encoding: chunked' in head
+    size, _, rest = payload.partition(b'\r\n')
+    records = rest[:int(size, 16)].decode().splitlines()
+    assert [json.loads(record) for record in records] == expected
+
+
+def test_client_errors():
+    bad = _config_trip()
+    del bad['gas_price']
+
+    _, responses = _run([
+        ('POST', '/calculate', json.dumps(bad).encode()),
+        ('POST', '/calculate', b'{not json'),
+        ('POST', '/calculate?model=nope', json.dumps(_config_trip()).encode()),
+        ('GET', '/calculate'),
+        ('GET', '/missing'),
+        ('POST', '/calculate', b'{}', {'Content-Length': '-1'}),
+    ])
+
+    assert [status for status, _, _ in responses] == [400, 400, 400, 405, 404, 400]
+    assert 'gas_price' in json.loads(responses[0][2])['error']
+
+
+def test_bad_trip_does_not_fail_its_batch():
+    async def scenario():
+        batcher = MicroBatcher(get_calculator(), max_delay_ms=20)
+        bad = _config_trip()
+        del bad['gas_cost']
+        return await asyncio.gather(batcher.submit(_config_trip()), batcher.submit(bad),
+                                    return_exceptions=True)
+
+    good, error = asyncio.run(scenario())
+    assert good['profit'] == get_calculator().calculate_trip_profit(_config_trip())['profit']
+    assert 'gas_cost' in str(error)
+
+
+def test_micro_batch_applies_defaults_per_trip():
+    calculator = get_calculator('mother_station_wait')
+    trips = [_config_trip(trip_id='T1', mother_station_wait_time=3), _config_trip(trip_id='T2')]
+
+    async def scenario():
+        batcher = MicroBatcher(calculator, max_delay_ms=20)
+        results = await asyncio.gather(*(batcher.submit(trip) for trip in trips))
+        return batcher, results
+
+    batcher, results = asyncio.run(scenario())
+    assert batcher.batches == 1
+    assert results == [calculator.calculate_trip_profit(trip) for trip in trips]
+    assert results[0]['profit'] < results[1]['profit']
@@ -0,0 +1,77 @@
+import csv
+import json
+import os
+
+import pytest
+
+from profitability_calculator import get_calculator
+from profitability_matrix import ProfitabilityMatrix
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Extra inputs each non-base model needs from the log
+MODEL_FIELDS = {
+    'base': {},
+    'gvd': {'gas_volume_dispensed': 4000},
+    'fuel_per_km': {'fuel_cost_per_km': 60},
+    'imi_per_day': {'operation_days': 2, 'included_km_per_day': 100},
+    'mother_station_wait': {'mother_station_wait_time': 3},
+}
+
+
+def _trips(**extra):
+    with open(os.path.join(ROOT, 'config.json')) as f:
+        base = json.load(f)['trip_data']
+    trips = []
+    for number, (client, station, date) in enumerate([
+            ('A', 'Ebedei', '2025-01-03'), ('A', 'Ebedei', '2025-01-20'),
+            ('A', 'Ore', '2025-02-01'), ('B', 'Ebedei', '2025-02-11')]):
+        trips.append({**base, **extra, 'trip_id': f'T{number}', 'daughter_station': client,
+                      'mother_station': station, 'trip_date': date, 'gas_price': 800 + 10 * number})
+    return trips
+
+
+def _write_csv(path, trips):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(trips[0]), extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(trips)
+
+
+@pytest.mark.parametrize('model', list(MODEL_FIELDS))
+def test_from_trip_log_uses_the_model_inputs(tmp_path, model):
+    trips = _trips(**MODEL_FIELDS[model])
+    _write_csv(tmp_path / 'trips.csv', trips)
+
+    calculator = get_calculator(model)
+    matrix = ProfitabilityMatrix.from_trip_log(str(tmp_path / 'trips.csv'), chunk_size=3, calculator=calculator)
+
+    profits = [calculator.calculate_trip_profit(trip)['profit'] for trip in trips]
+    assert matrix.matrix('profit') == {
+        'A': {'Ebedei': pytest.approx(profits[0] + profits[1]), 'Ore': pytest.approx(profits[2])},
+        'B': {'Ebedei': pytest.approx(profits[3])},
+    }
+
+
+def test_months_roll_up_and_merge():
+    trips = _trips()
+    columns = get_calculator().trip_columns(trips)
+    columns['trip_date'] = [trip['trip_date'] for trip in trips]
+
+    first, second = ProfitabilityMatrix(), ProfitabilityMatrix()
+    first.add({field: values[:2] for field, values in columns.items()})
+    second.add({field: values[2:] for field, values in columns.items()})
+    first.merge(second)
+
+    assert first.months() == ['2025-01', '2025-02']
+    assert first.matrix('trips', month='2025-02') == {'A': {'Ore': 1}, 'B': {'Ebedei': 1}}
+    rows = first.table(('mother_station',))
+    assert [(row['mother_station'], row['trips'], row['gas_volume']) for row in rows] == [
+        ('Ebedei', 3, 15000.0), ('Ore', 1, 5000.0)]
+    assert rows[0]['profit_per_scm'] == round(rows[0]['profit'] / rows[0]['gas_volume'], 4)
+
+
+def test_unknown_metric_is_rejected():
+    with pytest.raises(ValueError, match='Unknown metric'):
+        ProfitabilityMatrix().matrix('speed')
@@ -0,0 +1,69 @@
+import random
+import statistics
+
+import numpy as np
+import pytest
+
+import route_index
+from route_index import P2Quantile, RouteIndex, RunningStats
+
+
+def test_p2_quantile_tracks_exact_quantiles():
+    rng = random.Random(11)
+    values = [rng.gauss(12, 3) for _ in range(20000)]
+
+    for p in (0.5, 0.9):
+        estimator = P2Quantile(p)
+        for value in values:
+            estimator.add(value)
+        exact = statistics.quantiles(values, n=100)[int(p * 100) - 1]
+        assert estimator.value() == pytest.approx(exact, abs=0.1)
+
+
+def test_p2_quantile_is_exact_for_few_values():
+    estimator = P2Quantile(0.5)
+    assert estimator.value() is None
+    for value in (9.0, 1.0, 5.0):
+        estimator.add(value)
+    assert estimator.value() == 5.0
+
+
+def test_batch_moments_match_single_adds():
+    rng = random.Random(5)
+    values = [rng.uniform(4, 20) for _ in range(1000)]
+
+    one_by_one, batched = RunningStats(), RunningStats()
+    for value in values:
+        one_by_one.add(value)
+    batched.add_many(np.array(values[:300]))
+    batched.add_many(np.array(values[300:]))
+
+    assert batched.summary() == pytest.approx(one_by_one.summary())
+    assert batched.summary()['mean'] == pytest.approx(statistics.mean(values), abs=1e-4)
+    assert batched.summary()['std'] == pytest.approx(statistics.stdev(values), abs=1e-4)
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = RouteIndex()
+    index.add_batch({
+        'mother_station': ['Ebedei', 'Ebedei', 'Oben'],
+        'daughter_station': ['A', 'A', 'B'],
+        'truck_turnaround_time': [10.0, 14.0, 8.0],
+        'skid_turnaround_time': [12.0, 16.0, 9.0],
+        'round_trip_distance': [200.0, 240.0, float('nan')],
+    })
+    index.save(str(tmp_path / 'index.json'))
+
+    restored = RouteIndex.load(str(tmp_path / 'index.json'))
+    assert restored.lookup('Ebedei', 'A') == index.lookup('Ebedei', 'A')
+    assert restored.expected_values('Oben', 'B') == {'truck_turnaround_time': 8.0, 'skid_turnaround_time': 9.0}
+    assert restored.lookup('Oben', 'A') is None
+
+
+def test_fill_reports_unknown_route(tmp_path, monkeypatch, capsys):
+    config = tmp_path / 'config.json'
+    config.write_text('{"trip_data": {"mother_station": "Ebedei", "daughter_station": "Nowhere"}}')
+    monkeypatch.setattr('sys.argv', ['route_index.py', '--fill', str(config)])
+
+    route_index.main()
+    assert 'Error: No trips recorded for route Ebedei -> Nowhere' in capsys.readouterr().out
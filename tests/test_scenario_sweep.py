@@ -0,0 +1,52 @@
+import json
+import os
+
+import pytest
+
+from scenario_sweep import ParameterSweep
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _base_trip():
+    with open(os.path.join(ROOT, 'sweep.json')) as f:
+        return json.load(f)['base_trip']
+
+
+def test_ties_keep_earliest_points_for_any_chunk_size():
+    # Six points with the same profit: the earliest two win both rankings
+    sweep = ParameterSweep(_base_trip(), {'gas_price': [850] * 6})
+
+    for chunk_size in (3, 4, 100):
+        summary = sweep.run(top_k=2, chunk_size=chunk_size)
+        assert [point['index'] for point in summary['top']] == [0, 1]
+        assert [point['index'] for point in summary['bottom']] == [0, 1]
+
+
+def test_top_and_bottom_match_full_sort():
+    sweep = ParameterSweep(_base_trip(), {'gas_price': [800, 900, 800, 950, 700, 900, 700]})
+
+    for chunk_size in (2, 3, 100):
+        summary = sweep.run(top_k=3, chunk_size=chunk_size)
+        assert [point['index'] for point in summary['top']] == [3, 1, 5]
+        assert [point['index'] for point in summary['bottom']] == [4, 6, 0]
+
+
+def test_model_inputs_can_be_swept():
+    from profitability_calculator import get_calculator
+
+    base = dict(_base_trip(), fuel_cost_per_km=50)
+    sweep = ParameterSweep(base, {'fuel_cost_per_km': [50, 100]})
+
+    calculator = get_calculator('fuel_per_km')
+    summary = sweep.run(calculator=calculator, top_k=1)
+    assert summary['top'][0]['index'] == 0
+    assert summary['top'][0]['profit'] == calculator.calculate_trip_profit(base)['profit']
+
+
+def test_fields_outside_the_cost_model_are_rejected():
+    sweep = ParameterSweep(_base_trip(), {'fuel_cost_per_km': [50, 100]})
+
+    with pytest.raises(ValueError, match='fuel_cost_per_km'):
+        sweep.run()
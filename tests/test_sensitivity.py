@@ -0,0 +1,80 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from profitability_calculator import get_calculator
+from sensitivity import analyze_batch, analyze_trip, sensitivity_fields
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _trip(**overrides):
+    with open(os.path.join(ROOT, 'config.json')) as f:
+        trip = json.load(f)['trip_data']
+    trip.update(overrides)
+    return trip
+
+
+def _columns(trip, calculator, size=3):
+    return {field: np.full(size, float(trip[field])) for field in sensitivity_fields(trip, calculator)}
+
+
+def test_fields_follow_cost_model():
+    trip = _trip(fuel_cost_per_km=12.5)
+    assert 'fuel_cost_per_km' not in sensitivity_fields(trip)
+    fields = sensitivity_fields(trip, get_calculator('fuel_per_km'))
+    assert 'fuel_cost_per_km' in fields
+    assert 'fuel_cost' not in fields
+    # Defaulted inputs are only analysed when the trip provides them
+    assert 'operation_days' not in sensitivity_fields(trip, get_calculator('imi_per_day'))
+    assert 'operation_days' in sensitivity_fields(dict(trip, operation_days=1), get_calculator('imi_per_day'))
+
+
+@pytest.mark.parametrize('model', ['base', 'gvd', 'fuel_per_km', 'mother_station_wait'])
+def test_break_even_zeroes_profit(model):
+    calculator = get_calculator(model)
+    trip = _trip(fuel_cost_per_km=12.5, mother_station_wait_time=2)
+    analysis = analyze_trip(trip, calculator)
+    assert set(analysis['sensitivities']) == set(sensitivity_fields(trip, calculator))
+
+    for field, result in analysis['sensitivities'].items():
+        if result['break_even'] is None:
+            continue
+        profit = calculator.cost_model.evaluate(dict(trip, **{field: result['break_even']}))['profit']
+        assert profit == pytest.approx(0, abs=1.0), field
+
+
+def test_break_even_steps_across_operation_days():
+    calculator = get_calculator('imi_per_day')
+    trip = _trip(fixed_trucking_cost=45000)
+    result = analyze_trip(trip, calculator)['sensitivities']['truck_turnaround_time']
+
+    # The linear estimate (129.58 h) ignores the extra operation day charged every 24 h
+    assert result['bound'] == 'max'
+    assert result['break_even'] == pytest.approx(104.5833, abs=1e-3)
+    at = calculator.cost_model.evaluate(dict(trip, truck_turnaround_time=result['break_even']))['profit']
+    past = calculator.cost_model.evaluate(dict(trip, truck_turnaround_time=result['break_even'] + 0.01))['profit']
+    assert at >= 0 > past
+
+
+def test_batch_matches_single_trip():
+    calculator = get_calculator('imi_per_day')
+    trip = _trip(fixed_trucking_cost=45000)
+    single = analyze_trip(trip, calculator)
+    batch = analyze_batch(_columns(trip, calculator), calculator)
+
+    assert batch['profit'] == pytest.approx(single['profit'])
+    for field, result in single['sensitivities'].items():
+        expected = np.nan if result['break_even'] is None else result['break_even']
+        assert batch['sensitivities'][field]['break_even'] == pytest.approx(expected, abs=1e-3, nan_ok=True)
+
+
+def test_field_read_only_by_unused_default_has_no_break_even():
+    calculator = get_calculator('contractor_tariff')
+    trip = _trip(contractor_trucking_costs=60000)
+    result = analyze_trip(trip, calculator)['sensitivities']['fixed_trucking_cost']
+    assert result['derivative'] == 0
+    assert result['break_even'] is None
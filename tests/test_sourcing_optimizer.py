@@ -0,0 +1,107 @@
+import itertools
+import os
+import random
+
+import numpy as np
+import pytest
+
+from profitability_calculator import get_calculator
+from sourcing_optimizer import SourcingOptimizer, route_profit_per_scm, route_trip, solve_min_cost_flow
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _total_cost(cost, flow):
+    return float((np.where(np.isfinite(cost), cost, 0) * flow).sum())
+
+
+def _brute_force(cost, supply, demand, require_full_demand):
+    # Integer data has an integer optimum, so enumerating unit flows is exhaustive
+    stations, clients = cost.shape
+    arcs = [(i, j) for i in range(stations) for j in range(clients) if np.isfinite(cost[i, j])]
+    best = None
+    for amounts in itertools.product(*(range(min(supply[i], demand[j]) + 1) for i, j in arcs)):
+        flow = np.zeros(cost.shape)
+        for (i, j), amount in zip(arcs, amounts):
+            flow[i, j] = amount
+        if (flow.sum(axis=1) > supply).any() or (flow.sum(axis=0) > demand).any():
+            continue
+        key = (-flow.sum() if require_full_demand else 0, _total_cost(cost, flow))
+        if best is None or key < best:
+            best = key
+    return best
+
+
+@pytest.mark.parametrize('require_full_demand', [False, True])
+def test_min_cost_flow_matches_brute_force(require_full_demand):
+    rng = random.Random(17)
+    for _ in range(25):
+        cost = np.array([[rng.choice([np.inf, rng.randint(-9, 4)]) for _ in range(3)] for _ in range(2)])
+        supply = np.array([rng.randint(0, 3) for _ in range(2)])
+        demand = np.array([rng.randint(0, 3) for _ in range(3)])
+
+        flow = solve_min_cost_flow(cost, supply, demand, require_full_demand)
+        assert (flow >= -1e-9).all()
+        assert (flow.sum(axis=1) <= supply + 1e-9).all()
+        assert (flow.sum(axis=0) <= demand + 1e-9).all()
+        assert not (flow[~np.isfinite(cost)] > 1e-9).any()
+
+        key = (-flow.sum() if require_full_demand else 0, _total_cost(cost, flow))
+        assert key == pytest.approx(_brute_force(cost, supply, demand, require_full_demand))
+
+
+def test_sourcing_plan_respects_capacity_and_demand():
+    optimizer = SourcingOptimizer.from_file(os.path.join(ROOT, 'sourcing.json'))
+    plan = optimizer.optimize()
+
+    capacity = {station['name']: station['capacity'] for station in optimizer.stations}
+    demand = {client['name']: client['demand'] for client in optimizer.clients}
+    for assignment in plan['assignments']:
+        assert (assignment['mother_station'], assignment['daughter_station']) in optimizer.routes
+        capacity[assignment['mother_station']] -= assignment['volume']
+        demand[assignment['daughter_station']] -= assignment['volume']
+    assert min(capacity.values()) >= -0.01
+    assert min(demand.values()) >= -0.01
+    assert plan['total_profit'] == pytest.approx(sum(item['profit'] for item in plan['assignments']))
+
+
+def _single_route(**route):
+    defaults = {'gas_volume': 5000, 'ga_cost': 80, 'truck_depreciation': 2500, 'truck_insurance': 1200,
+                'fuel_cost': 3500, 'fixed_trucking_cost': 180, 'variable_trucking_cost': 45,
+                'skid_depreciation': 800}
+    route.update(mother_station='Ebedei', daughter_station='Customer Location A')
+    return SourcingOptimizer(defaults, [{'name': 'Ebedei', 'capacity': 60000, 'gas_cost': 450, 'plant_cost': 120}],
+                             [{'name': 'Customer Location A', 'demand': 30000, 'gas_price': 850}],
+                             [dict({'round_trip_distance': 240, 'truck_turnaround_time': 12,
+                                    'skid_turnaround_time': 14}, **route)])
+
+
+def test_route_gas_volume_sets_profit_and_trips():
+    optimizer = _single_route(gas_volume=6000)
+    trip = route_trip(optimizer.defaults, optimizer.stations[0], optimizer.clients[0],
+                      optimizer.routes[('Ebedei', 'Customer Location A')])
+    expected = get_calculator().calculate_trip_profit(trip)
+
+    plan = optimizer.optimize()
+    assignment, = plan['assignments']
+    assert assignment['volume'] == 30000
+    assert assignment['trips'] == 5
+    assert assignment['profit_per_scm'] == pytest.approx(expected['profit'] / 6000, abs=1e-4)
+
+
+def test_route_profit_applies_model_defaults():
+    optimizer = _single_route()
+    profit_per_scm = route_profit_per_scm(optimizer.defaults, optimizer.stations, optimizer.clients,
+                                          optimizer.routes, get_calculator('imi_per_day'))
+    trip = route_trip(optimizer.defaults, optimizer.stations[0], optimizer.clients[0],
+                      optimizer.routes[('Ebedei', 'Customer Location A')])
+    expected = get_calculator('imi_per_day').calculate_trip_profit(trip)
+    assert profit_per_scm[0, 0] == pytest.approx(expected['profit'] / 5000)
+
+
+def test_route_missing_required_field():
+    optimizer = _single_route()
+    del optimizer.routes[('Ebedei', 'Customer Location A')]['truck_turnaround_time']
+    with pytest.raises(KeyError, match='Ebedei -> Customer Location A is missing truck_turnaround_time'):
+        optimizer.optimize()
@@ -0,0 +1,59 @@
+import json
+import os
+
+import pytest
+
+from profitability_calculator import get_calculator
+from trip_ingest import process_trip_log
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _write_log(path, trips):
+    with open(path, 'w') as f:
+        f.writelines(json.dumps(trip) + '\n' for trip in trips)
+
+
+def _config_trip():
+    with open(os.path.join(ROOT, 'config.json')) as f:
+        return json.load(f)['trip_data']
+
+
+def test_model_specific_columns_are_read(tmp_path):
+    trips = [dict(_config_trip(), gas_volume_dispensed=4000), _config_trip()]
+    _write_log(tmp_path / 'trips.jsonl', trips)
+
+    calculator = get_calculator('gvd')
+    summary = process_trip_log(str(tmp_path / 'trips.jsonl'), str(tmp_path / 'out.jsonl'),
+                               calculator=calculator)
+
+    expected = sum(calculator.calculate_trip_profit(trip)['profit'] for trip in trips)
+    assert summary['total_profit'] == round(expected, 2)
+    assert summary['total_revenue'] == (4000 + 5000) * 850
+
+
+def test_unsupported_output_format_leaves_no_file(tmp_path):
+    _write_log(tmp_path / 'trips.jsonl', [_config_trip()])
+
+    with pytest.raises(ValueError, match='Unsupported'):
+        process_trip_log(str(tmp_path / 'trips.jsonl'), str(tmp_path / 'out.txt'))
+    assert not (tmp_path / 'out.txt').exists()
+
+
+def test_missing_required_model_field_is_reported(tmp_path):
+    trips = [dict(_config_trip(), fuel_cost_per_km=50), _config_trip()]
+    _write_log(tmp_path / 'trips.jsonl', trips)
+
+    with pytest.raises(ValueError, match=r'trips.jsonl:2: missing fuel_cost_per_km'):
+        process_trip_log(str(tmp_path / 'trips.jsonl'), str(tmp_path / 'out.jsonl'),
+                         calculator=get_calculator('fuel_per_km'))
+
+
+def test_missing_defaulted_model_field_uses_the_default(tmp_path):
+    _write_log(tmp_path / 'trips.jsonl', [_config_trip()])
+
+    calculator = get_calculator('imi_per_day')
+    summary = process_trip_log(str(tmp_path / 'trips.jsonl'), str(tmp_path / 'out.jsonl'),
+                               calculator=calculator)
+    assert summary['total_profit'] == calculator.calculate_trip_profit(_config_trip())['profit']
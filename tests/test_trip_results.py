@@ -0,0 +1,97 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from profitability_calculator import get_calculator
+from trip_results import TripResult, TripResultTable
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _trips(count=6):
+    with open(os.path.join(ROOT, 'config.json')) as f:
+        base = json.load(f)['trip_data']
+    return [dict(base, trip_id=f'T{number}', gas_price=700 + 40 * number,
+                 round_trip_distance=150 + 60 * number) for number in range(count)]
+
+
+@pytest.mark.parametrize('model', ['base', 'fuel_per_km', 'imi_per_day'])
+def test_trip_result_matches_result_dict(model):
+    calculator = get_calculator(model)
+    trip = dict(_trips(1)[0], fuel_cost_per_km=12.5)
+    expected = calculator.calculate_trip_profit(trip)
+    result = calculator.calculate_trip_result(trip)
+
+    assert isinstance(result, TripResult)
+    assert result == expected
+    assert result.to_dict() == expected
+    assert list(result) == list(expected)
+    assert result['costs_breakdown'] == expected['costs_breakdown']
+    assert result.profit == expected['profit']
+    assert TripResult.from_dict(expected) == expected
+
+
+def test_trip_result_scenario_fields():
+    result = get_calculator().calculate_trip_result(_trips(1)[0])
+    result['scenario_name'] = 'Higher price'
+    result['description'] = 'GP + 10%'
+    assert list(result)[-2:] == ['scenario_name', 'description']
+    assert result.to_dict()['scenario_name'] == 'Higher price'
+    with pytest.raises(KeyError):
+        result['unknown'] = 1
+    with pytest.raises(KeyError):
+        result['unknown']
+
+
+def test_table_matches_scalar_results():
+    calculator = get_calculator()
+    trips = _trips()
+    table = calculator.calculate_table(trips)
+    expected = [calculator.calculate_trip_profit(trip) for trip in trips]
+
+    assert len(table) == len(trips)
+    assert table.records() == expected
+    assert [row.to_dict() for row in table] == expected
+    assert table[2] == expected[2]
+    assert table['profit'].tolist() == [result['profit'] for result in expected]
+    assert TripResultTable.from_records(expected).records() == expected
+
+
+def test_table_from_batch_labels_and_slices():
+    calculator = get_calculator()
+    columns = calculator.trip_columns(_trips())
+    results = calculator.calculate_batch(columns)
+
+    unlabelled = {field: values for field, values in columns.items() if field != 'trip_id'}
+    table = TripResultTable.from_batch(unlabelled, results)
+    assert table['trip_id'].tolist() == ['N/A'] * 6
+
+    table = TripResultTable.from_batch(columns, results)
+    part = table[1:3]
+    assert part.records() == table.records(1, 3)
+    # Slices are views on the table's arrays
+    assert np.shares_memory(part['profit'], table['profit'])
+
+
+def test_sort_by_and_dataframe():
+    table = get_calculator().calculate_table(_trips())
+    ordered = table.sort_by('profit')
+    assert ordered['profit'].tolist() == sorted(table['profit'].tolist(), reverse=True)
+    assert table.sort_by('profit', descending=False)['trip_id'].tolist() == ordered['trip_id'].tolist()[::-1]
+    with pytest.raises(KeyError):
+        table.sort_by('trip_id')
+
+    frame = table.to_dataframe()
+    assert frame['profit'].tolist() == table['profit'].tolist()
+    assert np.shares_memory(frame['profit'].to_numpy(), table['profit'])
+
+
+def test_mismatched_columns_are_rejected():
+    columns = {field: [1.0, 2.0] for field in ('revenue', 'production_costs', 'truck_expenses',
+                                               'trucking_costs', 'skid_costs', 'total_costs', 'profit')}
+    columns['profit_margin_percent'] = [1.0]
+    with pytest.raises(ValueError):
+        TripResultTable(columns)
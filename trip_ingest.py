@@ -0,0 +1,234 @@
+"""
+PowerGas Trip Log Ingestion (Phase 4: Processing of trip data)
+
+Streams large CSV or JSONL trip logs through the profitability formula in
+fixed-size chunks and writes the results incrementally, so memory stays flat
+regardless of file size.
+
+Input: one trip per row/line using the same field names as trip_data in
+config.json (see TRIP_INPUT_FIELDS). Optional label columns (trip_id,
+mother_station, daughter_station, trip_date) are carried through to the output.
+
+Usage:
+    python trip_ingest.py trips.csv trip_results.csv --chunk-size 50000
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from cost_models import CostModel
+from profitability_calculator import (
+    ProfitabilityCalculator,
+    get_calculator,
+    TRIP_INPUT_FIELDS,
+    TRIP_LABEL_FIELDS,
+    BATCH_RESULT_FIELDS,
+)
+
+
+# Non-numeric fields carried from the input to the output unchanged
+PASSTHROUGH_FIELDS = TRIP_LABEL_FIELDS + ('trip_date',)
+
+DEFAULT_CHUNK_SIZE = 50000
+
+
+def detect_format(path: str) -> str:
+    """
+    Work out the file format from the file extension.
+
+    Args:
+        path (str): Path to a trip log
+
+    Returns:
+        str: 'csv' or 'jsonl'
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return 'csv'
+    if extension in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    raise ValueError(f"Unsupported trip log format: {path} (expected .csv or .jsonl)")
+
+
+def iter_records(path: str, fmt: str) -> Iterator[Dict[str, Any]]:
+    """Yield one raw record per CSV row or JSONL line."""
+    with open(path, 'r', newline='') as f:
+        if fmt == 'csv':
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+def _new_chunk(extra_fields: Sequence[str] = ()) -> Dict[str, List[Any]]:
+    return {field: [] for field in TRIP_INPUT_FIELDS + PASSTHROUGH_FIELDS + tuple(extra_fields)}
+
+
+def read_trip_chunks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                     fmt: Optional[str] = None,
+                     extra_fields: Sequence[str] = (),
+                     cost_model: Optional[CostModel] = None) -> Iterator[Dict[str, List[Any]]]:
+    """
+    Stream a trip log as fixed-size columnar chunks.
+
+    Only one chunk is held in memory at a time.
+
+    Args:
+        path (str): Path to the CSV or JSONL trip log
+        chunk_size (int): Number of trips per chunk
+        fmt (str): 'csv' or 'jsonl' (detected from the extension if omitted)
+        extra_fields (sequence): Optional numeric fields to read as well
+            (e.g. gas_volume_dispensed); missing or empty values become NaN
+        cost_model (CostModel): Also read every field the model uses; its
+            inputs without a model default are required like TRIP_INPUT_FIELDS
+
+    Yields:
+        dict: Column lists keyed by field name, ready for calculate_batch
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+
+    fmt = fmt or detect_format(path)
+    required = ()
+    if cost_model is not None:
+        extra_fields = tuple(extra_fields) + cost_model.fields
+        required = {field for field in cost_model.inputs if field not in cost_model.defaults}
+    extra_fields = list(dict.fromkeys(field for field in extra_fields if field not in TRIP_INPUT_FIELDS))
+    chunk = _new_chunk(extra_fields)
+    size = 0
+
+    for line_number, record in enumerate(iter_records(path, fmt), 1):
+        try:
+            for field in TRIP_INPUT_FIELDS:
+                chunk[field].append(float(record[field]))
+        except KeyError as e:
+            raise KeyError(f"{path}:{line_number}: missing required field {e}") from None
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"{path}:{line_number}: invalid numeric value ({e})") from None
+
+        for field in PASSTHROUGH_FIELDS:
+            chunk[field].append(record.get(field, 'N/A'))
+
+        for field in extra_fields:
+            value = record.get(field)
+            if field in required and (value is None or value == ''):
+                raise ValueError(f"{path}:{line_number}: missing {field}")
+            try:
+                chunk[field].append(math.nan if value is None or value == '' else float(value))
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"{path}:{line_number}: invalid numeric value for {field} ({e})") from None
+
+        size += 1
+        if size == chunk_size:
+            yield chunk
+            chunk = _new_chunk(extra_fields)
+            size = 0
+
+    if size:
+        yield chunk
+
+
+class _ResultWriter:
+    """Incremental CSV/JSONL writer for chunked calculation results."""
+
+    columns = PASSTHROUGH_FIELDS + BATCH_RESULT_FIELDS
+
+    def __init__(self, f, fmt: str):
+        self.f = f
+        self.fmt = fmt
+        if fmt == 'csv':
+            self.writer = csv.writer(f)
+            self.writer.writerow(self.columns)
+
+    def write_chunk(self, chunk: Dict[str, List[Any]], results: Dict[str, Any]):
+        values = [chunk[field] for field in PASSTHROUGH_FIELDS]
+        values += [results[field].tolist() for field in BATCH_RESULT_FIELDS]
+        rows = zip(*values)
+
+        if self.fmt == 'csv':
+            self.writer.writerows(rows)
+        else:
+            self.f.writelines(json.dumps(dict(zip(self.columns, row))) + '\n' for row in rows)
+
+
+def process_trip_log(input_path: str, output_path: str,
+                     chunk_size: int = DEFAULT_CHUNK_SIZE,
+                     calculator: Optional[ProfitabilityCalculator] = None) -> Dict[str, Any]:
+    """
+    Calculate profitability for every trip in a log and write the results.
+
+    Args:
+        input_path (str): CSV or JSONL trip log
+        output_path (str): CSV or JSONL results file (format from extension)
+        chunk_size (int): Number of trips calculated per vectorized pass
+        calculator (ProfitabilityCalculator): Calculator to use (optional);
+            every field its cost model reads is taken from the log
+
+    Returns:
+        dict: Run summary with trip/chunk counts and revenue/cost/profit totals
+    """
+    if calculator is None:
+        calculator = get_calculator()
+
+    summary = {
+        'trips': 0,
+        'chunks': 0,
+        'total_revenue': 0.0,
+        'total_costs': 0.0,
+        'total_profit': 0.0,
+        'loss_making_trips': 0,
+    }
+
+    output_format = detect_format(output_path)
+    with open(output_path, 'w', newline='') as f:
+        writer = _ResultWriter(f, output_format)
+
+        for chunk in read_trip_chunks(input_path, chunk_size, cost_model=calculator.cost_model):
+            results = calculator.calculate_batch(chunk)
+            writer.write_chunk(chunk, results)
+
+            summary['trips'] += len(results['profit'])
+            summary['chunks'] += 1
+            summary['total_revenue'] += float(results['revenue'].sum())
+            summary['total_costs'] += float(results['total_costs'].sum())
+            summary['total_profit'] += float(results['profit'].sum())
+            summary['loss_making_trips'] += int((results['profit'] < 0).sum())
+
+    for key in ('total_revenue', 'total_costs', 'total_profit'):
+        summary[key] = round(summary[key], 2)
+
+    return summary
+
+
+def main():
+    """
+    Command-line entry point for trip log processing.
+    """
+    parser = argparse.ArgumentParser(description="Process a CSV/JSONL trip log through the profitability formula")
+    parser.add_argument('input', help="Trip log (.csv or .jsonl)")
+    parser.add_argument('output', help="Results file (.csv or .jsonl)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Trips per processing chunk (default: {DEFAULT_CHUNK_SIZE})")
+    args = parser.parse_args()
+
+    print("PowerGas Trip Log Processing")
+    print("="*80)
+
+    summary = process_trip_log(args.input, args.output, args.chunk_size)
+
+    print(f"Trips processed:   {summary['trips']:,} ({summary['chunks']} chunks)")
+    print(f"Total Revenue:     NGN {summary['total_revenue']:,.2f}")
+    print(f"Total Costs:       NGN {summary['total_costs']:,.2f}")
+    print(f"Total Profit:      NGN {summary['total_profit']:,.2f}")
+    print(f"Loss-making trips: {summary['loss_making_trips']:,}")
+    print(f"\nResults saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
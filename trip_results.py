@@ -0,0 +1,303 @@
+"""
+PowerGas Compact Trip Results
+
+Memory-light alternatives to the nested result dicts returned by
+calculate_trip_profit():
+
+    TripResult        One trip in a __slots__ record (flat cost fields, no
+                      per-trip dicts); reads like the old dict through the
+                      Mapping interface, including result['costs_breakdown']
+    TripResultTable   Many trips as one NumPy column per field
+                      (struct-of-arrays); to_dataframe() wraps the columns in
+                      a pandas DataFrame without copying them
+
+Both convert back to the exact calculate_trip_profit() dicts with to_dict() /
+records(), so existing callers and JSON exports keep working. Measured per
+trip: about 670 bytes as a result dict, 350 as a TripResult and under 100 in
+a TripResultTable.
+
+Usage:
+    from profitability_calculator import get_calculator
+
+    result = get_calculator().calculate_trip_result(trip_data)
+    result.profit, result['costs_breakdown']['total_costs']
+
+    table = get_calculator().calculate_table(trips)
+    df = table.sort_by('profit').to_dataframe()
+"""
+
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from profitability_calculator import BATCH_RESULT_FIELDS, TRIP_LABEL_FIELDS
+
+
+# calculate_trip_profit() fields nested under 'costs_breakdown'
+COST_BREAKDOWN_FIELDS = ('production_costs', 'truck_expenses', 'trucking_costs', 'skid_costs', 'total_costs')
+
+# Scenario fields added by evaluate_scenarios()
+SCENARIO_FIELDS = ('scenario_name', 'description')
+
+# Top-level keys of a calculate_trip_profit() dict, in order
+_DICT_KEYS = TRIP_LABEL_FIELDS + ('revenue', 'costs_breakdown', 'profit', 'profit_margin_percent')
+
+
+class TripResult(Mapping):
+    """
+    One trip's result with flat fields in __slots__.
+
+    Attributes are TRIP_LABEL_FIELDS, BATCH_RESULT_FIELDS and the optional
+    SCENARIO_FIELDS. As a Mapping it has the keys of a
+    calculate_trip_profit() dict (plus the scenario fields when set) and
+    compares equal to that dict.
+    """
+
+    __slots__ = TRIP_LABEL_FIELDS + BATCH_RESULT_FIELDS + SCENARIO_FIELDS
+
+    def __init__(self, trip_id: Any, mother_station: Any, daughter_station: Any,
+                 revenue: float, production_costs: float, truck_expenses: float, trucking_costs: float,
+                 skid_costs: float, total_costs: float, profit: float, profit_margin_percent: float,
+                 scenario_name: Optional[str] = None, description: Optional[str] = None):
+        """
+        Initialize the record.
+
+        Args:
+            trip_id, mother_station, daughter_station: Trip labels
+            revenue ... profit_margin_percent (float): BATCH_RESULT_FIELDS values
+            scenario_name (str): Scenario name (scenario results only)
+            description (str): Scenario description (scenario results only)
+        """
+        self.trip_id = trip_id
+        self.mother_station = mother_station
+        self.daughter_station = daughter_station
+        self.revenue = revenue
+        self.production_costs = production_costs
+        self.truck_expenses = truck_expenses
+        self.trucking_costs = trucking_costs
+        self.skid_costs = skid_costs
+        self.total_costs = total_costs
+        self.profit = profit
+        self.profit_margin_percent = profit_margin_percent
+        self.scenario_name = scenario_name
+        self.description = description
+
+    @classmethod
+    def from_dict(cls, result: Mapping[str, Any]) -> 'TripResult':
+        """
+        Build a record from a calculate_trip_profit() / evaluate_scenarios() dict.
+
+        Args:
+            result (Mapping): Result dict
+
+        Returns:
+            TripResult: The record
+        """
+        costs = result['costs_breakdown']
+        return cls(result['trip_id'], result['mother_station'], result['daughter_station'], result['revenue'],
+                   *(costs[field] for field in COST_BREAKDOWN_FIELDS),
+                   result['profit'], result['profit_margin_percent'],
+                   result.get('scenario_name'), result.get('description'))
+
+    def _keys(self):
+        if self.scenario_name is None and self.description is None:
+            return _DICT_KEYS
+        return _DICT_KEYS + SCENARIO_FIELDS
+
+    def __getitem__(self, key: str) -> Any:
+        if key == 'costs_breakdown':
+            return {field: getattr(self, field) for field in COST_BREAKDOWN_FIELDS}
+        if key not in self._keys():
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any):
+        # Only top-level fields, so evaluate_scenarios()-style tagging keeps working
+        if key not in TRIP_LABEL_FIELDS + BATCH_RESULT_FIELDS + SCENARIO_FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+    def __repr__(self) -> str:
+        return (f"TripResult(trip_id={self.trip_id!r}, profit={self.profit!r}, "
+                f"profit_margin_percent={self.profit_margin_percent!r})")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        The equivalent calculate_trip_profit() dict.
+
+        Returns:
+            dict: Result with a nested costs_breakdown (and scenario fields when set)
+        """
+        return {key: self[key] for key in self._keys()}
+
+
+class TripResultTable:
+    """
+    Results for many trips as one NumPy array per field.
+
+    Attributes:
+        columns (dict): float64 arrays keyed by BATCH_RESULT_FIELDS and
+            object arrays keyed by TRIP_LABEL_FIELDS (and SCENARIO_FIELDS
+            when present), all of the same length
+    """
+
+    def __init__(self, columns: Mapping[str, Any]):
+        """
+        Wrap result columns (no copy when they are already NumPy arrays of
+        the right dtype).
+
+        Args:
+            columns (Mapping): BATCH_RESULT_FIELDS and TRIP_LABEL_FIELDS
+                columns, optionally SCENARIO_FIELDS
+        """
+        import numpy as np
+
+        self.columns = {}
+        for field in TRIP_LABEL_FIELDS + SCENARIO_FIELDS:
+            if field in columns:
+                self.columns[field] = np.asarray(columns[field], dtype=object)
+        for field in BATCH_RESULT_FIELDS:
+            self.columns[field] = np.asarray(columns[field], dtype=np.float64)
+        lengths = {len(column) for column in self.columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Result columns have different lengths: {sorted(lengths)}")
+
+    @classmethod
+    def from_batch(cls, columns: Mapping[str, Any], results: Mapping[str, Any]) -> 'TripResultTable':
+        """
+        Combine calculate_batch() inputs and results.
+
+        Args:
+            columns (Mapping): Input columns (for the TRIP_LABEL_FIELDS;
+                missing labels become 'N/A')
+            results (Mapping): calculate_batch() results
+
+        Returns:
+            TripResultTable: The table
+        """
+        size = len(results['profit'])
+        merged = {field: columns[field] if field in columns else ['N/A'] * size for field in TRIP_LABEL_FIELDS}
+        merged.update({field: results[field] for field in BATCH_RESULT_FIELDS})
+        return cls(merged)
+
+    @classmethod
+    def from_records(cls, results: Sequence[Mapping[str, Any]]) -> 'TripResultTable':
+        """
+        Pack calculate_trip_profit() / evaluate_scenarios() dicts (or TripResults).
+
+        Args:
+            results (sequence): Result dicts
+
+        Returns:
+            TripResultTable: The table
+        """
+        columns = {field: [result[field] for result in results] for field in TRIP_LABEL_FIELDS}
+        for field in ('revenue', 'profit', 'profit_margin_percent'):
+            columns[field] = [result[field] for result in results]
+        breakdowns = [result['costs_breakdown'] for result in results]
+        for field in COST_BREAKDOWN_FIELDS:
+            columns[field] = [costs[field] for costs in breakdowns]
+        for field in SCENARIO_FIELDS:
+            if results and field in results[0]:
+                columns[field] = [result.get(field) for result in results]
+        return cls(columns)
+
+    def __len__(self) -> int:
+        return len(self.columns['profit'])
+
+    def __getitem__(self, key: Any) -> Any:
+        """
+        table['profit'] -> column array, table[i] -> TripResult,
+        table[a:b] / table[index_array] -> TripResultTable (slices are views).
+        """
+        import numpy as np
+
+        if isinstance(key, str):
+            return self.columns[key]
+        if isinstance(key, (int, np.integer)):
+            position = int(key)
+            return TripResult(*(self.columns[field][position].item()
+                                if field in BATCH_RESULT_FIELDS else self.columns[field][position]
+                                for field in TRIP_LABEL_FIELDS + BATCH_RESULT_FIELDS),
+                              **{field: self.columns[field][position]
+                                 for field in SCENARIO_FIELDS if field in self.columns})
+        return TripResultTable({field: column[key] for field, column in self.columns.items()})
+
+    def __iter__(self) -> Iterator[TripResult]:
+        for start in range(0, len(self), 10000):
+            yield from self.rows(start, start + 10000)
+
+    def rows(self, start: int = 0, stop: Optional[int] = None) -> List[TripResult]:
+        """
+        TripResult records for a range of trips.
+
+        Args:
+            start (int): First trip
+            stop (int): End of the range (default: all)
+
+        Returns:
+            list: TripResult per trip
+        """
+        labels = [self.columns[field][start:stop].tolist() for field in TRIP_LABEL_FIELDS]
+        values = [self.columns[field][start:stop].tolist() for field in BATCH_RESULT_FIELDS]
+        scenario = [self.columns[field][start:stop].tolist() for field in SCENARIO_FIELDS if field in self.columns]
+        return [TripResult(*row) for row in zip(*labels, *values, *scenario)]
+
+    def records(self, start: int = 0, stop: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        calculate_trip_profit()-shaped dicts for a range of trips.
+
+        Args:
+            start (int): First trip
+            stop (int): End of the range (default: all)
+
+        Returns:
+            list: One result dict per trip
+        """
+        return [row.to_dict() for row in self.rows(start, stop)]
+
+    def sort_by(self, field: str = 'profit', descending: bool = True) -> 'TripResultTable':
+        """
+        Trips ordered by a result column (stable, like sorted()).
+
+        Args:
+            field (str): One of BATCH_RESULT_FIELDS
+            descending (bool): Highest first
+
+        Returns:
+            TripResultTable: Reordered table
+        """
+        import numpy as np
+
+        if field not in BATCH_RESULT_FIELDS:
+            raise KeyError(f"Cannot sort by '{field}' (expected one of {', '.join(BATCH_RESULT_FIELDS)})")
+        values = self.columns[field]
+        order = np.argsort(-values if descending else values, kind='stable')
+        return self[order]
+
+    def to_dataframe(self, copy: bool = False) -> Any:
+        """
+        pandas DataFrame with one flat column per field.
+
+        The float columns share the table's arrays; pandas 3 may still
+        convert the label columns to its string dtype.
+
+        Args:
+            copy (bool): Copy the arrays (default: the DataFrame shares them)
+
+        Returns:
+            pandas.DataFrame: Labels, then BATCH_RESULT_FIELDS
+        """
+        import pandas as pd
+
+        return pd.DataFrame(self.columns, copy=copy)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the arrays (object columns count their pointers only)."""
+        return sum(column.nbytes for column in self.columns.values())
@@ -0,0 +1,381 @@
+"""
+PowerGas Columnar Trip Store
+
+Binary, column-oriented storage for trip histories so months of trip data can
+be re-processed without parsing JSON/CSV on every run.
+
+Layout (one directory per day, append-only parts inside it):
+
+    trip_store/
+      schema.json
+      2025-10-01/
+        part-00000/
+          gas_volume.npy  gas_price.npy  ...  trip_id.npy  mother_station.npy ...
+        part-00001/
+      2025-10-02/
+        part-00000/
+
+Every column is a plain NumPy .npy file (float64 for numeric fields,
+fixed-width unicode for labels). Columns are opened memory-mapped, so
+calculate_batch reads them zero-copy, and appending a day only writes new part
+directories - existing files are never rewritten.
+
+Usage:
+    python trip_store.py import trips.csv --store trip_store
+    python trip_store.py summary --store trip_store --start 2025-10-01 --end 2025-10-31
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import shutil
+import tempfile
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from profitability_calculator import (
+    ProfitabilityCalculator,
+    get_calculator,
+    TRIP_INPUT_FIELDS,
+    TRIP_LABEL_FIELDS,
+)
+
+
+SCHEMA_VERSION = 1
+
+# Extra numeric inputs used by the alternative cost models (stored when present)
+OPTIONAL_NUMERIC_FIELDS = (
+    'gas_volume_dispensed', 'fuel_cost_per_km', 'operation_days',
+    'included_km_per_day', 'mother_station_wait_time',
+)
+
+UNDATED = 'undated'
+
+_DAY_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+
+def optional_numeric_fields() -> List[str]:
+    """
+    Numeric inputs of every registered cost model beyond TRIP_INPUT_FIELDS.
+
+    Returns:
+        list: OPTIONAL_NUMERIC_FIELDS plus any field a registered model reads
+    """
+    from cost_models import get_cost_model, list_cost_models
+
+    fields = dict.fromkeys(OPTIONAL_NUMERIC_FIELDS)
+    for name in list_cost_models():
+        fields.update(dict.fromkeys(field for field in get_cost_model(name).fields
+                                    if field not in TRIP_INPUT_FIELDS))
+    return list(fields)
+
+
+def _partition_name(trip_date: Any) -> str:
+    """Day partition for a trip_date value (date or timestamp string)."""
+    if trip_date is None:
+        return UNDATED
+    day = str(trip_date)[:10]
+    return day if _DAY_PATTERN.match(day) else UNDATED
+
+
+class TripStore:
+    """
+    Append-only columnar trip store backed by memory-mapped NumPy files.
+
+    Attributes:
+        path (str): Root directory of the store
+        schema (dict): Field names and dtypes stored in schema.json
+    """
+
+    def __init__(self, path: str = 'trip_store', optional_fields: Optional[Sequence[str]] = None):
+        """
+        Open a store, creating it (with schema.json) if it does not exist.
+
+        Args:
+            path (str): Root directory of the store
+            optional_fields (sequence): Extra optional numeric fields to store
+                (added to the schema of an existing store; default for a new
+                store: optional_numeric_fields())
+        """
+        self.path = path
+        schema_file = os.path.join(path, 'schema.json')
+
+        if os.path.exists(schema_file):
+            with open(schema_file, 'r') as f:
+                self.schema = json.load(f)
+            if self.schema.get('version') != SCHEMA_VERSION:
+                raise ValueError(f"Unsupported trip store version: {self.schema.get('version')}")
+            added = [field for field in optional_fields or ()
+                     if field not in self.schema['numeric_fields'] + self.schema['optional_numeric_fields']]
+            if added:
+                # Parts written before return NaN for the new fields (see scan)
+                self.schema['optional_numeric_fields'] += added
+                with open(schema_file, 'w') as f:
+                    json.dump(self.schema, f, indent=2)
+        else:
+            os.makedirs(path, exist_ok=True)
+            self.schema = {
+                'version': SCHEMA_VERSION,
+                'numeric_fields': list(TRIP_INPUT_FIELDS),
+                'optional_numeric_fields': list(dict.fromkeys(
+                    list(optional_fields or ()) + optional_numeric_fields())),
+                'label_fields': list(TRIP_LABEL_FIELDS),
+                'numeric_dtype': 'float64',
+                'label_dtype': 'unicode',
+                'partitioning': 'trip_date (YYYY-MM-DD) / append-only parts',
+            }
+            with open(schema_file, 'w') as f:
+                json.dump(self.schema, f, indent=2)
+
+    def days(self) -> List[str]:
+        """
+        List the day partitions in the store, oldest first.
+
+        Returns:
+            list: Partition names (YYYY-MM-DD, plus 'undated' if present)
+        """
+        return sorted(name for name in os.listdir(self.path)
+                      if os.path.isdir(os.path.join(self.path, name))
+                      and (name == UNDATED or _DAY_PATTERN.match(name)))
+
+    def _parts(self, day: str) -> List[str]:
+        day_path = os.path.join(self.path, day)
+        return sorted(os.path.join(day_path, name) for name in os.listdir(day_path)
+                      if name.startswith('part-'))
+
+    def append(self, day: str, columns: Dict[str, Sequence[Any]]) -> int:
+        """
+        Append trips for one day as a new part (existing parts are untouched).
+
+        The part is written to a temporary directory and renamed into place,
+        so readers never see a half-written part.
+
+        Args:
+            day (str): Day partition (YYYY-MM-DD or 'undated')
+            columns (dict): Column values keyed by field name; all required
+                numeric fields must be present
+
+        Returns:
+            int: Number of trips written
+        """
+        import numpy as np
+
+        if day != UNDATED and not _DAY_PATTERN.match(day):
+            raise ValueError(f"Invalid day partition: {day} (expected YYYY-MM-DD)")
+
+        missing = [field for field in self.schema['numeric_fields'] if field not in columns]
+        if missing:
+            raise KeyError(f"Missing required fields: {', '.join(missing)}")
+
+        rows = len(columns[self.schema['numeric_fields'][0]])
+        if not rows:
+            return 0
+
+        day_path = os.path.join(self.path, day)
+        os.makedirs(day_path, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix='.part-', dir=day_path)
+
+        try:
+            for field in self.schema['numeric_fields'] + self.schema['optional_numeric_fields']:
+                if field in columns:
+                    values = np.asarray(columns[field], dtype=np.float64)
+                    if len(values) != rows:
+                        raise ValueError(f"Column {field} has {len(values)} rows, expected {rows}")
+                    np.save(os.path.join(staging, f'{field}.npy'), values)
+            for field in self.schema['label_fields']:
+                if field in columns:
+                    values = np.asarray([str(value) for value in columns[field]], dtype=np.str_)
+                    np.save(os.path.join(staging, f'{field}.npy'), values)
+
+            part_number = len(self._parts(day))
+            while True:
+                target = os.path.join(day_path, f'part-{part_number:05d}')
+                try:
+                    os.rename(staging, target)
+                    break
+                except OSError:
+                    if not os.path.exists(target):
+                        raise
+                    part_number += 1
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        return rows
+
+    def append_trips(self, columns: Dict[str, Sequence[Any]], date_field: str = 'trip_date') -> int:
+        """
+        Append a batch of trips, splitting it into day partitions by date_field.
+
+        Args:
+            columns (dict): Column values keyed by field name
+            date_field (str): Column holding each trip's date or timestamp
+
+        Returns:
+            int: Number of trips written
+        """
+        import numpy as np
+
+        rows = len(columns[self.schema['numeric_fields'][0]])
+        dates = columns.get(date_field, [None] * rows)
+        partitions = np.asarray([_partition_name(value) for value in dates])
+
+        written = 0
+        for day in np.unique(partitions).tolist():
+            selected = np.flatnonzero(partitions == day)
+            day_columns = {field: np.asarray(values)[selected] for field, values in columns.items()
+                           if field != date_field}
+            written += self.append(day, day_columns)
+        return written
+
+    def scan(self, start: Optional[str] = None, end: Optional[str] = None,
+             fields: Optional[Iterable[str]] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Iterate over stored parts as memory-mapped columns.
+
+        Args:
+            start (str): First day to include (YYYY-MM-DD, inclusive)
+            end (str): Last day to include (YYYY-MM-DD, inclusive)
+            fields (iterable): Columns to open (default: every stored column)
+
+        Yields:
+            tuple: (day, dict of read-only memory-mapped NumPy arrays). Optional
+                numeric fields missing from a part are returned as NaN.
+        """
+        import numpy as np
+
+        wanted = list(fields) if fields is not None else None
+
+        for day in self.days():
+            if day != UNDATED and ((start and day < start) or (end and day > end)):
+                continue
+            if day == UNDATED and (start or end):
+                continue
+
+            for part in self._parts(day):
+                stored = {name[:-4] for name in os.listdir(part) if name.endswith('.npy')}
+                names = wanted if wanted is not None else sorted(stored)
+                columns = {}
+                for field in names:
+                    if field in stored:
+                        columns[field] = np.load(os.path.join(part, f'{field}.npy'), mmap_mode='r')
+                    elif field in self.schema['optional_numeric_fields']:
+                        rows = len(np.load(os.path.join(part, f"{self.schema['numeric_fields'][0]}.npy"),
+                                           mmap_mode='r'))
+                        columns[field] = np.full(rows, np.nan)
+                    else:
+                        raise KeyError(f"Field {field} is not stored in {part}")
+                yield day, columns
+
+    def count(self, start: Optional[str] = None, end: Optional[str] = None) -> int:
+        """
+        Number of trips stored, optionally for a date range.
+
+        Args:
+            start (str): First day to include (inclusive)
+            end (str): Last day to include (inclusive)
+
+        Returns:
+            int: Trip count
+        """
+        field = self.schema['numeric_fields'][0]
+        return sum(len(columns[field]) for _, columns in self.scan(start, end, [field]))
+
+    def calculate(self, start: Optional[str] = None, end: Optional[str] = None,
+                  calculator: Optional[ProfitabilityCalculator] = None) -> Iterator[Tuple[str, Dict[str, Any], Dict[str, Any]]]:
+        """
+        Run every stored part through calculate_batch.
+
+        Args:
+            start (str): First day to include (inclusive)
+            end (str): Last day to include (inclusive)
+            calculator (ProfitabilityCalculator): Calculator to use (optional)
+
+        Yields:
+            tuple: (day, memory-mapped input columns, result arrays)
+        """
+        if calculator is None:
+            calculator = get_calculator()
+
+        for day, columns in self.scan(start, end):
+            yield day, columns, calculator.calculate_batch(columns)
+
+
+def import_trip_log(store: TripStore, trip_log: str, chunk_size: int = 50000) -> int:
+    """
+    Stream a CSV/JSONL trip log into the store, partitioned by trip_date.
+
+    The store's optional numeric fields (cost-model inputs such as
+    gas_volume_dispensed or mother_station_wait_time) are imported when the
+    log has them.
+
+    Args:
+        store (TripStore): Destination store
+        trip_log (str): CSV or JSONL trip log (see trip_ingest.py)
+        chunk_size (int): Trips read per chunk
+
+    Returns:
+        int: Number of trips imported
+    """
+    from trip_ingest import read_trip_chunks
+
+    imported = 0
+    optional = store.schema['optional_numeric_fields']
+    for chunk in read_trip_chunks(trip_log, chunk_size, extra_fields=optional):
+        # Fields the log does not have are left out (scan() returns them as NaN)
+        for field in optional:
+            if all(math.isnan(value) for value in chunk[field]):
+                del chunk[field]
+        imported += store.append_trips(chunk)
+    return imported
+
+
+def main():
+    """
+    Command-line entry point for the trip store.
+    """
+    parser = argparse.ArgumentParser(description="Columnar trip store")
+    parser.add_argument('--store', default='trip_store', help="Store directory (default: trip_store)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    import_command = commands.add_parser('import', help="Append a CSV/JSONL trip log")
+    import_command.add_argument('trip_log')
+    import_command.add_argument('--chunk-size', type=int, default=50000)
+    import_command.add_argument('--extra-field', action='append', default=[],
+                                help="Extra optional numeric field to store (repeatable)")
+
+    summary_command = commands.add_parser('summary', help="Totals per day from the stored trips")
+    summary_command.add_argument('--start', help="First day (YYYY-MM-DD)")
+    summary_command.add_argument('--end', help="Last day (YYYY-MM-DD)")
+
+    args = parser.parse_args()
+    store = TripStore(args.store, getattr(args, 'extra_field', None))
+
+    if args.command == 'import':
+        imported = store.count()
+        added = import_trip_log(store, args.trip_log, args.chunk_size)
+        print(f"Imported {added:,} trips into {args.store} (now {imported + added:,} trips, "
+              f"{len(store.days())} days)")
+        return
+
+    print("PowerGas Trip Store Summary")
+    print("="*80)
+    print(f"{'Day':<12}{'Trips':>10}{'Revenue (NGN)':>22}{'Profit (NGN)':>22}{'Margin %':>12}")
+    print("-"*80)
+
+    totals = {}
+    for day, _, results in store.calculate(args.start, args.end):
+        day_totals = totals.setdefault(day, {'trips': 0, 'revenue': 0.0, 'profit': 0.0})
+        day_totals['trips'] += len(results['profit'])
+        day_totals['revenue'] += float(results['revenue'].sum())
+        day_totals['profit'] += float(results['profit'].sum())
+
+    for day, day_totals in totals.items():
+        margin = day_totals['profit'] / day_totals['revenue'] * 100 if day_totals['revenue'] > 0 else 0
+        print(f"{day:<12}{day_totals['trips']:>10,}{day_totals['revenue']:>22,.2f}"
+              f"{day_totals['profit']:>22,.2f}{margin:>11.2f}%")
+
+
+if __name__ == "__main__":
+    main()